@@ -1,12 +1,14 @@
 import streamlit as st
 from pathlib import Path
 
-from modules.doc_parser import parse_document
-from modules.doc_classifier import classify_document
-from modules.checklist_verifier import verify_checklist
-from modules.redflag_detector import detect_red_flags
-from modules.commentor import add_comments_to_docx
-from modules.report_generator import generate_report
+from modules.pipeline import iter_process_document
+from modules.result_cache import ResultCache, content_hash
+from modules.report_generator import generate_report, StreamingReportWriter
+from modules.instrumentation import metrics
+from configs.setting import RESULT_CACHE_MAX_FILES, REPORT_STREAMING, REPORT_GZIP
+from configs.logging_config import setup_logging
+
+setup_logging()
 
 # Config
 st.set_page_config(page_title="ADGM Corporate Compliance Checker", layout="wide")
@@ -15,6 +17,37 @@ st.title("🏢 ADGM Corporate Compliance Checker")
 UPLOAD_DIR = Path("uploaded_docs")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Per-file pipeline results keyed by upload name + content hash; survives Streamlit reruns."""
+    return ResultCache(max_entries=RESULT_CACHE_MAX_FILES)
+
+result_cache = get_result_cache()
+
+def render_finding(container, finding: dict):
+    """One finding as it arrives: where it is, the clause preview and the AI analysis."""
+    label = "✅ template wording" if finding.get("llm_skipped") else "🔎 reviewed"
+    container.markdown(f"**{finding.get('location', '')}** · {label} · {finding['section']}")
+    container.code(finding["ai_analysis"], language="json")
+
+def check_with_progress(file_name: str, file_path: Path) -> dict:
+    """Run the pipeline on one file, rendering each finding (and a progress bar) as soon as it is ready."""
+    progress = st.progress(0.0, text=f"📄 Parsing and classifying {file_name}...")
+    findings_box = st.expander(f"⚖ Findings for {file_name}", expanded=True)
+    total, done, result = 0, 0, None
+    for event in iter_process_document(str(file_path)):
+        if event["type"] == "classified":
+            total = event["sections"]
+            progress.progress(0.0, text=f"🔎 {file_name}: {event['entity_type']}, checking {total} sections...")
+        elif event["type"] == "finding":
+            done += 1
+            progress.progress(done / max(total, 1), text=f"🔎 {file_name}: {done}/{total} sections checked")
+            render_finding(findings_box, event["finding"])
+        elif event["type"] == "done":
+            result = event["record"]
+    progress.progress(1.0, text=f"📄 {file_name}: " + ("done" if result["status"] == "ok" else "failed"))
+    return result
+
 # Multi-file upload
 uploaded_files = st.file_uploader(
     "Upload one or more DOCX/PDF files", 
@@ -28,45 +61,61 @@ if uploaded_files:
     all_redflags = []
     all_entity_types = []
     annotated_paths = []
-
-    for uploaded_file in uploaded_files:
-        # Save uploaded file
-        temp_path = UPLOAD_DIR / uploaded_file.name
-        temp_path.write_bytes(uploaded_file.read())
-        st.success(f"✅ File uploaded: {uploaded_file.name}")
-
-        # 1️⃣ Parse document
-        with st.spinner(f"📄 Parsing {uploaded_file.name}..."):
-            doc_text = parse_document(str(temp_path))
-        if not doc_text:
-            st.error(f"❌ Could not parse {uploaded_file.name}")
+    all_metrics = {}
+    # Streaming mode writes each file's records as soon as it is checked
+    report_path = "final_compliance_report.jsonl" + (".gz" if REPORT_GZIP else "") if REPORT_STREAMING \
+        else "final_compliance_report.json"
+    report_writer = StreamingReportWriter(report_path) if REPORT_STREAMING else None
+
+    for upload_idx, uploaded_file in enumerate(uploaded_files):
+        file_bytes = uploaded_file.getvalue()
+        # Results carry the file name and annotated path, so identical bytes under another name are a new entry
+        cache_key = f"{uploaded_file.name}:{content_hash(file_bytes)}"
+        result = result_cache.get(cache_key)
+        if result is not None and result["annotated_document_path"] != "N/A" \
+                and not Path(result["annotated_document_path"]).exists():
+            result = None  # annotated copy was removed; rebuild it
+
+        if result is None:
+            # Save uploaded file
+            temp_path = UPLOAD_DIR / uploaded_file.name
+            temp_path.write_bytes(file_bytes)
+            st.success(f"✅ File uploaded: {uploaded_file.name}")
+
+            # 1️⃣ Parse → 2️⃣ Classify → 3️⃣ Checklist → 4️⃣ Red Flags → 5️⃣ Annotate
+            result = check_with_progress(uploaded_file.name, temp_path)
+            if result["status"] == "ok":
+                result_cache.put(cache_key, result)
+        else:
+            st.success(f"✅ File uploaded: {uploaded_file.name} (cached results)")
+        if report_writer:
+            report_writer.add_document(result)
+
+        if result["status"] != "ok":
+            st.error(f"❌ {result.get('error', 'Processing failed')}: {uploaded_file.name}")
             continue
 
-        # 2️⃣ Classify
-        classification = classify_document(str(temp_path), doc_text)
-        entity_type = classification.get("entity_type")
-        if not entity_type:
-            st.error(f"❌ Could not classify {uploaded_file.name}")
-            continue
+        entity_type = result["entity_type"]
         all_entity_types.append(entity_type)
         st.info(f"**Entity Type for {uploaded_file.name}:** {entity_type}")
 
-        # 3️⃣ Checklist Verification
-        checklist_results = verify_checklist(entity_type)
-        all_checklist_present.extend(checklist_results['present'])
-        all_checklist_missing.extend(checklist_results['missing'])
-
-        # 4️⃣ Red Flag Detection
-        redflag_findings = detect_red_flags(str(temp_path))
-        all_redflags.extend(redflag_findings)
-
-        # 5️⃣ Annotate Document if DOCX
-        if temp_path.suffix.lower() == ".docx":
-            annotated_path = temp_path.with_name(temp_path.stem + "_annotated.docx")
-            add_comments_to_docx(str(temp_path), redflag_findings, str(annotated_path))
+        all_checklist_present.extend(result["checklist_verification"]["present"])
+        all_checklist_missing.extend(result["checklist_verification"]["missing"])
+        if report_writer:
+            # Already written to the report: show this file's findings without keeping them
+            if result["red_flag_findings"]:
+                st.expander(f"⚖ Red Flag Findings for {uploaded_file.name}").json(result["red_flag_findings"])
+        else:
+            all_redflags.extend(result["red_flag_findings"])
+        if "metrics" in result:
+            all_metrics[uploaded_file.name] = result["metrics"]
+
+        if result["annotated_document_path"] != "N/A":
+            annotated_path = Path(result["annotated_document_path"])
             annotated_paths.append(annotated_path)
             with open(annotated_path, "rb") as f:
-                st.download_button(f"📥 Download Annotated DOCX: {annotated_path.name}", f, file_name=annotated_path.name)
+                st.download_button(f"📥 Download Annotated DOCX: {annotated_path.name}", f,
+                                   file_name=annotated_path.name, key=f"annotated-{upload_idx}-{cache_key}")
 
     # Remove duplicates in checklist results
     all_checklist_present = sorted(set(all_checklist_present))
@@ -77,23 +126,34 @@ if uploaded_files:
     st.write(f"✅ Present Documents: {len(all_checklist_present)}", all_checklist_present)
     st.write(f"❌ Missing Documents: {len(all_checklist_missing)}", all_checklist_missing)
 
-    # Show combined red flags
+    # Show combined red flags (streaming mode: counts from the report summary)
     st.subheader("⚖ Combined Red Flag Findings")
-    if all_redflags:
+    if report_writer:
+        summary = report_writer.close()
+        if summary["findings"]:
+            st.write(f"{summary['findings']} findings by severity:", summary["severity_counts"])
+        else:
+            st.success("No compliance issues found.")
+    elif all_redflags:
         st.json(all_redflags)
     else:
         st.success("No compliance issues found.")
 
-    # 6️⃣ Generate combined final report
-    report_path = "final_compliance_report.json"
-    generate_report(
-        entity_type=", ".join(set(all_entity_types)),
-        checklist_results={"present": all_checklist_present, "missing": all_checklist_missing},
-        redflag_findings=all_redflags,
-        annotated_docx_path=", ".join([str(p) for p in annotated_paths]) if annotated_paths else "N/A",
-        output_json_path=report_path
-    )
+    # 6️⃣ Generate combined final report (already written in streaming mode)
+    if not report_writer:
+        generate_report(
+            entity_type=", ".join(set(all_entity_types)),
+            checklist_results={"present": all_checklist_present, "missing": all_checklist_missing},
+            redflag_findings=all_redflags,
+            annotated_docx_path=", ".join([str(p) for p in annotated_paths]) if annotated_paths else "N/A",
+            output_json_path=report_path,
+            metrics=all_metrics
+        )
     with open(report_path, "rb") as f:
-        st.download_button("📥 Download Combined Compliance Report (JSON)", f, file_name=Path(report_path).name)
+        st.download_button(f"📥 Download Combined Compliance Report ({'JSONL' if report_writer else 'JSON'})", f,
+                           file_name=Path(report_path).name)
+    # Cumulative stage latency / counters of this app process, for dashboards
+    st.download_button("📈 Download Pipeline Metrics (Prometheus)", metrics.to_prometheus(),
+                       file_name="compliance_metrics.prom")
 
     st.success("🎯 Compliance check complete for all uploaded files.")
@@ -0,0 +1,163 @@
+# batch_runner.py
+# Headless batch mode: runs the full compliance pipeline over a directory or list of filings,
+# appending one JSONL record per document as it finishes (see README "Batch Usage").
+import argparse
+import json
+import logging
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+from configs.setting import LLM_RATE_LIMIT_PER_SEC, LLM_RATE_BURST
+from configs.logging_config import setup_logging
+
+SUPPORTED_SUFFIXES = {".pdf", ".docx"}
+
+logger = logging.getLogger("batch_runner")
+
+# Set per worker process by _init_worker
+_annotate_dir: Optional[str] = None
+
+
+# ---------------- Input / Resume ----------------
+def collect_inputs(paths: Iterable[str], file_list: Optional[str] = None) -> List[Path]:
+    """Expand directories (recursively) and list files into supported documents, skipping our own *_annotated outputs."""
+    candidates = [Path(p) for p in paths]
+    if file_list:
+        lines = Path(file_list).read_text(encoding="utf-8").splitlines()
+        candidates.extend(Path(line.strip()) for line in lines if line.strip())
+
+    files = []
+    for path in candidates:
+        found = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for f in found:
+            if f.is_file() and f.suffix.lower() in SUPPORTED_SUFFIXES and not f.stem.endswith("_annotated"):
+                files.append(f.resolve())
+            elif not path.is_dir():
+                logger.warning(f"Skipping unsupported or missing input: {f}")
+    return list(dict.fromkeys(files))  # de-duplicate, keep order
+
+
+def completed_files(output_path: Path) -> Set[str]:
+    """Files already recorded with status "ok" in an existing JSONL output."""
+    done = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut off by an interrupted run
+            if record.get("status") == "ok":
+                done.add(record.get("file"))
+    return done
+
+
+# ---------------- Worker ----------------
+def _init_worker(annotate_dir: Optional[str], workers: int):
+    """
+    Load the embedding model / vector store once per worker (not needed for lexical retrieval)
+    and split the Gemini rate budget. Pool workers are daemonic and cannot start the page
+    extraction pool of a large PDF, so they extract pages in-process.
+    """
+    global _annotate_dir
+    _annotate_dir = annotate_dir
+    setup_logging()  # no-op under fork; spawned workers start unconfigured
+
+    from modules import doc_parser
+    from rag_engine import registry, llm_client, retriever
+    from rag_engine.rate_limiter import TokenBucket
+
+    doc_parser.PDF_WORKERS = 1
+    llm_client.rate_limiter = TokenBucket(LLM_RATE_LIMIT_PER_SEC / workers,
+                                          max(1, LLM_RATE_BURST // workers))
+    if retriever.RETRIEVAL_MODE != "lexical":
+        registry.get_vector_store()
+
+
+def _run_one(file_path: str) -> dict:
+    from modules.pipeline import process_document
+    from modules.instrumentation import metrics
+
+    start = time.perf_counter()
+    try:
+        record = process_document(file_path, _annotate_dir)
+    except Exception as e:
+        logger.exception(f"Pipeline failed for {file_path}")
+        record = {"file": file_path, "status": "error", "error": f"{type(e).__name__}: {e}"}
+    record["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    # Ship this document's raw samples to the parent (for --prometheus), then start fresh
+    record["_metric_samples"] = metrics.samples()
+    metrics.reset()
+    return record
+
+
+# ---------------- Batch Run ----------------
+def run_batch(files: List[Path], output_path: Path, workers: int = 1,
+              annotate_dir: Optional[str] = None, resume: bool = True,
+              prometheus_path: Optional[str] = None, report_path: Optional[str] = None) -> dict:
+    """
+    Process `files` with a pool of `workers` processes, appending one JSONL record per document.
+    With `prometheus_path`, stage latency and counters of all workers are written there at the end.
+    With `report_path`, this run's documents also go to a streaming compliance report
+    (per-finding records plus a summary; gzipped for a .gz path).
+    """
+    from modules.instrumentation import Metrics
+    from modules.report_generator import StreamingReportWriter
+
+    run_metrics = Metrics()
+    done = completed_files(output_path) if resume else set()
+    pending = [str(f) for f in files if str(f) not in done]
+    logger.info(f"{len(files)} documents found, {len(files) - len(pending)} already done, {len(pending)} to process.")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    stats = {"ok": 0, "error": 0}
+    start = time.perf_counter()
+    workers = max(1, min(workers, len(pending) or 1))
+    report = StreamingReportWriter(report_path) if report_path else None
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out, \
+            Pool(processes=workers, initializer=_init_worker, initargs=(annotate_dir, workers)) as pool:
+        for record in pool.imap_unordered(_run_one, pending):
+            run_metrics.merge(record.pop("_metric_samples", {}))
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if report:
+                report.add_document(record)
+            stats[record["status"]] = stats.get(record["status"], 0) + 1
+            logger.info(f"[{sum(stats.values())}/{len(pending)}] {record['status']}: {record['file']}")
+
+    stats["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    if report:
+        report.close()
+    if prometheus_path:
+        run_metrics.write_prometheus(prometheus_path)
+    logger.info(f"🏁 Batch finished: {stats}")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run ADGM compliance checks over a directory or list of filings.")
+    parser.add_argument("inputs", nargs="*", help="Files or directories (searched recursively for PDF/DOCX)")
+    parser.add_argument("--file-list", help="Text file with one document path per line")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file, one record per document")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--annotate-dir", help="Where annotated DOCX files go (default: next to the input)")
+    parser.add_argument("--prometheus", help="Write per-stage latency and counters in Prometheus text format here")
+    parser.add_argument("--report", help="Also write a streaming compliance report (JSONL, gzipped if it ends in .gz)")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite --output instead of skipping finished documents")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    files = collect_inputs(args.inputs, args.file_list)
+    if not files:
+        parser.error("no PDF/DOCX inputs found")
+    stats = run_batch(files, Path(args.output), args.workers, args.annotate_dir, resume=not args.no_resume,
+                      prometheus_path=args.prometheus, report_path=args.report)
+    return 0 if stats.get("error", 0) == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# benchmarks/import_budget.py
+# Import-time budget check: every pipeline module must import quickly in a fresh
+# interpreter and must not pull in the model / LLM stacks (those load on first use).
+#   python -m benchmarks.import_budget [--budget 0.5]   → exit code 1 on any violation
+# tests/test_import_budget.py runs the heavy-import part of it with the test suite.
+import argparse
+import json
+import subprocess
+import sys
+
+from configs.setting import BASE_DIR
+
+MODULES = [
+    "modules.pipeline",
+    "modules.redflag_detector",
+    "modules.doc_parser",
+    "modules.doc_classifier",
+    "modules.checklist_verifier",
+    "modules.commentor",
+    "modules.template_matcher",
+    "rag_engine.retriever",
+    "rag_engine.llm_client",
+    "rag_engine.embedder",
+    "rag_engine.registry",
+    "batch_runner",
+]
+
+# Packages that must only be imported when actually used
+HEAVY_PACKAGES = [
+    "langchain", "langchain_core", "langchain_community", "chromadb",
+    "sentence_transformers", "torch", "transformers", "google.generativeai", "dotenv",
+    "pdfplumber", "docx",
+]
+
+# Records every attempt to import a heavy package, so a module that tries one
+# (even where it is not installed, or behind try/except ImportError) still fails
+_PROBE = """
+import json, sys, time
+heavy = []
+class HeavyImportRecorder:
+    def find_spec(self, fullname, path=None, target=None):
+        for name in {heavy!r}:
+            if (fullname == name or fullname.startswith(name + ".")) and name not in heavy:
+                heavy.append(name)
+        return None
+sys.meta_path.insert(0, HeavyImportRecorder())
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(module: str) -> dict:
+    """Import `module` in a fresh interpreter; returns seconds and any heavy packages it loaded."""
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_PACKAGES)],
+        cwd=BASE_DIR, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {"module": module, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+    return {"module": module, **json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check import time and lazy loading of pipeline modules.")
+    parser.add_argument("--budget", type=float, default=0.5, help="Max seconds to import one module")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results, failures = [], 0
+    for module in MODULES:
+        result = measure(module)
+        ok = "error" not in result and result["seconds"] <= args.budget and not result["heavy"]
+        result["ok"] = ok
+        failures += not ok
+        results.append(result)
+        detail = result.get("error") or f"{result['seconds'] * 1000:7.1f} ms  heavy={result['heavy']}"
+        print(f"{'OK  ' if ok else 'FAIL'} {module:32s} {detail}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(f"{len(MODULES) - failures}/{len(MODULES)} modules within {args.budget}s and free of heavy imports")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
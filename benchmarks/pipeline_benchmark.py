@@ -0,0 +1,158 @@
+# benchmarks/pipeline_benchmark.py
+# End-to-end throughput benchmark: synthetic filings → process_document with the stub LLM.
+#   python -m benchmarks.pipeline_benchmark --files 20 --clauses 60 --llm-latency 0.05 \
+#       --output bench_results.json [--baseline previous.json]
+# Exit code 1 when a threshold in benchmarks/thresholds.json (or a regression vs --baseline) fails.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.synthetic_docs import generate_corpus
+
+THRESHOLDS_FILE = Path(__file__).with_name("thresholds.json")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process (None where `resource` is unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KB on Linux
+
+
+def configure_stack(args):
+    """Route every LLM call to the stub and lift the Gemini rate limit so the stub latency is what is measured."""
+    os.environ["LLM_CACHE_BYPASS"] = "1"
+    from rag_engine import llm_client, retriever
+    from rag_engine.rate_limiter import TokenBucket
+    from rag_engine.stub_llm import StubLLMBackend
+
+    llm_client.set_llm_backend(StubLLMBackend(latency=args.llm_latency, jitter=args.llm_jitter, seed=args.seed))
+    llm_client.rate_limiter = TokenBucket(args.rate_limit, max(1, int(args.rate_limit)))
+    if args.retrieval:
+        retriever.RETRIEVAL_MODE = args.retrieval
+
+
+def run_benchmark(args) -> Dict:
+    from modules.instrumentation import metrics
+    from modules.pipeline import process_document
+
+    configure_stack(args)
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="compliance_bench_"))
+    formats = tuple(args.formats)
+    corpus = generate_corpus(work_dir / "docs", args.files, args.clauses, args.pages, formats, args.seed)
+    warmup = generate_corpus(work_dir / "warmup", len(formats), args.clauses, args.pages, formats, args.seed + 10_000)
+
+    # Warm-up builds the template/BM25 indexes and loads models; it is not measured
+    for path in warmup:
+        process_document(str(path), str(work_dir / "annotated"))
+    metrics.reset()
+
+    statuses: Dict[str, int] = {}
+    start = time.perf_counter()
+    for path in corpus:
+        record = process_document(str(path), str(work_dir / "annotated"))
+        statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+    elapsed = time.perf_counter() - start
+
+    snapshot = metrics.snapshot()
+    sections = snapshot["counters"].get("sections", 0)
+    return {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "documents": len(corpus),
+        "statuses": statuses,
+        "sections": sections,
+        "elapsed_seconds": round(elapsed, 3),
+        "docs_per_sec": round(len(corpus) / elapsed, 3),
+        "sections_per_sec": round(sections / elapsed, 3),
+        "stage_seconds": {stage: {"p50": s["p50"], "p95": s["p95"], "count": s["count"]}
+                          for stage, s in snapshot["stage_seconds"].items()},
+        "first_finding_seconds": {key: snapshot["histograms"].get("first_finding_seconds", {}).get(key)
+                                  for key in ("p50", "p95")},
+        "counters": snapshot["counters"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# ---------------- Regression Checks ----------------
+def check_thresholds(result: Dict, thresholds: Dict, baseline: Optional[Dict] = None) -> List[Dict]:
+    """Absolute limits from thresholds.json plus, with a baseline run, relative regression limits."""
+    checks = []
+
+    def add(name, value, limit, ok):
+        checks.append({"name": name, "value": value, "limit": limit, "ok": bool(ok)})
+
+    for key in ("docs_per_sec", "sections_per_sec"):
+        limit = thresholds.get(f"min_{key}")
+        if limit is not None:
+            add(f"min_{key}", result[key], limit, result[key] >= limit)
+    limit = thresholds.get("max_peak_rss_mb")
+    if limit is not None and result["peak_rss_mb"] is not None:
+        add("max_peak_rss_mb", result["peak_rss_mb"], limit, result["peak_rss_mb"] <= limit)
+    for stage, limit in thresholds.get("max_stage_p95_seconds", {}).items():
+        if stage in result["stage_seconds"]:
+            p95 = result["stage_seconds"][stage]["p95"]
+            add(f"max_p95:{stage}", p95, limit, p95 <= limit)
+
+    if baseline:
+        tolerance = thresholds.get("max_regression", 0.25)
+        for key in ("docs_per_sec", "sections_per_sec"):
+            floor = round(baseline[key] * (1 - tolerance), 3)
+            add(f"regression:{key}", result[key], floor, result[key] >= floor)
+        for stage, stats in result["stage_seconds"].items():
+            before = baseline.get("stage_seconds", {}).get(stage)
+            if before and before["p95"] >= thresholds.get("min_stage_seconds_compared", 0.001):
+                ceiling = round(before["p95"] * (1 + tolerance), 6)
+                add(f"regression_p95:{stage}", stats["p95"], ceiling, stats["p95"] <= ceiling)
+    return checks
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pipeline throughput benchmark on synthetic filings with a stub LLM.")
+    parser.add_argument("--files", type=int, default=10, help="Documents to process (measured)")
+    parser.add_argument("--clauses", type=int, default=40, help="Clauses per document")
+    parser.add_argument("--pages", type=int, default=0, help="Minimum pages per PDF (padding pages are added)")
+    parser.add_argument("--formats", nargs="+", default=["docx", "pdf"], choices=["docx", "pdf"])
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Stub LLM seconds per request")
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=1000.0, help="LLM requests/sec allowed during the run")
+    parser.add_argument("--retrieval", choices=["vector", "lexical", "hybrid"],
+                        help="Override RETRIEVAL_MODE (lexical needs no embedding model)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", help="Where synthetic and annotated files go (default: a temp dir)")
+    parser.add_argument("--output", default="bench_results.json", help="Machine-readable results")
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_FILE))
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    args = parser.parse_args(argv)
+
+    from configs.logging_config import setup_logging
+    setup_logging("WARNING")
+
+    result = run_benchmark(args)
+    thresholds = json.loads(Path(args.thresholds).read_text(encoding="utf-8")) if args.thresholds else {}
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+    result["checks"] = check_thresholds(result, thresholds, baseline)
+    result["passed"] = all(check["ok"] for check in result["checks"])
+
+    Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"{result['documents']} docs, {result['sections']} sections in {result['elapsed_seconds']}s → "
+          f"{result['docs_per_sec']} docs/s, {result['sections_per_sec']} sections/s, "
+          f"peak RSS {result['peak_rss_mb']} MB, first finding p50 {result['first_finding_seconds']['p50']}s")
+    for stage, stats in result["stage_seconds"].items():
+        print(f"  {stage:18s} p50 {stats['p50'] * 1000:9.2f} ms   p95 {stats['p95'] * 1000:9.2f} ms   n={stats['count']}")
+    for check in result["checks"]:
+        if not check["ok"]:
+            print(f"  FAIL {check['name']}: {check['value']} (limit {check['limit']})")
+    print(f"{'PASSED' if result['passed'] else 'FAILED'} → {args.output}")
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# benchmarks/retrieval_benchmark.py
+# Latency and hit quality of vector, lexical (BM25) and hybrid retrieval on a fixed query set.
+#   python -m benchmarks.retrieval_benchmark [--modes lexical hybrid] [--k 5] [--output results.json]
+import argparse
+import json
+import statistics
+import time
+
+from configs.setting import RETRIEVAL_K
+from rag_engine import registry
+from rag_engine.retriever import retrieve
+
+# (query, source stem expected among the top-k chunks)
+QUERIES = [
+    ("Which companies are eligible for continuance into ADGM under the Companies Regulations?",
+     "checklists_docs_Private Company Limited by Shares continuance SPV 20231228"),
+    ("Registration of a branch of a foreign company", "checklists_docs_Branch - Financial Services and Non-Financial Services"),
+    ("Incorporation requirements for a limited liability partnership", "checklists_docs_Limited Liability Partnership - Financial and Non-Financial firms"),
+    ("Business and Company Names Rules 2021 prohibited names", "guidance_ADGM1547_23207_VER17032021"),
+    ("Who is a beneficial owner and what is significant control?", "guidance_Beneficial Ownership and Control Guidance 2021"),
+    ("UBO declaration under UAE Federal Law 20 of 2018 on anti money laundering", "templates_UBO-Ultimate Beneficial Owner Declaration Form"),
+    ("Register of beneficial owners template", "templates_Template_RegisterofBeneficialOwners-v1-20220107"),
+    ("Special purpose vehicle eligibility and permitted activities", "guidance_ADGM RA Special Purpose Vehicles Guidance Note (1)"),
+    ("Filing annual accounts and accounting reporting standards", "guidance_RA-Annual-Accounts-Guidance-V10-09092022"),
+    ("Event driven filings: change of company name or trade name", "guidance_QuickGuide_EventDrivenFilings_Company_V1.2_2025"),
+    ("Appropriate policy document for processing special category personal data", "policies_ADGM DPR 2021 Appropriate Policy Document"),
+    ("Employment contract probation period and notice of termination", "templates_ADGM Standard Employment Contract - ER 2019 - Short Version (May 2024)"),
+    ("Shareholders' resolution to amend the articles of association", "templates_Templates_SHReso_AmendmentArticles-v1-20220107"),
+    ("Resolution of incorporating shareholders to incorporate a private company limited by shares",
+     "templates_adgm-ra-resolution-multiple-incorporate-shareholders-LTD-incorporation-v2"),
+    ("Liability of members limited by guarantee", "templates_adgm-ra-model-articles-private-company-limited-by-guarantee"),
+    ("Directors' general authority and shareholders' reserve power", "templates_adgm-ra-model-articles-private-company-limited-by-shares"),
+    ("Consent to act as a director of the company", "templates_consenttoactasdirector_ver100_2016-10-05"),
+    ("Consent to act as a secretary of the company", "templates_consenttoactassecretary_ver100_2016-10-05"),
+    ("Prepare a business plan for a non-financial company", "checklists_docs_Private Company Limited by Shares - Non-Financial Services"),
+    ("In-principle approval from the Financial Services Regulatory Authority", "checklists_docs_Private Company Limited by Shares-Financial Services 20230509"),
+]
+
+
+def run_mode(mode: str, k: int, repeat: int) -> dict:
+    """Warm the indexes, then time one query at a time and score the last run's results."""
+    retrieve([QUERIES[0][0]], k, mode=mode)
+    latencies, hits, reciprocal_ranks = [], 0, []
+    for _ in range(repeat):
+        for query, expected in QUERIES:
+            start = time.perf_counter()
+            results = retrieve([query], k, mode=mode)[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+    # Quality is deterministic, so one pass is enough
+    for query, expected in QUERIES:
+        sources = [doc.metadata.get("source") for doc in retrieve([query], k, mode=mode)[0]]
+        rank = sources.index(expected) + 1 if expected in sources else None
+        hits += rank is not None
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "queries": len(QUERIES),
+        f"hit_rate@{k}": round(hits / len(QUERIES), 3),
+        "mrr": round(statistics.mean(reciprocal_ranks), 3),
+        "latency_ms_p50": round(statistics.median(latencies), 2),
+        "latency_ms_p95": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vector vs lexical vs hybrid retrieval.")
+    parser.add_argument("--modes", nargs="+", default=["vector", "lexical", "hybrid"],
+                        choices=["vector", "lexical", "hybrid"])
+    parser.add_argument("--k", type=int, default=RETRIEVAL_K)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the query set")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes:
+        try:
+            results.append(run_mode(mode, args.k, args.repeat))
+        except (Exception, SystemExit) as e:  # the vector modes exit when the model/store is missing
+            results.append({"mode": mode, "error": repr(e)})
+        print(json.dumps(results[-1]))
+
+    results.append({"load_times_s": registry.load_times()})
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
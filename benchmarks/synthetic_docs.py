@@ -0,0 +1,138 @@
+# benchmarks/synthetic_docs.py
+# Deterministic synthetic ADGM filings (DOCX via python-docx, PDF written directly)
+# for throughput benchmarks. Same seed → same documents.
+import random
+from pathlib import Path
+from typing import List
+
+ENTITY_HEADER = "ARTICLES OF ASSOCIATION – PRIVATE COMPANY LIMITED BY SHARES (NON-FINANCIAL)"
+
+HEADINGS = [
+    "SHARE CAPITAL", "DIRECTORS", "REGISTERED OFFICE", "SHAREHOLDER MEETINGS",
+    "ULTIMATE BENEFICIAL OWNERS", "ACCOUNTS AND AUDIT", "TRANSFER OF SHARES", "GOVERNING LAW",
+]
+
+SUBJECTS = ["The Company", "Each director", "The shareholders", "The company secretary", "The board"]
+VERBS = ["shall maintain", "must notify the Registrar of", "may resolve to approve", "shall file",
+         "is responsible for keeping"]
+OBJECTS = [
+    "a registered office in the Abu Dhabi Global Market",
+    "a register of beneficial owners in accordance with the Beneficial Ownership and Control Regulations",
+    "annual accounts within nine months after the end of the financial year",
+    "any change of directors within fourteen days",
+    "the allotment of new shares in line with the Companies Regulations 2020",
+    "minutes of every general meeting for at least six years",
+]
+QUALIFIERS = ["", " unless otherwise agreed in writing", " subject to the laws of the UAE federal courts",
+              " as soon as reasonably practicable", " in accordance with these Articles"]
+
+
+def _clause(rng: random.Random, number: str, sentences: int) -> str:
+    body = " ".join(
+        f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}{rng.choice(QUALIFIERS)}."
+        for _ in range(sentences)
+    )
+    return f"{number} {body}"
+
+
+def clause_outline(clauses: int, seed: int = 0) -> List[tuple]:
+    """[(heading or None, clause text)] with a heading every few clauses."""
+    rng = random.Random(seed)
+    outline, part = [], 0
+    for n in range(1, clauses + 1):
+        heading = None
+        if (n - 1) % 4 == 0:
+            heading = f"{part + 1}. {HEADINGS[part % len(HEADINGS)]}"
+            part += 1
+        outline.append((heading, _clause(rng, f"{part}.{(n - 1) % 4 + 1}", rng.randint(2, 5))))
+    return outline
+
+
+# ---------------- DOCX ----------------
+def write_docx(path: Path, clauses: int, seed: int = 0) -> Path:
+    import docx
+
+    document = docx.Document()
+    document.add_heading(ENTITY_HEADER, level=0)
+    for heading, clause in clause_outline(clauses, seed):
+        if heading:
+            document.add_heading(heading, level=1)
+        document.add_paragraph(clause)
+    document.save(str(path))
+    return path
+
+
+# ---------------- PDF ----------------
+def _wrap(text: str, width: int = 90) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, clauses: int, pages: int = 0, seed: int = 0) -> Path:
+    """
+    Minimal text PDF (Helvetica, one content stream per page) that pdfplumber can read.
+    `pages` pads the document with continuation pages up to that count.
+    """
+    lines = [ENTITY_HEADER, ""]
+    for heading, clause in clause_outline(clauses, seed):
+        if heading:
+            lines += ["", heading]
+        lines += _wrap(clause)
+    per_page = 48
+    page_lines = [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+    while len(page_lines) < pages:
+        page_lines.append([f"Continuation sheet {len(page_lines) + 1}", ""] + _wrap(clause_outline(1, seed + len(page_lines))[0][1]))
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for page in page_lines:
+        stream = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in page) + " ET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    Path(path).write_bytes(bytes(out))
+    return path
+
+
+def generate_corpus(out_dir: Path, files: int, clauses: int, pages: int = 0,
+                    formats=("docx", "pdf"), seed: int = 0) -> List[Path]:
+    """`files` documents alternating between `formats`, each with `clauses` clauses."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(files):
+        fmt = formats[i % len(formats)]
+        path = out_dir / f"synthetic_{i:04d}.{fmt}"
+        if fmt == "docx":
+            write_docx(path, clauses, seed + i)
+        else:
+            write_pdf(path, clauses, pages, seed + i)
+        paths.append(path)
+    return paths
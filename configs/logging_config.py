@@ -0,0 +1,35 @@
+# configs/logging_config.py
+# One logging setup for the whole app, called once by each entrypoint
+# (app.py, batch_runner.py, module __main__ blocks) instead of at import time.
+import logging
+import sys
+from pathlib import Path
+
+from configs.setting import BASE_DIR, LOG_LEVEL
+
+LOG_FORMAT = "%(asctime)s - [%(levelname)s] - %(message)s"
+LOG_DIR = BASE_DIR / "logs"
+
+# Loggers that also keep their own log file
+MODULE_LOG_FILES = {
+    "rag_engine.llm_client": "llm_client.log",
+    "rag_engine.retriever": "retriever.log",
+}
+
+_configured = False
+
+
+def setup_logging(level: str = LOG_LEVEL):
+    """Console logging for everything plus the per-module log files; safe to call repeatedly."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=[logging.StreamHandler(sys.stdout)])
+
+    Path(LOG_DIR).mkdir(exist_ok=True)
+    for name, filename in MODULE_LOG_FILES.items():
+        handler = logging.FileHandler(LOG_DIR / filename, mode="a", encoding="utf-8")
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logging.getLogger(name).addHandler(handler)
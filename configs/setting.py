@@ -7,6 +7,7 @@ RAW_DOCS_DIR = BASE_DIR / "data/adgm_reference_docs"
 PROCESSED_TEXTS_DIR = BASE_DIR / "data/processed_texts"
 EMBEDDINGS_DIR = BASE_DIR / "data/embeddings"
 CHECKLIST_FILE = BASE_DIR / "configs/checklist.json"
+INGEST_MANIFEST_FILE = BASE_DIR / "data/ingest_manifest.json"  # Content hashes of ingested reference docs
 
 # ---------------- RAG Engine Settings ----------------
 EMBED_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
@@ -14,9 +15,87 @@ RETRIEVAL_K = 5
 CHUNK_SIZE = 800
 CHUNK_OVERLAP = 100
 
+# ---------------- Vector Store ----------------
+VECTOR_STORE_BACKEND = "chroma"  # "chroma" or "flat" (memory-mapped exact search, see rag_engine/flat_store.py)
+FLAT_STORE_DIR = BASE_DIR / "data/flat_index"
+FLAT_STORE_DTYPE = "float32"     # "float16" halves the file size at some search speed cost
+
+# ---------------- Hybrid Retrieval ----------------
+RETRIEVAL_MODE = "vector"      # "vector" (Chroma only), "lexical" (BM25 only, no model) or "hybrid"
+HYBRID_ALPHA = 0.5             # Weight of the vector score in hybrid fusion (1 - alpha goes to BM25)
+HYBRID_CANDIDATES = 20         # Candidates fetched from each index before fusion
+BM25_INDEX_FILE = EMBEDDINGS_DIR / "bm25_index.json"
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# ---------------- Entity Prototypes ----------------
+ENTITY_PROTOTYPES_FILE = EMBEDDINGS_DIR / "entity_prototypes.npz"  # Built with the index (rag_engine/entity_prototypes.py)
+ENTITY_CHECKLIST_FILES = {     # Checklist PDF in RAW_DOCS_DIR/checklists_docs that defines each entity type
+    "PrivateCompany_LimitedByShares_NonFinancial": "Private Company Limited by Shares - Non-Financial Services.pdf",
+    "PrivateCompany_LimitedByGuarantee_NonFinancial": "Private Company Limited by Guarantee Non-Financial Services 20231228.pdf",
+    "PrivateCompany_LimitedByShares_Financial": "Private Company Limited by Shares-Financial Services 20230509.pdf",
+    "SPV_Continuance": "Private Company Limited by Shares continuance SPV 20231228.pdf",
+    "Branch_Financial_NonFinancial": "Branch - Financial Services and Non-Financial Services.pdf",
+    "LLP_Financial_NonFinancial": "Limited Liability Partnership - Financial and Non-Financial firms.pdf"
+}
+ENTITY_PREFIX_CHARS = 1500     # Document prefix embedded by the fallback classifier
+ENTITY_MIN_CONFIDENCE = 0.4    # Calibrated probability below which the fallback gives no entity
+
+# ---------------- Context Assembly ----------------
+CONTEXT_TOKEN_BUDGET = 1200     # Max tokens of retrieved context per clause
+CONTEXT_MMR_LAMBDA = 0.7        # 1.0 = pure relevance, 0.0 = pure diversity
+CONTEXT_DUP_THRESHOLD = 0.8     # Word-trigram Jaccard above which a chunk counts as a duplicate
+TOKEN_COUNTER = "estimate"      # "estimate" (local heuristic) or "embedding" (embedding model tokenizer; loads the model)
+
+# ---------------- Extraction ----------------
+PDF_WORKERS = 4                # Processes used to extract page ranges of one large PDF (1 = sequential)
+PDF_PARALLEL_MIN_PAGES = 40    # Smaller PDFs are extracted in-process
+LOADER_WORKERS = 4             # Reference files extracted concurrently by run_loader
+
+# ---------------- Sectioning ----------------
+SECTION_MIN_CHARS = 300        # PDF text: merge lines until a section has this much body text (numbered DOCX clauses always split)
+SECTION_MAX_CHARS = 2500       # Hard cap per section (one LLM clause)
+
 # ---------------- LLM Settings ----------------
 GEMINI_MODEL = "gemini-1.5-flash"  # Free-tier
 SYSTEM_PROMPT = "You are an ADGM corporate compliance expert."
 
+# ---------------- Template Conformance ----------------
+TEMPLATES_DIR = RAW_DOCS_DIR / "templates"
+TEMPLATE_MATCH_ENABLED = True      # Skip the LLM for clauses copied from official templates
+TEMPLATE_MATCH_THRESHOLD = 0.95    # Minimum similarity to a template paragraph
+
+# ---------------- LLM Concurrency ----------------
+LLM_MAX_WORKERS = 4            # Parallel Gemini calls in detect_red_flags (1 = sequential)
+LLM_RATE_LIMIT_PER_SEC = 2.0   # Token-bucket refill rate (requests/sec)
+LLM_RATE_BURST = 4             # Token-bucket capacity
+LLM_MAX_RETRIES = 4            # Retries on 429/5xx
+LLM_BACKOFF_BASE = 1.0         # Seconds, doubled on every retry
+LLM_BACKOFF_MAX = 30.0
+
+# ---------------- LLM Batched Prompting ----------------
+LLM_BATCH_MODE = True          # Pack several clauses into one Gemini request
+LLM_BATCH_TOKEN_BUDGET = 6000  # Max estimated tokens of clauses + shared context per request
+LLM_BATCH_MAX_CLAUSES = 8
+
+# ---------------- LLM Response Cache ----------------
+LLM_CACHE_ENABLED = True       # Set env LLM_CACHE_BYPASS=1 to skip the cache for one run
+LLM_CACHE_PATH = BASE_DIR / "data/cache/llm_responses.sqlite3"
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = 50000
+
+# ---------------- Instrumentation ----------------
+METRICS_ENABLED = True         # Stage timings / counters in reports and Prometheus export
+METRICS_MAX_SAMPLES = 10000    # Recent samples kept per histogram for p50/p95
+PROFILE_ENABLED = False        # cProfile every document (or set env COMPLIANCE_PROFILE=1)
+PROFILE_DIR = BASE_DIR / "data/profiles"
+
+# ---------------- Reports ----------------
+REPORT_STREAMING = False       # App writes final_compliance_report.jsonl[.gz] record by record instead of one JSON
+REPORT_GZIP = True             # gzip the streamed report
+
+# ---------------- App ----------------
+RESULT_CACHE_MAX_FILES = 64    # Per-upload results kept across Streamlit reruns (LRU)
+
 # ---------------- Other ----------------
 LOG_LEVEL = "INFO"
@@ -1,68 +1,133 @@
 # module/checklist_verifier.py
 import json
 import logging
-import sys
+import re
+import threading
 from pathlib import Path
+from typing import Dict, Iterable, Optional
 from configs.setting import CHECKLIST_FILE, PROCESSED_TEXTS_DIR
 
-# ---------------- Console Logging ----------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - [%(levelname)s] - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
 logger = logging.getLogger(__name__)
 
 # ---------------- Helpers ----------------
-def load_checklist():
+def load_checklist(checklist_file: Path = CHECKLIST_FILE):
     """Load checklist.json into memory."""
-    if not CHECKLIST_FILE.exists():
-        logger.error(f"Checklist file not found: {CHECKLIST_FILE}")
+    if not checklist_file.exists():
+        logger.error(f"Checklist file not found: {checklist_file}")
         return {}
     try:
-        with open(CHECKLIST_FILE, "r", encoding="utf-8") as f:
+        with open(checklist_file, "r", encoding="utf-8") as f:
             data = json.load(f)
         logger.info("✅ Checklist loaded.")
         return data
     except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in {CHECKLIST_FILE}: {e}")
+        logger.error(f"Invalid JSON in {checklist_file}: {e}")
         return {}
 
+_NON_ALNUM = re.compile(r'[^a-z0-9]')
+_DOC_SUFFIXES = {".pdf", ".docx", ".txt"}
+
 def normalize_name(name: str) -> str:
     """Normalize strings for matching (lowercase, no special chars)."""
-    import re
-    return re.sub(r'[^a-z0-9]', '', name.lower())
+    return _NON_ALNUM.sub('', name.lower())
+
+def _normalize_document(name: str) -> str:
+    """Normalize a file name or title, dropping a .pdf/.docx/.txt extension."""
+    path = Path(str(name))
+    return normalize_name(path.stem if path.suffix.lower() in _DOC_SUFFIXES else path.name)
 
-def verify_checklist(entity_type: str):
+# ---------------- Checklist Index ----------------
+class ChecklistIndex:
     """
-    For a given entity type, checks which checklist docs are present in processed_texts.
-    Returns dict with 'present' and 'missing'.
+    In-memory checklist plus normalized names of the reference documents.
+    Rebuilt only when checklist.json or the processed-texts folder changes (mtime).
     """
-    checklist_data = load_checklist()
-    if entity_type not in checklist_data:
-        logger.warning(f"No checklist found for entity type: {entity_type}")
-        return {"present": [], "missing": []}
 
-    required_docs = checklist_data[entity_type]
-    # Normalize required names
-    required_norm = {normalize_name(doc): doc for doc in required_docs}
+    def __init__(self, checklist_file: Path = CHECKLIST_FILE, docs_dir: Path = PROCESSED_TEXTS_DIR):
+        self.checklist_file = Path(checklist_file)
+        self.docs_dir = Path(docs_dir)
+        self._lock = threading.Lock()
+        self._signature = None
+        self.checklist = {}        # entity -> [(normalized name, original name)]
+        self.reference_names = ""  # normalized reference stems joined by "|"
+
+    def _current_signature(self):
+        def mtime(path: Path):
+            return path.stat().st_mtime_ns if path.exists() else None
+        return mtime(self.checklist_file), mtime(self.docs_dir)
+
+    def refresh(self):
+        """Reload checklist and reference names if either changed on disk."""
+        signature = self._current_signature()
+        with self._lock:
+            if signature == self._signature:
+                return
+            data = load_checklist(self.checklist_file)
+            self.checklist = {
+                entity: [(normalize_name(doc), doc) for doc in docs]
+                for entity, docs in data.items()
+            }
+            present_files = [f.stem for f in self.docs_dir.glob("*.txt")] if self.docs_dir.exists() else []
+            self.reference_names = self._join(normalize_name(f) for f in present_files)
+            self._signature = signature
+            logger.info(f"Checklist index built: {len(self.checklist)} entity types, "
+                        f"{len(present_files)} reference documents.")
+
+    @staticmethod
+    def _join(names: Iterable[str]) -> str:
+        # Normalized names are alphanumeric, so a "|" separator can never be part of a match
+        return "|".join(names)
+
+    def _names_for(self, documents: Optional[Iterable[str]]) -> str:
+        if documents is None:
+            return self.reference_names
+        return self._join(_normalize_document(doc) for doc in documents)
 
-    # Gather processed text filenames
-    present_files = [f.stem for f in Path(PROCESSED_TEXTS_DIR).glob("*.txt")]
-    present_norm = {normalize_name(f): f for f in present_files}
+    def verify(self, entity_type: str, documents: Optional[Iterable[str]] = None) -> Dict:
+        """Present/missing checklist docs for one entity type."""
+        self.refresh()
+        if entity_type not in self.checklist:
+            logger.warning(f"No checklist found for entity type: {entity_type}")
+            return {"present": [], "missing": []}
+        return self._partition(self.checklist[entity_type], self._names_for(documents))
 
-    present, missing = [], []
+    def verify_all(self, documents: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Present/missing checklist docs for every entity type in one pass."""
+        self.refresh()
+        names = self._names_for(documents)
+        found = {norm for required in self.checklist.values() for norm, _ in required if norm in names}
+        return {
+            entity: self._partition(required, names, found)
+            for entity, required in self.checklist.items()
+        }
 
-    for norm_key, original_doc in required_norm.items():
-        if any(norm_key in fn for fn in present_norm.keys()):
-            present.append(original_doc)
-        else:
-            missing.append(original_doc)
+    @staticmethod
+    def _partition(required, names: str, found: Optional[set] = None) -> Dict:
+        present, missing = [], []
+        for norm_key, original_doc in required:
+            hit = norm_key in found if found is not None else norm_key in names
+            (present if hit else missing).append(original_doc)
+        return {"present": present, "missing": missing}
+
+
+_index = ChecklistIndex()
+
+def verify_checklist(entity_type: str, documents: Optional[Iterable[str]] = None):
+    """
+    For a given entity type, checks which checklist docs are present in processed_texts,
+    or in `documents` (uploaded file names/titles) when given.
+    Returns dict with 'present' and 'missing'.
+    """
+    return _index.verify(entity_type, documents)
 
-    return {"present": present, "missing": missing}
+def verify_all_checklists(documents: Optional[Iterable[str]] = None):
+    """verify_checklist for every entity type at once: {entity_type: {'present', 'missing'}}."""
+    return _index.verify_all(documents)
 
 # ---------------- Test ----------------
 if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
     entity = "PrivateCompany_LimitedByShares_NonFinancial"
     logger.info(f"🔍 Verifying checklist for entity: {entity}")
     results = verify_checklist(entity)
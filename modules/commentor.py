@@ -1,56 +1,131 @@
 # module/commentor.py
-from docx import Document
 from difflib import SequenceMatcher
-import logging, sys
+from collections import Counter, defaultdict
+import logging
 from pathlib import Path
-from typing import List, Dict
-
-# ---------------- Console Logging ----------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - [%(levelname)s] - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+from typing import TYPE_CHECKING, List, Dict, Optional, Union
+
+from modules.doc_parser import ParsedDocument
+
+if TYPE_CHECKING:  # python-docx is imported only when a file has to be opened
+    from docx.document import Document
+
 logger = logging.getLogger(__name__)
 
 
-def find_best_paragraph_match(doc: Document, section_text: str):
+# ---------------- Paragraph Index ----------------
+SHINGLE_SIZE = 3      # character n-gram length
+MAX_CANDIDATES = 8    # paragraphs scored with SequenceMatcher per finding
+
+
+def _shingles(text: str) -> set:
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+class ParagraphIndex:
+    """
+    One-time character n-gram index over a document's paragraphs.
+    Each lookup only runs SequenceMatcher on the few paragraphs sharing the most
+    n-grams with the query, after cheap quick_ratio upper-bound checks.
+    """
+
+    def __init__(self, doc: "Document"):
+        self.texts = {}      # paragraph index -> stripped, lowercased text
+        self.exact = {}      # lowercased text -> first paragraph index
+        self.sizes = {}      # paragraph index -> number of distinct n-grams
+        self.postings = defaultdict(list)
+        for idx, para in enumerate(doc.paragraphs):
+            para_text = para.text.strip().lower()
+            if not para_text:
+                continue
+            self.texts[idx] = para_text
+            self.exact.setdefault(para_text, idx)
+            shingles = _shingles(para_text)
+            self.sizes[idx] = len(shingles)
+            for shingle in shingles:
+                self.postings[shingle].append(idx)
+
+        # n-grams found in most paragraphs ("the", " of") carry no signal
+        max_df = max(10, len(self.texts) // 2)
+        self.postings = {sh: ids for sh, ids in self.postings.items() if len(ids) <= max_df}
+
+    def candidates(self, query: str, limit: int = MAX_CANDIDATES) -> List[int]:
+        """Paragraphs ranked by Dice overlap of n-grams (mirrors how ratio() penalises length gaps)."""
+        query_shingles = _shingles(query)
+        overlap = Counter()
+        for shingle in query_shingles:
+            overlap.update(self.postings.get(shingle, ()))
+        dice = {idx: 2 * hits / (self.sizes[idx] + len(query_shingles)) for idx, hits in overlap.items()}
+        return sorted(dice, key=dice.get, reverse=True)[:limit]
+
+    def best_match(self, section_text: str):
+        """Return (paragraph index, similarity) of the closest paragraph, or (None, 0)."""
+        query = section_text.lower()
+        exact_idx = self.exact.get(query.strip())
+        if exact_idx is not None:
+            return exact_idx, 1.0
+
+        best_idx = None
+        best_score = 0
+        for idx in self.candidates(query):
+            matcher = SequenceMatcher(None, self.texts[idx], query)
+            # Both are upper bounds of ratio(); skip the full diff when they can't win
+            if matcher.real_quick_ratio() <= best_score or matcher.quick_ratio() <= best_score:
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best_score = score
+                best_idx = idx
+        return best_idx, best_score
+
+
+def find_best_paragraph_match(doc: "Document", section_text: str, index: Optional[ParagraphIndex] = None):
     """
     Find the paragraph index in the DOCX most similar to the given section_text.
+    Pass a prebuilt ParagraphIndex when matching many sections against one document.
     """
-    best_idx = None
-    best_score = 0
-    for idx, para in enumerate(doc.paragraphs):
-        para_text = para.text.strip()
-        if not para_text:
-            continue
-        score = SequenceMatcher(None, para_text.lower(), section_text.lower()).ratio()
-        if score > best_score:
-            best_score = score
-            best_idx = idx
-    return best_idx, best_score
-
-
-def add_comments_to_docx(input_file: str, findings: List[Dict], output_file: str):
+    index = index or ParagraphIndex(doc)
+    return index.best_match(section_text)
+
+
+def add_comments_to_docx(input_file: Union[str, ParsedDocument], findings: List[Dict], output_file: str):
     """
     Add compliance comments into DOCX file based on findings.
     findings is a list of dicts with keys: section, ai_analysis.
+    A ParsedDocument's already loaded docx.Document is annotated in place instead of reopening the file.
     """
-    if not Path(input_file).exists():
-        logger.error(f"Input file not found: {input_file}")
-        return False
+    if isinstance(input_file, ParsedDocument) and input_file.docx_document is not None:
+        doc = input_file.docx_document
+    else:
+        input_path = input_file.path if isinstance(input_file, ParsedDocument) else Path(input_file)
+        if not input_path.exists():
+            logger.error(f"Input file not found: {input_path}")
+            return False
 
-    logger.info(f"Loading DOCX: {input_file}")
-    doc = Document(input_file)
+        from docx import Document
+        logger.info(f"Loading DOCX: {input_path}")
+        doc = Document(input_path)
 
     logger.info(f"Adding {len(findings)} compliance comments...")
+    paragraphs = doc.paragraphs
+    index = None
     for finding in findings:
+        if finding.get("llm_skipped"):
+            continue  # conforms to template wording; nothing to flag in the document
         section = finding.get("section", "")
         comment_text = finding.get("ai_analysis", "")
 
-        idx, score = find_best_paragraph_match(doc, section)
+        # Findings from detect_red_flags carry their source paragraph; others are fuzzy matched
+        idx = finding.get("paragraph_index")
+        if isinstance(idx, int) and 0 <= idx < len(paragraphs):
+            score = 1.0
+        else:
+            index = index or ParagraphIndex(doc)
+            idx, score = find_best_paragraph_match(doc, section, index)
         if idx is not None and score > 0.3:  # only if match is reasonably good
-            para = doc.paragraphs[idx]
+            para = paragraphs[idx]
             # python-docx doesn't support true comment objects, so we'll append inline markers
             para.add_run(f"  [COMMENT: {comment_text}]").italic = True
         else:
@@ -62,6 +137,8 @@ def add_comments_to_docx(input_file: str, findings: List[Dict], output_file: str
 
 
 if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
     # Example usage with dummy findings
     dummy_findings = [
         {
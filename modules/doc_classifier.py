@@ -1,17 +1,15 @@
 # module/doc_classifier.py
-import sys
+import copy
 import logging
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from configs.setting import EMBEDDINGS_DIR, EMBED_MODEL_NAME
-
-# ---------------- Console Logging ----------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - [%(levelname)s] - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from configs.setting import ENTITY_PREFIX_CHARS, ENTITY_MIN_CONFIDENCE
+from rag_engine import registry
+
 logger = logging.getLogger(__name__)
 
 # ---------------- Entity Keyword Map ----------------
@@ -36,55 +34,288 @@ ENTITY_KEYWORDS = {
     ]
 }
 
+# Characters of streamed text kept for the embeddings fallback (the model truncates long input anyway)
+FALLBACK_PREFIX_CHARS = ENTITY_PREFIX_CHARS
+# Full-text input is fed to the matcher in pieces of this size so it can stop early
+SCAN_CHUNK_CHARS = 1024
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "-"
+
+
+# ---------------- Multi-pattern Matcher ----------------
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over lowercase keyword phrases, compiled to a full transition table.
+    feed() consumes text chunks in order, so a phrase split across chunks still matches;
+    runs of whitespace count as one space and matches must start and end on word boundaries.
+    Cost is one table lookup per character, whatever the number of keywords.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(dict.fromkeys(_WHITESPACE.sub(" ", p.lower()).strip() for p in patterns))
+        self._lengths = [len(p) for p in self.patterns]
+        self._max_len = max(self._lengths, default=0)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                if ch not in goto[state]:
+                    goto.append({})
+                    out.append([])
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            out[state].append(pattern_id)
+
+        # Breadth-first: fold failure links into the transitions (states only depend on shallower ones)
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            out[state] = out[state] + out[fail[state]]
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0) if state else 0
+                delta[state][ch] = child
+                queue.append(child)
+        self._delta = delta
+        self._out = out
+        self.reset()
+
+    def reset(self):
+        self._state = 0
+        self._tail = " " * (self._max_len + 1)  # text before the current chunk, for start boundaries
+        self._pending: List[int] = []            # matches waiting for their end boundary
+
+    def feed(self, text: str) -> List[int]:
+        """Advance over `text`; returns ids of patterns confirmed in this call."""
+        text = _WHITESPACE.sub(" ", text.lower())
+        if text.startswith(" ") and self._tail.endswith(" "):
+            text = text[1:]
+        delta, out, lengths = self._delta, self._out, self._lengths
+        history, offset = self._tail + text, len(self._tail)
+        state, pending, found = self._state, self._pending, []
+        for i, ch in enumerate(text):
+            if pending:
+                if not _is_word_char(ch):
+                    found.extend(pending)
+                pending = []
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                end = offset + i
+                pending = [pid for pid in out[state] if not _is_word_char(history[end - lengths[pid]])]
+        self._state, self._pending = state, pending
+        self._tail = history[-(self._max_len + 1):]
+        return found
+
+    def finish(self) -> List[int]:
+        """End of text: matches still waiting for an end boundary are confirmed."""
+        found, self._pending = self._pending, []
+        return found
+
+
+@lru_cache(maxsize=4)
+def _compiled(entity_keywords: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> KeywordMatcher:
+    return KeywordMatcher(word for _, keywords in entity_keywords for word in keywords)
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Fresh-state matcher for the current ENTITY_KEYWORDS (compiled once per keyword map)."""
+    key = tuple((entity, tuple(keywords)) for entity, keywords in ENTITY_KEYWORDS.items())
+    matcher = copy.copy(_compiled(key))
+    matcher.reset()
+    return matcher
+
+
+# ---------------- Keyword Scoring ----------------
+@dataclass
+class KeywordClassification:
+    """Outcome of the keyword pass; `text` is the streamed prefix kept for the embeddings fallback."""
+    entity_type: Optional[str]
+    confidence: float
+    scores: Dict[str, float]
+    text: str = ""
+
+
+def _rank(entity: str, matched: Set[str]) -> Tuple:
+    """
+    Complete matches first, then keyword coverage, then specificity (more keywords).
+    Remaining ties go to the entity listed first in ENTITY_KEYWORDS, the precedence
+    of the original first-match classifier.
+    """
+    keywords = ENTITY_KEYWORDS[entity]
+    hits = [word for word in keywords if word in matched]
+    return len(hits) == len(keywords), len(hits) / len(keywords), len(keywords), -list(ENTITY_KEYWORDS).index(entity)
+
+
+def _leader(matched: Set[str]) -> Tuple[Optional[str], float]:
+    """Best entity and its confidence."""
+    ranked = sorted(ENTITY_KEYWORDS, key=lambda e: _rank(e, matched), reverse=True)
+    best = ranked[0] if ranked else None
+    if best is None or not _rank(best, matched)[0]:
+        return None, 0.0
+    runner_up = _rank(ranked[1], matched)[1] if len(ranked) > 1 else 0.0
+    # 1.0 when nothing else matched at all, 0.5 when a second entity also matched completely
+    return best, round(1.0 - runner_up / 2, 3)
+
+
+def _decided(leader: str, matched: Set[str]) -> bool:
+    """
+    True when more text can change neither the result nor its confidence: no entity still
+    missing keywords could outrank `leader` by completing, and a second entity has already
+    matched completely (so the confidence is at its floor of 0.5).
+    """
+    leader_rank = _rank(leader, matched)[2:]
+    others = [_rank(entity, matched) for entity in ENTITY_KEYWORDS if entity != leader]
+    return any(rank[0] for rank in others) and all(rank[0] or rank[2:] < leader_rank for rank in others)
+
+
+class KeywordScanner:
+    """
+    Incremental keyword pass: feed() the text blocks of a document in order, then result().
+    `separator` goes between blocks: "\n" for document paragraphs/pages, "" for pieces
+    of one text (see _chunked). `decided` turns True once more text cannot change the
+    result, so callers that also need the rest of the document can stop feeding it.
+    """
+
+    def __init__(self, filename: str, separator: str = "\n"):
+        self.separator = separator
+        self.decided = False
+        self._matcher = get_keyword_matcher()
+        self._matched: Set[str] = set()
+        self._prefix, self._prefix_len = [], 0
+        self._started = False
+        self._update(self._matcher.feed(f"{filename} "))
+
+    def _update(self, pattern_ids: List[int]):
+        self._matched.update(self._matcher.patterns[pid] for pid in pattern_ids)
+
+    def feed(self, text: str) -> bool:
+        """Scan one more block; returns `decided`."""
+        if self.decided:
+            return True
+        if self._started:
+            text = self.separator + text
+        self._started = True
+        if self._prefix_len < FALLBACK_PREFIX_CHARS:
+            self._prefix.append(text[:FALLBACK_PREFIX_CHARS - self._prefix_len])
+            self._prefix_len += len(self._prefix[-1])
+        self._update(self._matcher.feed(text))
+
+        leader, _ = _leader(self._matched)
+        self.decided = bool(leader) and _decided(leader, self._matched)
+        return self.decided
+
+    def result(self) -> KeywordClassification:
+        """Result so far; without an early decision the text is taken to have ended."""
+        if not self.decided:
+            self._update(self._matcher.finish())
+        leader, confidence = _leader(self._matched)
+        scores = {entity: round(_rank(entity, self._matched)[1], 3) for entity in ENTITY_KEYWORDS}
+        return KeywordClassification(leader, confidence, scores, "".join(self._prefix))
+
+
+def classify_by_keywords_stream(blocks: Iterable, filename: str, separator: str = "\n") -> KeywordClassification:
+    """
+    Single pass of the keyword matcher over the filename and streamed text blocks
+    (str or objects with .text), scoring every entity type; see KeywordScanner.
+    Stops as soon as the result cannot change, so it always equals a full scan.
+    """
+    scanner = KeywordScanner(filename, separator)
+    for block in blocks:
+        if scanner.feed(getattr(block, "text", block)):
+            break
+    return scanner.result()
+
+
+def _chunked(text: str, size: int = SCAN_CHUNK_CHARS) -> Iterator[str]:
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def classify_by_keywords(text: str, filename: str) -> Optional[str]:
+    """Entity type whose keywords all occur in filename/content (best-scoring one if several do)."""
+    return classify_by_keywords_stream(_chunked(text), filename, separator="").entity_type
+
 # ---------------- Helper Functions ----------------
-def classify_by_keywords(text: str, filename: str):
-    """Check if keywords in filename/content match entity list."""
-    combined = f"{filename.lower()} {text.lower()}"
-    for entity, keywords in ENTITY_KEYWORDS.items():
-        if all(word in combined for word in keywords):
-            return entity
-    return None
-
-def classify_by_embeddings(text: str):
-    """Fallback: Use ChromaDB vector search to guess closest entity type."""
+def classify_by_embeddings(text: str) -> Tuple[Optional[str], float]:
+    """
+    Fallback: embed a bounded prefix of the document and compare it with the entity-type
+    prototypes built from the ADGM checklists. Returns (entity, calibrated probability);
+    the entity is None below ENTITY_MIN_CONFIDENCE.
+    """
     try:
-        embeddings = HuggingFaceEmbeddings(model_name=EMBED_MODEL_NAME)
-        db = Chroma(persist_directory=str(EMBEDDINGS_DIR), embedding_function=embeddings)
-        results = db.similarity_search(text, k=1)
-        if results:
-            return results[0].metadata.get("category")
+        prototypes = registry.get_entity_prototypes()
+        if prototypes is None:
+            logger.warning("No entity prototypes available; build the index with rag_engine/embedder.py.")
+            return None, 0.0
+        embedding = registry.get_embeddings().embed_query(text[:FALLBACK_PREFIX_CHARS])
+        entity, confidence = prototypes.classify(embedding)
+        confidence = round(confidence, 3)
+        if confidence < ENTITY_MIN_CONFIDENCE:
+            logger.info(f"Closest entity prototype {entity} below confidence threshold ({confidence})")
+            return None, confidence
+        return entity, confidence
     except Exception as e:
         logger.error(f"Embedding-based classification failed: {e}")
-    return None
+    return None, 0.0
+
+def classify_document(file_path: str, file_text: Union[str, Iterable]):
+    """
+    Main classification logic.
+    `file_text` is the full text or an iterable of text blocks (e.g. doc_parser.iter_document),
+    which is only consumed until the keyword result is decided.
+    Returns entity_type, category, method ("keywords" / "embeddings") and confidence (0-1).
+    """
+    filename = Path(file_path).stem
+    if isinstance(file_text, str):
+        keyword_result = classify_by_keywords_stream(_chunked(file_text), filename, separator="")
+    else:
+        keyword_result = classify_by_keywords_stream(file_text, filename)
+    return classify_scanned(file_path, keyword_result)
 
-def classify_document(file_path: str, file_text: str):
-    """Main classification logic."""
+def classify_scanned(file_path: str, keyword_result: KeywordClassification):
+    """
+    classify_document() for a keyword pass the caller already ran (e.g. a KeywordScanner
+    fed while the document was being sectioned); falls back to embeddings.
+    """
     filename = Path(file_path).stem
     logger.info(f"Classifying document: {filename}")
 
     # 1: Try keyword classification
-    entity_type = classify_by_keywords(file_text, filename)
-    if entity_type:
-        logger.info(f"Matched entity via keywords: {entity_type}")
+    if keyword_result.entity_type:
+        logger.info(f"Matched entity via keywords: {keyword_result.entity_type} "
+                    f"(confidence {keyword_result.confidence})")
         return {
-            "entity_type": entity_type,
-            "category": "checklists_docs" if "checklist" in filename.lower() else "templates"
+            "entity_type": keyword_result.entity_type,
+            "category": "checklists_docs" if "checklist" in filename.lower() else "templates",
+            "method": "keywords",
+            "confidence": keyword_result.confidence
         }
 
     # 2: Try embeddings fallback
-    entity_type = classify_by_embeddings(file_text)
+    entity_type, confidence = classify_by_embeddings(keyword_result.text)
     if entity_type:
-        logger.info(f"Matched entity via embeddings: {entity_type}")
+        logger.info(f"Matched entity via embeddings: {entity_type} (confidence {confidence})")
         return {
             "entity_type": entity_type,
-            "category": "unknown"
+            "category": "unknown",
+            "method": "embeddings",
+            "confidence": confidence
         }
 
     logger.warning("No classification match found.")
-    return {"entity_type": None, "category": None}
+    return {"entity_type": None, "category": None, "method": None, "confidence": confidence}
 
 # ---------------- Test ----------------
 if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
     # Example test data
     sample_file = "uploaded_docs/sample_adgm_checklist.pdf"
     sample_text = "Private Company Limited by Shares – Non-Financial Services Checklist ..."
@@ -1,37 +1,160 @@
 # module/doc_parser.py
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-import pdfplumber
-import docx
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union
 import logging
-import sys
-
-# ---------------- Console Logging ----------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - [%(levelname)s] - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+import time
+
+from modules import instrumentation
+from modules.sectioner import Section, iter_structured_sections
+from configs.setting import PDF_WORKERS, PDF_PARALLEL_MIN_PAGES
+
 logger = logging.getLogger(__name__)
 
+# ---------------- Parsed Document ----------------
+@dataclass
+class ParsedDocument:
+    """
+    Everything the pipeline needs about one file, produced once by load_document()
+    and passed to the classifier, red-flag detector and commentor.
+    The document text is held once, in its sections.
+    """
+    path: Path
+    sections: List[Section] = field(default_factory=list)  # clause-level units with paragraph/page offsets
+    classification: Dict = field(default_factory=dict)
+    docx_document: Optional[Any] = None  # docx.Document for DOCX inputs
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def entity_type(self) -> Optional[str]:
+        return self.classification.get("entity_type")
+
+    @property
+    def section_texts(self) -> List[str]:
+        return [section.text for section in self.sections]
+
+    @property
+    def text(self) -> str:
+        """Whole text, joined from the sections on each access (not stored)."""
+        return "\n".join(self.section_texts)
+
+    @property
+    def is_docx(self) -> bool:
+        return self.path.suffix.lower() == ".docx"
+
+# ---------------- Streaming Extraction ----------------
+class TextBlock(NamedTuple):
+    """One page (PDF) or paragraph (DOCX) of text plus where it came from."""
+    text: str
+    page: Optional[int] = None       # 0-based PDF page number
+    paragraph: Optional[int] = None  # index into docx Document.paragraphs
+    style: Optional[str] = None      # DOCX paragraph style name
+    list_level: Optional[int] = None # DOCX auto-numbering level (0 = top level)
+
+def iter_pdf_pages(file_path: Path, workers: Optional[int] = None) -> Iterator[TextBlock]:
+    """
+    Yield one TextBlock per PDF page, in page order; each page's layout cache is released
+    before the next. PDFs with at least PDF_PARALLEL_MIN_PAGES pages are split into contiguous
+    page ranges extracted by a process pool of `workers` (default PDF_WORKERS, 1 = in-process);
+    pages are yielded range by range as the pool finishes them.
+    """
+    import pdfplumber
+    workers = PDF_WORKERS if workers is None else workers
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+        if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+            for page_no, page in enumerate(pdf.pages):
+                text = page.extract_text() or ""
+                page.flush_cache()
+                yield TextBlock(text=text, page=page_no)
+            return
+
+    # A few ranges per worker keeps the pool busy when some pages are much heavier
+    n_ranges = min(page_count, workers * 4)
+    step = -(-page_count // n_ranges)
+    ranges = [(str(file_path), start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    logger.info(f"Extracting {page_count} pages of {Path(file_path).name} with {workers} workers")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (_, start, _), texts in zip(ranges, pool.map(_extract_pdf_page_range, ranges)):
+            for offset, text in enumerate(texts):
+                yield TextBlock(text=text, page=start + offset)
+
+def iter_docx_paragraphs(source: Union[Path, Any]) -> Iterator[TextBlock]:
+    """Yield non-empty DOCX paragraphs; `source` is a path or an already loaded docx.Document."""
+    import docx
+    doc = source if hasattr(source, "paragraphs") else docx.Document(source)
+    for idx, para in enumerate(doc.paragraphs):
+        if para.text.strip():
+            yield TextBlock(text=para.text, paragraph=idx,
+                            style=para.style.name if para.style is not None else None,
+                            list_level=_list_level(para))
+
+def _list_level(para) -> Optional[int]:
+    """Word auto-numbering level of a paragraph, or None if it is not numbered."""
+    p_pr = para._p.pPr
+    if p_pr is None or p_pr.numPr is None:
+        return None
+    ilvl = p_pr.numPr.ilvl
+    return ilvl.val if ilvl is not None else 0
+
+def iter_document(file_path: str, docx_document: Optional[Any] = None) -> Iterator[TextBlock]:
+    """
+    Stream a PDF/DOCX as TextBlocks; unsupported or missing files yield nothing.
+    An already loaded `docx_document` is read instead of reopening the file.
+    """
+    path_obj = Path(file_path)
+    if docx_document is not None:
+        yield from iter_docx_paragraphs(docx_document)
+        return
+    if not path_obj.exists():
+        logger.error(f"File not found: {file_path}")
+        return
+    suffix = path_obj.suffix.lower()
+    if suffix == ".pdf":
+        yield from iter_pdf_pages(path_obj)
+    elif suffix == ".docx":
+        yield from iter_docx_paragraphs(path_obj)
+    else:
+        logger.warning(f"Unsupported file type: {path_obj.suffix}")
+
 # ---------------- Functions ----------------
-def extract_text_from_pdf(file_path: Path) -> str:
+def _extract_pdf_page_range(args) -> List[str]:
+    """Worker: extract pages [start, end) of a PDF (runs in a child process)."""
+    import pdfplumber
+    file_path, start, end = args
+    pages = []
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:end]:
+            pages.append(page.extract_text() or "")
+            page.flush_cache()
+    return pages
+
+def extract_pdf_pages(file_path: Path, workers: Optional[int] = None) -> List[str]:
+    """Return the text of every page, in page order (see iter_pdf_pages for `workers`)."""
+    return [block.text for block in iter_pdf_pages(file_path, workers)]
+
+def extract_text_from_pdf(file_path: Path, workers: Optional[int] = None) -> str:
     """Extract text from a PDF file."""
-    text = ""
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        pages = extract_pdf_pages(file_path, workers)
     except Exception as e:
         logger.error(f"Error reading PDF {file_path.name}: {e}")
-    return text.strip()
+        return ""
+    return "\n".join(text for text in pages if text).strip()
+
+def docx_to_text(doc) -> str:
+    """Join the non-empty paragraphs of an already loaded docx.Document."""
+    return "\n".join(block.text for block in iter_docx_paragraphs(doc))
 
 def extract_text_from_docx(file_path: Path) -> str:
     """Extract text from a DOCX file."""
+    import docx
     try:
-        doc = docx.Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+        return docx_to_text(docx.Document(file_path))
     except Exception as e:
         logger.error(f"Error reading DOCX {file_path.name}: {e}")
         return ""
@@ -56,8 +179,64 @@ def parse_document(file_path: str) -> str:
         logger.warning(f"Unsupported file type: {path_obj.suffix}")
         return ""
 
+def load_document(file_path: str, classify: bool = True) -> ParsedDocument:
+    """
+    Read, parse, split into clause-level sections and (optionally) classify a file exactly once.
+    Blocks stream from iter_document() straight into the sectioner, and the keyword classifier
+    reads them on the way, so pages are never collected into one text; the sections hold
+    the only copy. DOCX files keep their loaded docx.Document so annotation does not reopen them.
+    """
+    import docx
+    from modules.doc_classifier import KeywordScanner, classify_scanned  # keeps the retrieval stack out of parser imports
+    path_obj = Path(file_path)
+    parsed = ParsedDocument(path=path_obj)
+    if not path_obj.exists():
+        logger.error(f"File not found: {file_path}")
+        return parsed
+
+    logger.info(f"Parsing document: {path_obj.name}")
+    scanner = KeywordScanner(path_obj.stem) if classify else None
+    seconds = {"parse": 0.0, "classify": 0.0}
+
+    def blocks() -> Iterator[TextBlock]:
+        """iter_document() with the keyword scan on the way; times both stages."""
+        stream = iter_document(str(path_obj), parsed.docx_document)
+        while True:
+            start = time.perf_counter()
+            block = next(stream, None)
+            seconds["parse"] += time.perf_counter() - start
+            if block is None:
+                return
+            if scanner is not None and not scanner.decided and block.text:
+                start = time.perf_counter()
+                scanner.feed(block.text)
+                seconds["classify"] += time.perf_counter() - start
+            yield block
+
+    start = time.perf_counter()
+    try:
+        if path_obj.suffix.lower() == ".docx":
+            parsed.docx_document = docx.Document(path_obj)
+        parsed.sections = list(iter_structured_sections(blocks()))
+    except Exception as e:
+        logger.error(f"Error reading {path_obj.suffix.lstrip('.').upper()} {path_obj.name}: {e}")
+        parsed.sections = []
+    instrumentation.observe_stage("parse", seconds["parse"])
+    instrumentation.observe_stage("sectioning", time.perf_counter() - start - seconds["parse"] - seconds["classify"])
+    instrumentation.inc("sections", len(parsed.sections))
+    for section in parsed.sections:
+        instrumentation.observe("section_chars", len(section.text))
+
+    if scanner is not None and parsed.sections:
+        start = time.perf_counter()
+        parsed.classification = classify_scanned(str(path_obj), scanner.result())
+        instrumentation.observe_stage("classify", seconds["classify"] + time.perf_counter() - start)
+    return parsed
+
 # ---------------- Test ----------------
 if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
     # Example test
     sample_pdf = "uploaded_docs/sample.pdf"
     sample_docx = "uploaded_docs/sample.docx"
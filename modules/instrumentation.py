@@ -0,0 +1,239 @@
+# module/instrumentation.py
+# Lightweight timing spans, counters and histograms for every pipeline stage.
+# Observations go to the process-wide `metrics` registry (exported in Prometheus
+# text format) and to the collector of the document being processed, if any.
+import cProfile
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from configs.setting import METRICS_ENABLED, METRICS_MAX_SAMPLES, PROFILE_ENABLED, PROFILE_DIR
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "compliance"
+
+
+def _quantile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class _Histogram:
+    """Exact count/sum/max plus a bounded window of recent samples for quantiles."""
+
+    def __init__(self, max_samples: int = METRICS_MAX_SAMPLES):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=max_samples)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def summary(self) -> Dict:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "p50": round(_quantile(ordered, 0.5), 6),
+            "p95": round(_quantile(ordered, 0.95), 6),
+            "max": round(self.max, 6)
+        }
+
+
+class Metrics:
+    """
+    Thread-safe counters, histograms and stage timings.
+    Stage timings are histograms of seconds keyed by stage name ("parse", "llm_call", ...).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, _Histogram] = {}
+        self.stages: Dict[str, _Histogram] = {}
+
+    def inc(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self.histograms.setdefault(name, _Histogram()).observe(value)
+
+    def observe_stage(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages.setdefault(stage, _Histogram()).observe(seconds)
+
+    def merge(self, samples: Dict):
+        """Add raw samples exported by samples() from another collector (e.g. a worker process)."""
+        for name, value in samples.get("counters", {}).items():
+            self.inc(name, value)
+        for name, values in samples.get("histograms", {}).items():
+            for value in values:
+                self.observe(name, value)
+        for stage, values in samples.get("stages", {}).items():
+            for value in values:
+                self.observe_stage(stage, value)
+
+    def samples(self) -> Dict:
+        """Raw observations, for shipping to another process and merge()."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {name: list(h.samples) for name, h in self.histograms.items()},
+                "stages": {stage: list(h.samples) for stage, h in self.stages.items()}
+            }
+
+    def snapshot(self) -> Dict:
+        """JSON-ready summary: counters, stage latency (count/sum/p50/p95/max seconds) and histograms."""
+        with self._lock:
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "stage_seconds": {stage: h.summary() for stage, h in sorted(self.stages.items())},
+                "histograms": {name: h.summary() for name, h in sorted(self.histograms.items())}
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.stages.clear()
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition: counters as *_total, stages and histograms as summaries."""
+        snap = self.snapshot()
+        lines = []
+        for name, value in snap["counters"].items():
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+
+        def summary(metric: str, label: str, summaries: Dict):
+            if not summaries:
+                return
+            lines.append(f"# TYPE {metric} summary")
+            for key, s in summaries.items():
+                labels = f'{label}="{key}",' if label else ""
+                for q in ("p50", "p95"):
+                    lines.append(f'{metric}{{{labels}quantile="0.{q[1:]}"}} {s[q]}')
+                suffix = f'{{{labels.rstrip(",")}}}' if labels else ""
+                lines.append(f"{metric}_sum{suffix} {s['sum']}")
+                lines.append(f"{metric}_count{suffix} {s['count']}")
+
+        summary(f"{METRIC_PREFIX}_stage_seconds", "stage", snap["stage_seconds"])
+        for name, s in snap["histograms"].items():
+            summary(f"{METRIC_PREFIX}_{name}", "", {name: s})
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        Path(path).write_text(self.to_prometheus(), encoding="utf-8")
+        logger.info(f"Prometheus metrics written to {path}")
+
+
+# Process-wide registry (cumulative) and the collector of the document being processed
+metrics = Metrics()
+_current: contextvars.ContextVar[Optional[Metrics]] = contextvars.ContextVar("document_metrics", default=None)
+
+
+# ---------------- Recording API ----------------
+def inc(name: str, value: float = 1):
+    if not METRICS_ENABLED:
+        return
+    metrics.inc(name, value)
+    current = _current.get()
+    if current is not None:
+        current.inc(name, value)
+
+
+def observe(name: str, value: float):
+    if not METRICS_ENABLED:
+        return
+    metrics.observe(name, value)
+    current = _current.get()
+    if current is not None:
+        current.observe(name, value)
+
+
+def observe_stage(stage: str, seconds: float):
+    """One observation of `stage` timed by the caller (for stages that run interleaved)."""
+    if not METRICS_ENABLED:
+        return
+    metrics.observe_stage(stage, seconds)
+    current = _current.get()
+    if current is not None:
+        current.observe_stage(stage, seconds)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a block as one observation of `stage`."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def document_metrics() -> Iterator[Metrics]:
+    """Collect everything recorded in this context (and in threads started via bind_context) separately."""
+    collector = Metrics()
+    token = _current.set(collector)
+    try:
+        yield collector
+    finally:
+        _current.reset(token)
+
+
+def bind_context(fn):
+    """
+    Wrap `fn` so it runs in a copy of the caller's context: thread-pool workers
+    then record into the same document collector as the submitting thread.
+    """
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+# ---------------- Profiling ----------------
+def profiling_enabled() -> bool:
+    """PROFILE_ENABLED, or env COMPLIANCE_PROFILE=1 for one run."""
+    return PROFILE_ENABLED or os.getenv("COMPLIANCE_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+@contextmanager
+def profiled(name: str) -> Iterator[Dict]:
+    """
+    Opt-in cProfile capture of a block. Yields a dict that receives `profile_path`
+    (a .prof file for snakeviz / pstats) when profiling is on; otherwise does nothing.
+    """
+    info: Dict = {}
+    if not profiling_enabled():
+        yield info
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield info
+    finally:
+        profiler.disable()
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        path = PROFILE_DIR / f"{safe_name}-{datetime.now():%Y%m%d-%H%M%S-%f}.prof"
+        profiler.dump_stats(str(path))
+        info["profile_path"] = str(path)
+        logger.info(f"cProfile written to {path}")
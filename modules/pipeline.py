@@ -0,0 +1,92 @@
+# module/pipeline.py
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from modules import instrumentation
+from modules.doc_parser import load_document
+from modules.checklist_verifier import verify_checklist
+from modules.redflag_detector import iter_red_flags
+from modules.commentor import add_comments_to_docx
+from modules.report_generator import build_report
+
+logger = logging.getLogger(__name__)
+
+
+def annotated_path_for(file_path: Path, annotate_dir: Optional[Path] = None) -> Path:
+    """Where the annotated copy of a DOCX is written (next to it unless annotate_dir is given)."""
+    target_dir = Path(annotate_dir) if annotate_dir else file_path.parent
+    return target_dir / (file_path.stem + "_annotated.docx")
+
+
+def process_document(file_path: str, annotate_dir: Optional[str] = None) -> Dict:
+    """
+    Run parse → classify → checklist → red flags → annotate → report for one file.
+    Returns the report dict plus `file`, `status` ("ok" / "error") and, on failure, `error`.
+    `metrics` holds this document's stage timings and counters (and `profile_path` when
+    cProfile capture is on, see modules.instrumentation.profiled).
+    """
+    for event in iter_process_document(file_path, annotate_dir):
+        if event["type"] == "done":
+            return event["record"]
+
+
+def iter_process_document(file_path: str, annotate_dir: Optional[str] = None) -> Iterator[Dict]:
+    """
+    process_document as a stream of progress events, for callers that show results as they come:
+      {"type": "classified", "entity_type": ..., "sections": n}  once the file is parsed and classified
+      {"type": "finding", "index": i, "finding": {...}}            per section, as soon as it is checked
+      {"type": "done", "record": {...}}                            always last; the process_document() result
+    Stage timings include whatever the caller does between events.
+    """
+    path_obj = Path(file_path)
+    record = {"file": str(path_obj), "status": "error"}
+
+    with instrumentation.document_metrics() as doc_metrics, \
+            instrumentation.profiled(path_obj.stem) as profile:
+        with instrumentation.span("document"):
+            yield from _iter_stages(path_obj, annotate_dir, record)
+        instrumentation.inc(f"documents_{record['status']}")
+    if instrumentation.METRICS_ENABLED:
+        record["metrics"] = doc_metrics.snapshot()
+    if profile:
+        record.setdefault("metrics", {}).update(profile)
+    yield {"type": "done", "record": record}
+
+
+def _iter_stages(path_obj: Path, annotate_dir: Optional[str], record: Dict) -> Iterator[Dict]:
+    """Fill `record` in place, yielding progress events; stops early when the file cannot be parsed or classified."""
+    parsed_doc = load_document(str(path_obj))
+    if not parsed_doc.sections:
+        record["error"] = "Could not parse document"
+        return
+    entity_type = parsed_doc.entity_type
+    if not entity_type:
+        record["error"] = "Could not classify document"
+        return
+
+    with instrumentation.span("checklist"):
+        checklist_results = verify_checklist(entity_type)
+    yield {"type": "classified", "entity_type": entity_type, "sections": len(parsed_doc.sections)}
+
+    findings = {}
+    start = time.perf_counter()
+    with instrumentation.span("red_flags"):
+        for idx, finding in iter_red_flags(parsed_doc):
+            if not findings:
+                instrumentation.observe("first_finding_seconds", time.perf_counter() - start)
+            findings[idx] = finding
+            yield {"type": "finding", "index": idx, "finding": finding}
+    redflag_findings = [findings[idx] for idx in sorted(findings)]
+
+    annotated_path = "N/A"
+    if parsed_doc.is_docx:
+        target = annotated_path_for(path_obj, annotate_dir)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with instrumentation.span("annotate"):
+            if add_comments_to_docx(parsed_doc, redflag_findings, str(target)):
+                annotated_path = str(target)
+
+    record.update(build_report(entity_type, checklist_results, redflag_findings, annotated_path))
+    record["status"] = "ok"
@@ -1,52 +1,44 @@
 # module/redflag_detector.py
-from typing import List, Dict
-import logging, sys
+from typing import Callable, Iterator, List, Dict, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import queue
+import re
 
-from modules.doc_parser import parse_document
-from modules.doc_classifier import classify_document
-from rag_engine.retriever import get_retriever
+from modules import instrumentation
+from modules.doc_parser import ParsedDocument, load_document
+from modules.template_matcher import TemplateMatch, match_template
+from rag_engine.retriever import retrieve
 from rag_engine.llm_client import ask_gemini  # Our Gemini client
-
-# ---------------- Console Logging ----------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - [%(levelname)s] - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
+from rag_engine.context_builder import assemble_context
+from rag_engine.tokens import count_tokens
+from configs.setting import (
+    LLM_MAX_WORKERS, TEMPLATE_MATCH_ENABLED,
+    LLM_BATCH_MODE, LLM_BATCH_TOKEN_BUDGET, LLM_BATCH_MAX_CLAUSES
 )
+
 logger = logging.getLogger(__name__)
 
+# "severity": "High" inside an answer that is not valid JSON
+_SEVERITY = re.compile(r'"?severity"?\s*:\s*"?([A-Za-z]+)', re.IGNORECASE)
 
-def detect_red_flags(file_path: str) -> List[Dict]:
-    """
-    Parse a document, classify it, then check each section for compliance issues
-    using RAG retrieval + Gemini LLM.
-    """
-    # Step 1: Parse document into raw text
-    text = parse_document(file_path)
-    if not text:
-        logger.warning("No text extracted from document.")
-        return []
 
-    # (Optional) Split document into sections by paragraphs for focused checking
-    sections = [sec.strip() for sec in text.split("\n\n") if sec.strip()]
-    
-    # Step 2: Classify
-    classification = classify_document(file_path, text)
-    logger.info(f"Classification: {classification}")
+def template_conformance_analysis(sec: str, match: TemplateMatch) -> str:
+    """The JSON answer recorded for a clause that matches official template wording."""
+    return json.dumps({
+        "section_summary": sec[:80],
+        "issue": "None – clause matches official ADGM template wording; LLM review skipped.",
+        "reference": match.template,
+        "severity": "None"
+    }, ensure_ascii=False)
 
-    # Step 3: Get retriever
-    retriever = get_retriever()
 
-    findings = []
-    for sec in sections:
-        # Step 4: Retrieve relevant ADGM rules
-        retrieved_docs = retriever.get_relevant_documents(sec)
-        references_text = "\n\n".join([doc.page_content for doc in retrieved_docs])
-        
-        # Step 5: Build prompt for Gemini
-        prompt = f"""
+def build_prompt(sec: str, references_text: str, entity_type: Optional[str]) -> str:
+    """Single-clause review prompt."""
+    return f"""
         You are an ADGM corporate compliance checker.
-        Entity Type: {classification.get("entity_type")}
+        Entity Type: {entity_type}
         Document Clause:
         \"\"\"{sec}\"\"\"
         
@@ -61,19 +53,330 @@ def detect_red_flags(file_path: str) -> List[Dict]:
         Respond in JSON with fields: section_summary, issue, reference, severity.
         """
 
-        # Step 6: Call Gemini
-        response = ask_gemini(prompt)
 
-        # Step 7: Store finding
-        findings.append({
-            "section": sec[:80] + "...",  # preview of section
-            "ai_analysis": response
-        })
+def pack_clauses(clauses: List[str], contexts: List[List[str]],
+                 token_budget: int = LLM_BATCH_TOKEN_BUDGET,
+                 max_clauses: int = LLM_BATCH_MAX_CLAUSES) -> List[List[int]]:
+    """
+    Group consecutive clause indices so each group's clauses plus its de-duplicated
+    context stay within `token_budget` tokens. A clause that alone exceeds
+    the budget gets a group of its own.
+    """
+    groups, current, seen, used = [], [], set(), 0
+    for idx, (clause, chunks) in enumerate(zip(clauses, contexts)):
+        new_chunks = [chunk for chunk in dict.fromkeys(chunks) if chunk not in seen]
+        cost = count_tokens(clause) + sum(count_tokens(chunk) for chunk in new_chunks)
+        if current and (used + cost > token_budget or len(current) >= max_clauses):
+            groups.append(current)
+            current, seen, used = [], set(), 0
+            new_chunks = list(dict.fromkeys(chunks))
+            cost = count_tokens(clause) + sum(count_tokens(chunk) for chunk in new_chunks)
+        current.append(idx)
+        seen.update(new_chunks)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_batch_prompt(clauses: List[str], contexts: List[List[str]], entity_type: Optional[str]) -> str:
+    """
+    Multi-clause review prompt: retrieved chunks are listed once as [R#] and each
+    clause [C#] points at the chunks retrieved for it.
+    """
+    ref_ids = {}
+    for chunks in contexts:
+        for chunk in chunks:
+            ref_ids.setdefault(chunk, f"R{len(ref_ids) + 1}")
+    references = "\n\n".join(f"[{ref_id}]\n{chunk}" for chunk, ref_id in ref_ids.items())
+    clause_blocks = "\n\n".join(
+        f"[C{n}] (relevant context: {', '.join(dict.fromkeys(ref_ids[c] for c in chunks)) or 'none'})\n"
+        f"\"\"\"{clause}\"\"\""
+        for n, (clause, chunks) in enumerate(zip(clauses, contexts), start=1)
+    )
+    return f"""
+        You are an ADGM corporate compliance checker.
+        Entity Type: {entity_type}
+
+        ADGM Regulations & Guidance (retrieved context):
+        \"\"\"{references}\"\"\"
+
+        Document Clauses:
+        {clause_blocks}
+
+        Task, for EACH clause:
+        - Check if this clause fully complies with ADGM rules.
+        - Flag any compliance risks, missing info, or deviations.
+        - Mention the relevant ADGM reference title if possible.
+        - Rate severity as Low/Medium/High.
+        Respond with a JSON array only, one object per clause, with fields:
+        clause_id (e.g. "C1"), section_summary, issue, reference, severity.
+        """
+
+
+def _strip_code_fence(response: str) -> str:
+    """The answer without a surrounding ```json fence."""
+    text = response.strip()
+    if text.startswith("```"):
+        text = text.strip("`").strip()
+        if text.lower().startswith("json"):
+            text = text[4:]
+    return text
+
+
+def parse_severity(analysis: str) -> str:
+    """
+    Severity rated in a clause's JSON answer ("Low", "Medium", "High" or "None"),
+    or "Unknown" when the answer has none.
+    """
+    severity = None
+    try:
+        item = json.loads(_strip_code_fence(analysis))
+        if isinstance(item, dict):
+            severity = item.get("severity")
+    except json.JSONDecodeError:
+        match = _SEVERITY.search(analysis)
+        severity = match.group(1) if match else None
+    if not isinstance(severity, str) or not severity.strip():
+        return "Unknown"
+    return severity.strip().capitalize()
+
+
+def parse_batch_response(response: str, n_clauses: int) -> Optional[List[str]]:
+    """
+    Split a batched JSON-array answer into one JSON string per clause (in clause order).
+    Returns None if the response is not a JSON array covering every clause id.
+    """
+    text = _strip_code_fence(response)
+    try:
+        items = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(items, list):
+        return None
+
+    by_id = {}
+    for item in items:
+        if isinstance(item, dict) and "clause_id" in item:
+            by_id[str(item["clause_id"]).strip().upper()] = item
+    answers = []
+    for n in range(1, n_clauses + 1):
+        item = by_id.get(f"C{n}")
+        if item is None:
+            return None
+        answers.append(json.dumps({k: v for k, v in item.items() if k != "clause_id"}, ensure_ascii=False))
+    return answers
+
+
+class BatchAnswerStream:
+    """
+    Incremental reader of a streamed batched answer: feed() the text received so far and get
+    back the [C#] objects completed since the last call, as (clause position, JSON string).
+    """
+
+    def __init__(self, n_clauses: int):
+        self.n_clauses = n_clauses
+        self.answers: Dict[int, str] = {}
+        self._decoder = json.JSONDecoder()
+        self._text = ""
+        self._pos: Optional[int] = None
+
+    def feed(self, text: str) -> List[Tuple[int, str]]:
+        if not text.startswith(self._text):
+            self._pos = None  # a retry started the answer over
+        self._text = text
+        if self._pos is None:
+            start = text.find("[")
+            if start < 0:
+                return []
+            self._pos = start + 1
+
+        completed = []
+        while True:
+            pos = self._pos
+            while pos < len(text) and text[pos] in " \t\r\n,":
+                pos += 1
+            self._pos = pos
+            if pos >= len(text) or text[pos] == "]":
+                return completed
+            try:
+                item, self._pos = self._decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                return completed  # value still incomplete
+            clause_id = str(item.get("clause_id", "")).strip().upper() if isinstance(item, dict) else ""
+            if clause_id[1:].isdigit() and clause_id.startswith("C"):
+                i = int(clause_id[1:]) - 1
+                if 0 <= i < self.n_clauses and i not in self.answers:
+                    self.answers[i] = json.dumps({k: v for k, v in item.items() if k != "clause_id"},
+                                                 ensure_ascii=False)
+                    completed.append((i, self.answers[i]))
+
+
+def review_batch(clauses: List[str], contexts: List[List[str]], entity_type: Optional[str],
+                 on_answer: Optional[Callable[[int, str], None]] = None) -> List[str]:
+    """
+    One Gemini request for several clauses; falls back to one request per clause if unparseable.
+    `on_answer(position, answer)` is called once per clause as soon as its answer is known;
+    batched answers are then streamed and split while Gemini is still generating them.
+    """
+    emit = on_answer or (lambda i, answer: None)
+    if len(clauses) == 1:
+        answer = ask_gemini(build_prompt(clauses[0], "\n\n".join(contexts[0]), entity_type))
+        emit(0, answer)
+        return [answer]
+
+    stream = BatchAnswerStream(len(clauses))
+
+    def on_chunk(text: str):
+        for i, answer in stream.feed(text):
+            emit(i, answer)
+
+    response = ask_gemini(build_batch_prompt(clauses, contexts, entity_type),
+                          on_chunk=on_chunk if on_answer else None)
+    answers = parse_batch_response(response, len(clauses))
+    if answers is None:
+        logger.warning(f"Could not parse batched answer for {len(clauses)} clauses; falling back to single-clause requests.")
+        instrumentation.inc("llm_batch_fallbacks")
+        answers = []
+        for i, (clause, chunks) in enumerate(zip(clauses, contexts)):
+            answer = stream.answers.get(i)  # complete objects already streamed are kept
+            if answer is None:
+                answer = ask_gemini(build_prompt(clause, "\n\n".join(chunks), entity_type))
+                emit(i, answer)
+            answers.append(answer)
+        return answers
+    for i, answer in enumerate(answers):
+        if i not in stream.answers:
+            emit(i, answer)
+    return answers
+
+
+def detect_red_flags(document: Union[str, ParsedDocument], max_workers: Optional[int] = None,
+                     batch: Optional[bool] = None) -> List[Dict]:
+    """
+    Check each section of a parsed + classified document for compliance issues
+    using RAG retrieval + Gemini LLM. A file path is parsed and classified first.
+    Gemini calls run on `max_workers` threads (default LLM_MAX_WORKERS, 1 = sequential);
+    findings are returned in section order.
+    Clauses matching official ADGM template wording are marked conforming without an LLM call.
+    With `batch` (default LLM_BATCH_MODE) several clauses share one request within LLM_BATCH_TOKEN_BUDGET.
+    """
+    findings = dict(iter_red_flags(document, max_workers, batch))
+    return [findings[idx] for idx in sorted(findings)]
+
+
+def iter_red_flags(document: Union[str, ParsedDocument], max_workers: Optional[int] = None,
+                   batch: Optional[bool] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    detect_red_flags as a generator of (section index, finding), yielded as soon as each
+    section is done: template-conforming sections first, then reviewed sections in the order
+    their answers arrive (batched answers are split while Gemini is still streaming them).
+    """
+    batch = LLM_BATCH_MODE if batch is None else batch
+
+    # Step 1 + 2: Parse and classify (skipped when the caller already did it)
+    doc = document if isinstance(document, ParsedDocument) else load_document(document)
+    if not doc.sections:
+        logger.warning("No text extracted from document.")
+        return
+
+    sections = doc.section_texts
+    classification = doc.classification
+    entity_type = classification.get("entity_type")
+    logger.info(f"Classification: {classification}")
+
+    # Step 3: Template pre-check (clauses copied from official templates need no review)
+    with instrumentation.span("template_match"):
+        template_matches = [match_template(sec) if TEMPLATE_MATCH_ENABLED else None for sec in sections]
+    review_idx = [idx for idx, match in enumerate(template_matches) if match is None]
+    review_sections = [sections[idx] for idx in review_idx]
+    skipped = len(sections) - len(review_sections)
+    instrumentation.inc("sections_template_skipped", skipped)
+    if skipped:
+        logger.info(f"⏭️ {skipped}/{len(sections)} sections match ADGM template wording; LLM review skipped.")
+
+    def make_finding(idx: int, analysis: str, stats: Optional[Dict] = None) -> Dict:
+        match = template_matches[idx]
+        finding = {
+            "section": sections[idx][:80] + "...",  # preview of section
+            "ai_analysis": analysis,
+            "severity": parse_severity(analysis)
+        }
+        if match:
+            finding["llm_skipped"] = True
+            finding["template_match"] = match._asdict()
+        else:
+            finding["context_tokens"] = stats
+        # Exact source location lets the commentor skip fuzzy matching
+        section = doc.sections[idx]
+        if section.anchor_paragraph is not None:
+            finding["paragraph_index"] = section.anchor_paragraph
+        finding["location"] = section.location()
+        return finding
+
+    for idx, match in enumerate(template_matches):
+        if match:
+            yield idx, make_finding(idx, template_conformance_analysis(sections[idx], match))
+    if not review_sections:
+        return
+
+    # Step 4: Retrieve relevant ADGM rules for all remaining sections in one batch
+    with instrumentation.span("retrieve"):
+        retrieved_per_section = retrieve(review_sections)
+
+    # Step 4b: Assemble each clause's context (dedup overlap, MMR, token budget)
+    contexts, context_stats = [], []
+    with instrumentation.span("assemble_context"):
+        for retrieved_docs in retrieved_per_section:
+            chunks, stats = assemble_context(retrieved_docs)
+            contexts.append(chunks)
+            context_stats.append(stats)
+            instrumentation.observe("context_tokens", stats["used_tokens"])
+    saved = sum(stats["saved_tokens"] for stats in context_stats)
+    if saved:
+        logger.info(f"Context assembly saved {saved} tokens across {len(context_stats)} prompts.")
+
+    # Step 5: Group clauses into requests (one clause per request unless batching)
+    if batch:
+        groups = pack_clauses(review_sections, contexts)
+    else:
+        groups = [[i] for i in range(len(review_sections))]
+
+    # Answers of all workers arrive here as (review position, answer); (None, exception) on failure
+    arrivals = queue.Queue()
+
+    def run_group(group: List[int]):
+        instrumentation.observe("clauses_per_request", len(group))
+        try:
+            with instrumentation.span("review_request"):
+                review_batch([review_sections[i] for i in group], [contexts[i] for i in group], entity_type,
+                             on_answer=lambda position, answer: arrivals.put((group[position], answer)))
+        except BaseException as e:
+            arrivals.put((None, e))
 
-    return findings
+    # Step 6: Call Gemini (concurrently) and hand each answer back as it arrives
+    workers = max(1, min(max_workers or LLM_MAX_WORKERS, len(groups) or 1))
+    logger.info(f"Querying Gemini for {len(review_sections)} sections in {len(groups)} requests "
+                f"with {workers} workers")
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for group in groups:
+            # bind_context: worker threads record into this document's metrics
+            pool.submit(instrumentation.bind_context(run_group), group)
+        # Step 7: Store findings
+        for _ in range(len(review_sections)):
+            i, answer = arrivals.get()
+            if i is None:
+                raise answer
+            yield review_idx[i], make_finding(review_idx[i], answer, context_stats[i])
+    finally:
+        # Stops queued requests if the consumer gives up early
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
     sample_file = "uploaded_docs/sample_adgm.docx"
     report = detect_red_flags(sample_file)
     for finding in report:
@@ -1,23 +1,51 @@
 # module/report_generator.py
+import gzip
 import json
-import logging, sys
+import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - [%(levelname)s] - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
 logger = logging.getLogger(__name__)
 
 
+def severity_counts(findings: List[Dict]) -> Dict[str, int]:
+    """Number of findings per severity (the `severity` redflag_detector parses from each answer)."""
+    counts: Dict[str, int] = {}
+    for finding in findings:
+        severity = str(finding.get("severity", "Unknown"))
+        counts[severity] = counts.get(severity, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def build_report(entity_type: str,
+                 checklist_results: Dict,
+                 redflag_findings: List[Dict],
+                 annotated_docx_path: str,
+                 metrics: Optional[Dict] = None) -> Dict:
+    """Assemble the report dict without writing it (see generate_report for the parameters)."""
+    report = {
+        "report_generated_on": datetime.now().isoformat(),
+        "entity_type": entity_type,
+        "checklist_verification": {
+            "present": checklist_results.get("present", []),
+            "missing": checklist_results.get("missing", [])
+        },
+        "red_flag_findings": redflag_findings,
+        "severity_counts": severity_counts(redflag_findings),
+        "annotated_document_path": str(annotated_docx_path)
+    }
+    if metrics:
+        report["metrics"] = metrics
+    return report
+
+
 def generate_report(entity_type: str,
                     checklist_results: Dict,
                     redflag_findings: List[Dict],
                     annotated_docx_path: str,
-                    output_json_path: str = "compliance_report.json"):
+                    output_json_path: str = "compliance_report.json",
+                    metrics: Optional[Dict] = None):
     """
     Generate a compliance report combining checklist results and AI findings.
     
@@ -26,17 +54,9 @@ def generate_report(entity_type: str,
     :param redflag_findings: list of AI findings in dict format
     :param annotated_docx_path: path to annotated DOCX file from commentor
     :param output_json_path: where to save the JSON summary
+    :param metrics: stage timings / counters (instrumentation snapshot), stored under "metrics"
     """
-    report_data = {
-        "report_generated_on": datetime.now().isoformat(),
-        "entity_type": entity_type,
-        "checklist_verification": {
-            "present": checklist_results.get("present", []),
-            "missing": checklist_results.get("missing", [])
-        },
-        "red_flag_findings": redflag_findings,
-        "annotated_document_path": str(annotated_docx_path)
-    }
+    report_data = build_report(entity_type, checklist_results, redflag_findings, annotated_docx_path, metrics)
 
     try:
         with open(output_json_path, "w", encoding="utf-8") as f:
@@ -49,7 +69,133 @@ def generate_report(entity_type: str,
     return report_data
 
 
+# ---------------- Streaming Reports ----------------
+# One JSON record per line, written as results arrive:
+#   {"type": "header", "report_generated_on": ...}
+#   {"type": "document", "file", "status", "entity_type", "checklist_verification", "annotated_document_path", ...}
+#   {"type": "finding", "file", "finding": {...}}          one per red flag finding of that document
+#   {"type": "summary", "documents", "ok", "errors", "findings", "severity_counts", ...}
+# A ".gz" suffix gzips the stream. read_streaming_report() rebuilds the generate_report() structure.
+def _open_text(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class StreamingReportWriter:
+    """
+    Append-only JSONL report. Each document and its findings are flushed to disk as soon as
+    add_document() returns, so memory stays flat and an interrupted run keeps what it wrote.
+    Only the small checklist / entity-type sets needed for the summary are held in memory.
+    """
+
+    def __init__(self, output_path: str):
+        self.path = Path(output_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = _open_text(self.path, "w")
+        self._summary = {"documents": 0, "ok": 0, "errors": 0, "findings": 0}
+        self._severity: Dict[str, int] = {}
+        self._entity_types, self._present, self._missing = set(), set(), set()
+        self._write({"type": "header", "report_generated_on": datetime.now().isoformat()})
+
+    def _write(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def add_document(self, record: Dict):
+        """Write one process_document() record: a "document" line plus one "finding" line per red flag."""
+        findings = record.get("red_flag_findings", [])
+        document = {"type": "document"}
+        document.update({key: value for key, value in record.items()
+                         if key not in ("red_flag_findings", "report_generated_on")})
+        self._write(document)
+        for finding in findings:
+            self._write({"type": "finding", "file": record.get("file"), "finding": finding})
+        self._file.flush()
+
+        self._summary["documents"] += 1
+        if record.get("status", "ok") != "ok":
+            self._summary["errors"] += 1
+            return
+        self._summary["ok"] += 1
+        self._summary["findings"] += len(findings)
+        for severity, count in severity_counts(findings).items():
+            self._severity[severity] = self._severity.get(severity, 0) + count
+        if record.get("entity_type"):
+            self._entity_types.add(record["entity_type"])
+        checklist = record.get("checklist_verification", {})
+        self._present.update(checklist.get("present", []))
+        self._missing.update(checklist.get("missing", []))
+
+    def close(self) -> Dict:
+        """Write the summary record and close the file; returns the summary."""
+        summary = {
+            "type": "summary",
+            **self._summary,
+            "severity_counts": dict(sorted(self._severity.items())),
+            "entity_types": sorted(self._entity_types),
+            "checklist_present": sorted(self._present),
+            "checklist_missing": sorted(self._missing),
+            "completed_on": datetime.now().isoformat()
+        }
+        self._write(summary)
+        self._file.close()
+        logger.info(f"✅ Streaming compliance report saved to {self.path} "
+                    f"({summary['documents']} documents, {summary['findings']} findings)")
+        return summary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_report_records(report_path: str) -> Iterator[Dict]:
+    """Records of a streamed report, in order. Stops quietly at a line cut off by an interrupted run."""
+    with _open_text(Path(report_path), "r") as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    return
+        except EOFError:  # gzip stream without its trailer
+            return
+
+
+def read_streaming_report(report_path: str) -> Dict:
+    """Rebuild the generate_report() structure (combined over all documents) from a streamed report."""
+    report_generated_on, entity_types, annotated = None, [], []
+    present, missing, findings, metrics = set(), set(), [], {}
+    for record in iter_report_records(report_path):
+        kind = record.get("type")
+        if kind == "header":
+            report_generated_on = record["report_generated_on"]
+        elif kind == "document" and record.get("status", "ok") == "ok":
+            if record.get("entity_type") and record["entity_type"] not in entity_types:
+                entity_types.append(record["entity_type"])
+            present.update(record.get("checklist_verification", {}).get("present", []))
+            missing.update(record.get("checklist_verification", {}).get("missing", []))
+            if record.get("annotated_document_path", "N/A") != "N/A":
+                annotated.append(record["annotated_document_path"])
+            if "metrics" in record:
+                metrics[Path(record.get("file", "")).name] = record["metrics"]
+        elif kind == "finding":
+            findings.append(record["finding"])
+
+    report = build_report(", ".join(entity_types),
+                          {"present": sorted(present), "missing": sorted(missing)},
+                          findings,
+                          ", ".join(annotated) if annotated else "N/A",
+                          metrics)
+    if report_generated_on:
+        report["report_generated_on"] = report_generated_on
+    return report
+
+
 if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
     # Dummy test data
     dummy_checklist = {
         "present": ["Model Articles", "Consent to Act (Director/Secretary)"],
@@ -0,0 +1,128 @@
+# module/sectioner.py
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from configs.setting import SECTION_MIN_CHARS, SECTION_MAX_CHARS
+
+# "4.", "4.2", "4.2.1)", "Article 12", "Clause 3.1", "Schedule 2" at the start of a line
+_CLAUSE_START = re.compile(
+    r'^\s*(?:(?:article|clause|section|part|schedule|regulation)\s+)?\d+(?:\.\d+)*[\.\)]?\s+\S',
+    re.IGNORECASE
+)
+_SENTENCE_END = re.compile(r'(?<=[\.;:])\s+')
+
+
+@dataclass
+class Section:
+    """A clause-sized unit of a document with the paragraphs (DOCX) or pages (PDF) it spans."""
+    text: str
+    paragraph_start: Optional[int] = None
+    paragraph_end: Optional[int] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    anchor_paragraph: Optional[int] = None  # first body (non-heading) paragraph; where comments attach
+
+    def location(self) -> dict:
+        if self.paragraph_start is not None:
+            return {"paragraphs": [self.paragraph_start, self.paragraph_end]}
+        if self.page_start is not None:
+            return {"pages": [self.page_start, self.page_end]}
+        return {}
+
+
+# ---------------- Helpers ----------------
+def _is_heading_line(line: str) -> bool:
+    """Short all-caps lines ("SHARE CAPITAL", "PART 3 – DIRECTORS") are headings in PDF text."""
+    letters = [c for c in line if c.isalpha()]
+    return 3 <= len(letters) and len(line.split()) <= 12 and all(c.isupper() for c in letters)
+
+
+def _is_heading(text: str, style: Optional[str]) -> bool:
+    """Title/Heading styled paragraphs, or all-caps heading lines."""
+    if style and (style.startswith("Heading") or style == "Title"):
+        return True
+    return _is_heading_line(text.strip().split("\n", 1)[0])
+
+
+def _starts_section(text: str, style: Optional[str], list_level: Optional[int]) -> bool:
+    if _is_heading(text, style):
+        return True
+    if list_level == 0:  # top-level Word auto-numbering
+        return True
+    return bool(_CLAUSE_START.match(text.strip().split("\n", 1)[0]))
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Split an oversized unit at sentence ends, then hard-wrap anything still too long."""
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(text):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+        while len(current) > max_chars:
+            cut = current.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(current[:cut])
+            current = current[cut:].strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _units(blocks: Iterable) -> Iterator[tuple]:
+    """(text, page, paragraph, starts_section, is_heading) per DOCX paragraph or per PDF line."""
+    for block in blocks:
+        if block.page is not None and block.paragraph is None:
+            for line in block.text.split("\n"):
+                if line.strip():
+                    yield line.strip(), block.page, None, _starts_section(line, None, None), _is_heading(line, None)
+        elif block.text.strip():
+            level = getattr(block, "list_level", None)
+            yield (block.text.strip(), block.page, block.paragraph,
+                   _starts_section(block.text, block.style, level), _is_heading(block.text, block.style))
+
+
+# ---------------- Sectioner ----------------
+def iter_structured_sections(blocks: Iterable, min_chars: int = SECTION_MIN_CHARS,
+                             max_chars: int = SECTION_MAX_CHARS) -> Iterator[Section]:
+    """
+    Group TextBlocks (doc_parser.iter_document) into clause-level Sections.
+    Headings (Title/Heading styles, all-caps lines) always open a section and lead into the
+    clause that follows; they never count as its body or its anchor. A numbered DOCX
+    paragraph ("4.2", "Article 7", top-level list numbering) closes the previous clause;
+    PDF lines only do so once the current section has `min_chars` of body text, since a
+    wrapped line can start with a number. Sections never exceed `max_chars` (oversized
+    paragraphs are split at sentence ends).
+    """
+    parts, size, body = [], 0, 0
+    first = last = anchor = None
+    clause_opened = False  # section body starts at a numbered paragraph
+
+    def flush() -> Section:
+        return Section(text="\n".join(parts),
+                       paragraph_start=first[2], paragraph_end=last[2],
+                       page_start=first[1], page_end=last[1],
+                       anchor_paragraph=(anchor or first)[2])
+
+    for text, page, paragraph, boundary, heading in _units(blocks):
+        for piece in _split_long(text, max_chars) if len(text) > max_chars else [text]:
+            unit = (piece, page, paragraph)
+            closes = heading or (boundary and (body >= min_chars or clause_opened))
+            if parts and ((closes and body) or size + 1 + len(piece) > max_chars):
+                yield flush()
+                parts, size, body = [], 0, 0
+                anchor, clause_opened = None, False
+            if not parts:
+                first = unit
+            if not heading and anchor is None:
+                anchor = unit
+                clause_opened = boundary and paragraph is not None
+            parts.append(piece)
+            size += len(piece) + (1 if size else 0)
+            body += 0 if heading else len(piece)
+            last = unit
+            boundary = False  # only the first piece of a unit can open a section
+    if parts:
+        yield flush()
@@ -0,0 +1,173 @@
+# module/template_matcher.py
+import re
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from modules.doc_parser import iter_docx_paragraphs
+from configs.setting import TEMPLATES_DIR, TEMPLATE_MATCH_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 8  # 8-bit bands: fingerprints within 7 differing bits share at least one band
+
+_CLAUSE_NUMBER = re.compile(r'^\s*(\(?[0-9ivxlc]+[\.\)]|\(?[a-z][\.\)])(\s*[0-9]+[\.\)]?)*\s+', re.IGNORECASE)
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+class TemplateMatch(NamedTuple):
+    template: str     # template file name
+    paragraph: int    # paragraph index in the template
+    similarity: float
+
+
+# ---------------- Helpers ----------------
+def normalize_clause(text: str) -> str:
+    """Lowercase, drop leading clause numbering and collapse punctuation/whitespace."""
+    text = _CLAUSE_NUMBER.sub("", text.lower())
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word trigrams of normalized text."""
+    words = text.split()
+    grams = [" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))]
+    weights = [0] * SIMHASH_BITS
+    for gram in grams:
+        h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+def _bands(fingerprint: int):
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    return [(band, fingerprint >> (band * width) & mask) for band in range(SIMHASH_BANDS)]
+
+
+# ---------------- Template Index ----------------
+class TemplateIndex:
+    """
+    Paragraphs of the official ADGM templates, indexed by exact normalized hash
+    and by SimHash bands for near-duplicate lookup.
+    """
+
+    def __init__(self, templates_dir: Path = TEMPLATES_DIR, threshold: float = TEMPLATE_MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.paragraphs: List[tuple] = []  # (normalized text, template name, paragraph index)
+        self.exact: Dict[str, List[int]] = defaultdict(list)  # normalized text -> first entry per template
+        self.buckets = defaultdict(list)
+        for template in sorted(Path(templates_dir).glob("*.docx")):
+            try:
+                for block in iter_docx_paragraphs(template):
+                    self._add(block.text, template.name, block.paragraph)
+            except Exception as e:
+                logger.error(f"Could not index template {template.name}: {e}")
+        logger.info(f"Template index built: {len(self.paragraphs)} paragraphs from {templates_dir}")
+
+    def _add(self, text: str, template: str, paragraph: int):
+        norm = normalize_clause(text)
+        if not norm or any(self.paragraphs[i][1] == template for i in self.exact.get(norm, ())):
+            return
+        entry_id = len(self.paragraphs)
+        self.paragraphs.append((norm, template, paragraph))
+        self.exact[norm].append(entry_id)
+        for band in _bands(simhash(norm)):
+            self.buckets[band].append(entry_id)
+
+    def _line_matches(self, text: str) -> List[TemplateMatch]:
+        """Every template paragraph at or above the similarity threshold (exact ones first)."""
+        norm = normalize_clause(text)
+        if not norm:
+            return []
+        exact = self.exact.get(norm, ())
+        matches = [TemplateMatch(self.paragraphs[i][1], self.paragraphs[i][2], 1.0) for i in exact]
+
+        candidates = {entry_id for band in _bands(simhash(norm)) for entry_id in self.buckets.get(band, ())}
+        for entry_id in sorted(candidates.difference(exact)):
+            candidate, template, paragraph = self.paragraphs[entry_id]
+            matcher = SequenceMatcher(None, candidate, norm)
+            if matcher.quick_ratio() < self.threshold:
+                continue
+            score = matcher.ratio()
+            if score >= self.threshold:
+                matches.append(TemplateMatch(template, paragraph, round(score, 3)))
+        return matches
+
+    def match_line(self, text: str) -> Optional[TemplateMatch]:
+        """Best template paragraph at or above the similarity threshold, else None."""
+        return max(self._line_matches(text), key=lambda match: match.similarity, default=None)
+
+    def match_clause(self, text: str) -> Optional[TemplateMatch]:
+        """
+        A clause conforms if it matches one template paragraph as a whole, or if its
+        lines match paragraphs of one template in the same order. Returns the weakest
+        line match in the latter case; lines mixed from several templates or reordered
+        go to the LLM.
+        """
+        whole = self.match_line(text)
+        if whole is not None:
+            return whole
+        lines = [line for line in text.split("\n") if normalize_clause(line)]
+        if len(lines) < 2:
+            return None
+        per_line = []
+        for line in lines:
+            matches = self._line_matches(line)
+            if not matches:
+                return None
+            per_line.append(matches)
+
+        best = None
+        for template in sorted({match.template for match in per_line[0]}):
+            weakest, previous = None, -1
+            for matches in per_line:
+                # Earliest later paragraph keeps the most room for the remaining lines
+                match = min((m for m in matches if m.template == template and m.paragraph > previous),
+                            key=lambda m: m.paragraph, default=None)
+                if match is None:
+                    break
+                previous = match.paragraph
+                if weakest is None or match.similarity < weakest.similarity:
+                    weakest = match
+            else:
+                if best is None or weakest.similarity > best.similarity:
+                    best = weakest
+        return best
+
+
+_index: Optional[TemplateIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_template_index() -> TemplateIndex:
+    """Process-wide template index, built on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TemplateIndex()
+    return _index
+
+
+def match_template(text: str) -> Optional[TemplateMatch]:
+    """Shortcut for get_template_index().match_clause(text)."""
+    return get_template_index().match_clause(text)
+
+
+# ---------------- Test ----------------
+if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
+    samples = [
+        "The liability of the members is limited to the amount, if any, unpaid on the shares held by them.",
+        "The company shall pay every director a bonus of 50% of annual profits.",
+    ]
+    for sample in samples:
+        print(f"{match_template(sample)}  ←  {sample}")
@@ -0,0 +1,117 @@
+# rag_engine/bm25_index.py
+# Lexical (BM25) inverted index over the same chunks, ids and metadata as the Chroma store.
+import re
+import json
+import math
+import heapq
+import logging
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from configs.setting import BM25_K1, BM25_B
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Function words carry no signal for BM25 and make up most postings
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or shall that the this to was were which will with
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric terms without stopwords ("Regulations 2020" → ["regulations", "2020"])."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Inverted index (term → {chunk id: term frequency}) with Okapi BM25 scoring.
+    Chunks are keyed by the Chroma chunk ids so both indexes can be updated together.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_len: Dict[str, int] = {}
+        self.texts: Dict[str, str] = {}
+        self.metadatas: Dict[str, dict] = {}
+        self.total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    # ---------------- Updates ----------------
+    def add(self, ids: List[str], texts: List[str], metadatas: List[dict]):
+        for chunk_id, text, meta in zip(ids, texts, metadatas):
+            if chunk_id in self.doc_len:
+                self.remove([chunk_id])
+            terms = Counter(tokenize(text))
+            for term, tf in terms.items():
+                self.postings[term][chunk_id] = tf
+            length = sum(terms.values())
+            self.doc_len[chunk_id] = length
+            self.total_len += length
+            self.texts[chunk_id] = text
+            self.metadatas[chunk_id] = meta or {}
+
+    def remove(self, ids: List[str]):
+        for chunk_id in ids:
+            if chunk_id not in self.doc_len:
+                continue
+            for term in set(tokenize(self.texts[chunk_id])):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(chunk_id, None)
+                    if not postings:
+                        del self.postings[term]
+            self.total_len -= self.doc_len.pop(chunk_id)
+            del self.texts[chunk_id]
+            del self.metadatas[chunk_id]
+
+    def remove_source(self, source: str):
+        """Drop every chunk of one reference document (mirrors Chroma's delete(where={"source": ...}))."""
+        self.remove([cid for cid, meta in self.metadatas.items() if meta.get("source") == source])
+
+    # ---------------- Search ----------------
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top-k (chunk id, BM25 score) pairs, best first; chunks sharing no term are never returned."""
+        n = len(self.doc_len)
+        if n == 0:
+            return []
+        avg_len = self.total_len / n
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[chunk_id] / avg_len)
+                scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    # ---------------- Persistence ----------------
+    def save(self, path: Path):
+        """Persist chunks only; postings are rebuilt on load, which keeps the file compact."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "k1": self.k1,
+            "b": self.b,
+            "chunks": [[cid, self.texts[cid], self.metadatas[cid]] for cid in self.doc_len]
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+        logger.info(f"BM25 index saved: {len(self)} chunks → {path}")
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        index = cls(k1=payload.get("k1", BM25_K1), b=payload.get("b", BM25_B))
+        chunks = payload.get("chunks", [])
+        index.add([c[0] for c in chunks], [c[1] for c in chunks], [c[2] for c in chunks])
+        return index
@@ -0,0 +1,119 @@
+# rag_engine/context_builder.py
+import re
+import logging
+from typing import Dict, List, Tuple
+
+from configs.setting import CONTEXT_TOKEN_BUDGET, CONTEXT_MMR_LAMBDA, CONTEXT_DUP_THRESHOLD, CHUNK_OVERLAP
+from rag_engine.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORDS = re.compile(r"\w+")
+MIN_OVERLAP_CHARS = 20  # shorter shared edges are coincidence, not splitter overlap
+
+
+# ---------------- Helpers ----------------
+def _shingles(text: str) -> set:
+    words = _WORDS.findall(text.lower())
+    if len(words) < 3:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _relevance(doc, rank: int, total: int) -> float:
+    """Fused hybrid/BM25 score, else similarity from the vector distance, else rank."""
+    metadata = getattr(doc, "metadata", None) or {}
+    if metadata.get("score") is not None:
+        return float(metadata["score"])
+    distance = metadata.get("distance")
+    if distance is not None:
+        return 1.0 / (1.0 + float(distance))
+    return 1.0 - rank / max(1, total)
+
+
+def strip_overlap(selected: str, text: str, max_overlap: int = 2 * CHUNK_OVERLAP) -> str:
+    """
+    Remove the span `text` shares with an already selected chunk's edge
+    (the splitter repeats up to CHUNK_OVERLAP characters between neighbours).
+    """
+    limit = min(max_overlap, len(selected), len(text))
+    for k in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        if selected.endswith(text[:k]):
+            return text[k:].lstrip()
+        if selected.startswith(text[-k:]):
+            return text[:-k].rstrip()
+    return text
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary so it fits in roughly max_tokens."""
+    words = text.split()
+    lo, hi = 0, len(words)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(" ".join(words[:mid])) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return " ".join(words[:lo])
+
+
+# ---------------- Context Assembly ----------------
+def assemble_context(docs: List, token_budget: int = CONTEXT_TOKEN_BUDGET,
+                     mmr_lambda: float = CONTEXT_MMR_LAMBDA,
+                     dup_threshold: float = CONTEXT_DUP_THRESHOLD) -> Tuple[List[str], Dict]:
+    """
+    Turn retrieved Documents into the context chunks for one prompt:
+    near-duplicates are dropped, the rest are ordered by maximal marginal relevance,
+    text repeated from an already chosen neighbour is cut, and the result is kept
+    within `token_budget` tokens.
+    Returns (chunks, stats) where stats has retrieved_tokens, used_tokens and saved_tokens.
+    """
+    texts = [doc.page_content.strip() for doc in docs]
+    retrieved_tokens = sum(count_tokens(text) for text in texts)
+    candidates = [
+        {"text": text, "shingles": _shingles(text), "relevance": _relevance(doc, rank, len(docs))}
+        for rank, (doc, text) in enumerate(zip(docs, texts)) if text
+    ]
+
+    chunks, selected, used = [], [], 0
+    while candidates:
+        # MMR: relevance minus redundancy with what is already selected
+        def mmr(c):
+            redundancy = max((_jaccard(c["shingles"], s["shingles"]) for s in selected), default=0.0)
+            return mmr_lambda * c["relevance"] - (1 - mmr_lambda) * redundancy, redundancy
+
+        scored = [(mmr(c), c) for c in candidates]
+        (_, redundancy), best = max(scored, key=lambda item: item[0][0])
+        candidates.remove(best)
+        if redundancy >= dup_threshold:
+            continue
+
+        text = best["text"]
+        for s in selected:
+            text = strip_overlap(s["text"], text)
+        if not text:
+            continue
+        tokens = count_tokens(text)
+        if used + tokens > token_budget:
+            remaining = token_budget - used
+            if chunks or remaining <= 0:
+                continue  # a later, shorter chunk may still fit
+            text = _truncate_to_tokens(text, remaining)
+            tokens = count_tokens(text)
+        chunks.append(text)
+        selected.append(best)
+        used += tokens
+
+    stats = {
+        "retrieved_tokens": retrieved_tokens,
+        "used_tokens": used,
+        "saved_tokens": retrieved_tokens - used
+    }
+    return chunks, stats
@@ -1,56 +1,182 @@
 # rag_engine/embedder.py
 from pathlib import Path
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from configs.setting import PROCESSED_TEXTS_DIR, EMBEDDINGS_DIR, EMBED_MODEL_NAME, CHUNK_SIZE, CHUNK_OVERLAP
-
-# Using open-source sentence-transformers model from settings
-embeddings = HuggingFaceEmbeddings(model_name=EMBED_MODEL_NAME)
-
-# Text splitter for better chunking
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=CHUNK_SIZE,       # from settings
-    chunk_overlap=CHUNK_OVERLAP, # from settings
-    length_function=len,
-    separators=["\n\n", "\n", " ", ""]
+from typing import Dict, List
+from configs.setting import (
+    PROCESSED_TEXTS_DIR, EMBEDDINGS_DIR, CHUNK_SIZE, CHUNK_OVERLAP, BM25_INDEX_FILE,
+    VECTOR_STORE_BACKEND, FLAT_STORE_DIR, ENTITY_PROTOTYPES_FILE
 )
+from rag_engine import registry
+from rag_engine.bm25_index import BM25Index
+from rag_engine.entity_prototypes import CHECKLIST_CATEGORY, write_entity_prototypes
 
-def create_vector_db():
+_text_splitter = None
+
+def get_text_splitter():
+    """Text splitter for better chunking (langchain is imported on first use)."""
+    global _text_splitter
+    if _text_splitter is None:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        _text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE,       # from settings
+            chunk_overlap=CHUNK_OVERLAP, # from settings
+            length_function=len,
+            separators=["\n\n", "\n", " ", ""]
+        )
+    return _text_splitter
+
+def chunk_text_file(txt_file: Path):
+    """Split one processed text file into (ids, texts, metadatas); ids are stable per source."""
+    ids, texts, metadatas = [], [], []
+
+    # Read processed text file
+    content = txt_file.read_text(encoding="utf-8")
+    # Create smaller chunks with overlap
+    chunks = get_text_splitter().split_text(content)
+
+    # Extract category from filename prefix
+    category = txt_file.stem.split("_")[0]
+
+    for chunk in chunks:
+        chunk = chunk.strip()
+        if chunk:
+            ids.append(f"{txt_file.stem}::{len(ids)}")
+            texts.append(chunk)
+            metadatas.append({
+                "source": txt_file.stem,
+                "category": category
+            })
+    return ids, texts, metadatas
+
+def chunk_corpus():
+    """(ids, texts, metadatas) for every processed text file."""
+    ids = []
     texts = []
     metadatas = []
 
-    for txt_file in Path(PROCESSED_TEXTS_DIR).iterdir():
+    for txt_file in sorted(Path(PROCESSED_TEXTS_DIR).iterdir()):
         if txt_file.suffix != ".txt":
             continue
+        file_ids, file_texts, file_metadatas = chunk_text_file(txt_file)
+        ids.extend(file_ids)
+        texts.extend(file_texts)
+        metadatas.extend(file_metadatas)
+    return ids, texts, metadatas
+
+def build_bm25_index() -> BM25Index:
+    """BM25 index over exactly the chunks (and chunk ids) the vector store holds."""
+    index = BM25Index()
+    index.add(*chunk_corpus())
+    return index
+
+def create_vector_db(backend: str = VECTOR_STORE_BACKEND):
+    ids, texts, metadatas = chunk_corpus()
+
+    if backend == "flat":
+        from rag_engine.flat_store import FlatVectorStore
+
+        # One embedding pass written as a contiguous matrix (rag_engine/flat_store.py)
+        vectors = registry.get_embeddings().embed_documents(texts)
+        FlatVectorStore.write(ids, texts, metadatas, vectors, FLAT_STORE_DIR)
+        target = FLAT_STORE_DIR
+    else:
+        from langchain_community.vectorstores import Chroma
+
+        # Start from an empty collection so a full rebuild never duplicates chunk ids
+        if Path(EMBEDDINGS_DIR).exists():
+            Chroma(persist_directory=str(EMBEDDINGS_DIR),
+                   embedding_function=registry.get_embeddings()).delete_collection()
+            registry.reload()
+
+        # Create ChromaDB vector store (open-source sentence-transformers model from settings)
+        db = Chroma.from_texts(
+            texts,
+            registry.get_embeddings(),
+            metadatas=metadatas,
+            ids=ids,
+            persist_directory=str(EMBEDDINGS_DIR)
+        )
+
+        db.persist()
+        target = EMBEDDINGS_DIR
+
+    # Lexical index over the same chunk ids
+    bm25 = BM25Index()
+    bm25.add(ids, texts, metadatas)
+    bm25.save(BM25_INDEX_FILE)
+
+    # Entity-type prototypes for the classifier fallback, stored with the index
+    write_entity_prototypes(ENTITY_PROTOTYPES_FILE)
+
+    # Handles opened before the rebuild now point at stale data
+    registry.reload()
+    print(f"✅ Vector DB ({backend}) created with {len(texts)} chunks → {target}")
+
+def update_vector_db(changes: Dict[str, List[str]]):
+    """
+    Apply a loader change set to the existing store: chunks of changed/removed
+    sources are deleted, and added/changed sources are re-chunked and embedded.
+    """
+    db = registry.get_vector_store()
+    bm25 = registry.get_bm25_index()
+
+    touched = changes.get("added", []) + changes.get("changed", []) + changes.get("removed", [])
+    for source in touched:
+        bm25.remove_source(source)
+
+    new_ids, new_texts, new_metadatas = [], [], []
+    for source in changes.get("added", []) + changes.get("changed", []):
+        txt_file = Path(PROCESSED_TEXTS_DIR) / f"{source}.txt"
+        if not txt_file.exists():
+            continue
+        ids, texts, metadatas = chunk_text_file(txt_file)
+        new_ids.extend(ids)
+        new_texts.extend(texts)
+        new_metadatas.extend(metadatas)
+    bm25.add(new_ids, new_texts, new_metadatas)
+
+    if VECTOR_STORE_BACKEND == "flat":
+        # The matrix is rewritten once: kept rows followed by the new embeddings
+        touched_sources = set(touched)
+        keep = [i for i, meta in enumerate(db.metadatas) if meta.get("source") not in touched_sources]
+        vectors = registry.get_embeddings().embed_documents(new_texts) if new_texts else []
+        db.replace(keep, new_ids, new_texts, new_metadatas, vectors)
+        target = FLAT_STORE_DIR
+    else:
+        collection = db._collection
+        for source in touched:
+            collection.delete(where={"source": source})
+        if new_texts:
+            db.add_texts(new_texts, metadatas=new_metadatas, ids=new_ids)
+        db.persist()
+        target = EMBEDDINGS_DIR
+
+    bm25.save(BM25_INDEX_FILE)
+    if any(source.startswith(f"{CHECKLIST_CATEGORY}_") for source in touched):
+        write_entity_prototypes(ENTITY_PROTOTYPES_FILE)
+        registry.reload()
+    print(f"✅ Vector DB updated: {len(new_texts)} chunks embedded, "
+          f"{len(changes.get('removed', []))} sources removed → {target}")
+
+def run_incremental_ingest():
+    """Re-extract and re-embed only the reference docs that changed since the last run."""
+    from rag_engine.loader import run_loader
 
-        # Read processed text file
-        content = txt_file.read_text(encoding="utf-8")
-        # Create smaller chunks with overlap
-        chunks = text_splitter.split_text(content)
-
-        # Extract category from filename prefix
-        category = txt_file.stem.split("_")[0]
-
-        for chunk in chunks:
-            chunk = chunk.strip()
-            if chunk:
-                texts.append(chunk)
-                metadatas.append({
-                    "source": txt_file.stem,
-                    "category": category
-                })
-
-    # Create ChromaDB vector store
-    db = Chroma.from_texts(
-        texts,
-        embeddings,
-        metadatas=metadatas,
-        persist_directory=str(EMBEDDINGS_DIR)
-    )
-
-    db.persist()
-    print(f"✅ Vector DB created with {len(texts)} chunks → {EMBEDDINGS_DIR}")
+    changes = run_loader(incremental=True)
+    if not any(changes.values()):
+        print("✅ Reference corpus unchanged; nothing to embed.")
+        return changes
+    update_vector_db(changes)
+    return changes
 
 if __name__ == "__main__":
-    create_vector_db()
+    from configs.logging_config import setup_logging
+    setup_logging()
+    import sys
+    if "--incremental" in sys.argv:
+        run_incremental_ingest()
+    elif "--flat" in sys.argv:
+        create_vector_db(backend="flat")
+    elif "--prototypes" in sys.argv:
+        write_entity_prototypes(ENTITY_PROTOTYPES_FILE)
+    else:
+        create_vector_db()
@@ -0,0 +1,154 @@
+# rag_engine/entity_prototypes.py
+# One prototype embedding per entity type, averaged over the chunks of its ADGM checklist,
+# plus a softmax temperature fitted on those chunks so scores read as probabilities.
+# The checklists share a lot of boilerplate, so vectors are compared after subtracting
+# the mean of all checklist chunks (the shared direction carries no entity signal).
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from configs.setting import (
+    PROCESSED_TEXTS_DIR, ENTITY_PROTOTYPES_FILE, ENTITY_CHECKLIST_FILES, EMBED_MODEL_NAME
+)
+
+logger = logging.getLogger(__name__)
+
+CHECKLIST_CATEGORY = "checklists_docs"
+# Softmax temperatures tried during calibration
+TEMPERATURE_GRID = np.geomspace(0.005, 1.0, 60)
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class EntityPrototypes:
+    """Centered unit prototype vectors (one row per entity), the center and the calibrated softmax temperature."""
+
+    def __init__(self, entities: List[str], vectors, center, temperature: float,
+                 model_name: str = EMBED_MODEL_NAME):
+        self.entities = list(entities)
+        self.vectors = _normalize(vectors)
+        self.center = np.asarray(center, dtype=np.float32)
+        self.temperature = float(temperature)
+        self.model_name = model_name
+
+    def probabilities(self, embedding) -> Dict[str, float]:
+        """Calibrated probability of each entity type for one document embedding."""
+        similarities = self.vectors @ _normalize(_normalize(embedding)[0] - self.center)[0]
+        probs = _softmax(similarities / self.temperature)
+        return {entity: float(p) for entity, p in zip(self.entities, probs)}
+
+    def classify(self, embedding) -> Tuple[Optional[str], float]:
+        """(most probable entity, its probability)."""
+        probs = self.probabilities(embedding)
+        if not probs:
+            return None, 0.0
+        entity = max(probs, key=probs.get)
+        return entity, probs[entity]
+
+    # ---------------- Persistence ----------------
+    def save(self, path: Path = ENTITY_PROTOTYPES_FILE):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, entities=np.array(self.entities), vectors=self.vectors, center=self.center,
+                 temperature=np.float32(self.temperature), model_name=np.array(self.model_name))
+        tmp.replace(path)
+        logger.info(f"Entity prototypes saved: {len(self.entities)} x {self.vectors.shape[1]} "
+                    f"(temperature {self.temperature:.3f}) → {path}")
+
+    @classmethod
+    def load(cls, path: Path = ENTITY_PROTOTYPES_FILE) -> "EntityPrototypes":
+        with np.load(path, allow_pickle=False) as data:
+            prototypes = cls([str(e) for e in data["entities"]], data["vectors"], data["center"],
+                             float(data["temperature"]), str(data["model_name"]))
+        if prototypes.model_name != EMBED_MODEL_NAME:
+            logger.warning(f"Entity prototypes were built with {prototypes.model_name}, "
+                           f"not {EMBED_MODEL_NAME}; rebuild them with the index.")
+        return prototypes
+
+
+# ---------------- Building ----------------
+def checklist_text_file(pdf_name: str) -> Path:
+    """Processed text of a checklist PDF (named like rag_engine.loader writes it)."""
+    return Path(PROCESSED_TEXTS_DIR) / f"{CHECKLIST_CATEGORY}_{Path(pdf_name).stem}.txt"
+
+
+def calibrate_temperature(chunk_vectors: Dict[str, np.ndarray]) -> float:
+    """
+    Temperature minimising the negative log-likelihood of each checklist chunk's own entity.
+    Vectors are the centered chunk embeddings. A chunk is scored against its entity's prototype
+    computed without it (leave-one-out), so the fit reflects unseen text rather than memorised chunks.
+    """
+    entities = list(chunk_vectors)
+    sums = np.stack([chunk_vectors[e].sum(axis=0) for e in entities])
+    prototypes = _normalize(sums)
+
+    similarities, labels = [], []
+    for label, entity in enumerate(entities):
+        vectors = chunk_vectors[entity]
+        if len(vectors) < 2:
+            continue
+        unit = _normalize(vectors)
+        sims = unit @ prototypes.T
+        own = _normalize(sums[label] - vectors)
+        sims[:, label] = np.einsum("ij,ij->i", unit, own)
+        similarities.append(sims)
+        labels.extend([label] * len(vectors))
+    if not similarities:
+        return 0.05
+    similarities = np.vstack(similarities)
+    labels = np.asarray(labels)
+
+    def nll(temperature: float) -> float:
+        probs = _softmax(similarities / temperature)
+        return float(-np.log(np.maximum(probs[np.arange(len(labels)), labels], 1e-12)).mean())
+
+    return float(min(TEMPERATURE_GRID, key=nll))
+
+
+def build_entity_prototypes(embeddings=None) -> Optional[EntityPrototypes]:
+    """
+    Embed the chunks of every checklist in ENTITY_CHECKLIST_FILES (same chunking as the index)
+    and average them into one prototype per entity type. Returns None if no checklist text exists.
+    """
+    from rag_engine import registry
+    from rag_engine.embedder import chunk_text_file
+
+    embeddings = embeddings or registry.get_embeddings()
+    chunk_vectors: Dict[str, np.ndarray] = {}
+    for entity, pdf_name in ENTITY_CHECKLIST_FILES.items():
+        txt_file = checklist_text_file(pdf_name)
+        if not txt_file.exists():
+            logger.warning(f"No processed checklist for {entity}: {txt_file.name} (run rag_engine/loader.py)")
+            continue
+        _, texts, _ = chunk_text_file(txt_file)
+        if texts:
+            chunk_vectors[entity] = _normalize(embeddings.embed_documents(texts))
+    if not chunk_vectors:
+        return None
+
+    center = np.vstack(list(chunk_vectors.values())).mean(axis=0)
+    centered = {entity: vectors - center for entity, vectors in chunk_vectors.items()}
+    vectors = np.stack([centered[e].mean(axis=0) for e in centered])
+    temperature = calibrate_temperature(centered)
+    logger.info(f"✅ Built {len(chunk_vectors)} entity prototypes from "
+                f"{sum(len(v) for v in chunk_vectors.values())} checklist chunks")
+    return EntityPrototypes(list(chunk_vectors), vectors, center, temperature)
+
+
+def write_entity_prototypes(path: Path = ENTITY_PROTOTYPES_FILE) -> Optional[EntityPrototypes]:
+    prototypes = build_entity_prototypes()
+    if prototypes:
+        prototypes.save(path)
+    return prototypes
@@ -0,0 +1,172 @@
+# rag_engine/flat_store.py
+# Exact-search vector store: one contiguous, memory-mapped embedding matrix plus JSON metadata.
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from configs.setting import FLAT_STORE_DIR, FLAT_STORE_DTYPE
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.json"
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class FlatVectorStore:
+    """
+    Unit-normalised embeddings in `vectors.npy` (opened with mmap, so loading is
+    near-instant) and ids/texts/metadata in `chunks.json`.
+    Search is a brute-force cosine top-k, exact and deterministic.
+    `query()` / `count()` / `get()` / `delete()` mirror the Chroma collection calls the pipeline uses
+    (fields left out of `include` are None, as in Chroma); distances are cosine distances (1 - similarity).
+    """
+
+    def __init__(self, path: Path = FLAT_STORE_DIR, embedding_function=None):
+        self.path = Path(path)
+        self.embedding_function = embedding_function
+        self.vectors = np.load(self.path / VECTORS_FILE, mmap_mode="r")
+        chunks = json.loads((self.path / CHUNKS_FILE).read_text(encoding="utf-8"))
+        self.ids: List[str] = chunks["ids"]
+        self.texts: List[str] = chunks["texts"]
+        self.metadatas: List[dict] = chunks["metadatas"]
+        self._masks: Dict[str, np.ndarray] = {}
+
+    # ---------------- Writing ----------------
+    @staticmethod
+    def write(ids: List[str], texts: List[str], metadatas: List[dict], vectors,
+              path: Path = FLAT_STORE_DIR, dtype: str = FLAT_STORE_DTYPE):
+        """Persist a store atomically enough for readers: files are written aside, then swapped in."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        matrix = _normalize(vectors) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        tmp_vectors = path / f"{VECTORS_FILE}.tmp"
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, matrix.astype(dtype))
+        tmp_chunks = path / f"{CHUNKS_FILE}.tmp"
+        tmp_chunks.write_text(json.dumps({"ids": ids, "texts": texts, "metadatas": metadatas},
+                                         ensure_ascii=False), encoding="utf-8")
+        tmp_vectors.replace(path / VECTORS_FILE)
+        tmp_chunks.replace(path / CHUNKS_FILE)
+        logger.info(f"Flat vector store written: {len(ids)} x {matrix.shape[1] if matrix.ndim == 2 else 0} ({dtype}) → {path}")
+
+    @staticmethod
+    def exists(path: Path = FLAT_STORE_DIR) -> bool:
+        return (Path(path) / VECTORS_FILE).exists() and (Path(path) / CHUNKS_FILE).exists()
+
+    # ---------------- Filtering ----------------
+    def _mask(self, where: Optional[dict]) -> Optional[np.ndarray]:
+        """Boolean row mask for an equality filter such as {"source": "..."}; cached per filter."""
+        if not where:
+            return None
+        key = json.dumps(where, sort_keys=True)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (all(meta.get(field) == value for field, value in where.items()) for meta in self.metadatas),
+                dtype=bool, count=len(self.metadatas)
+            )
+            self._masks[key] = mask
+        return mask
+
+    # ---------------- Collection API ----------------
+    @staticmethod
+    def _included(result: dict, include) -> dict:
+        for field in result:
+            if field != "ids" and field not in include:
+                result[field] = None
+        return result
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def query(self, query_embeddings, n_results: int, where: Optional[dict] = None,
+              include=("documents", "metadatas", "distances")) -> dict:
+        """Chroma-shaped result: {"ids", "documents", "metadatas", "distances"}, one list per query."""
+        queries = _normalize(query_embeddings)
+        mask = self._mask(where)
+        available = self.count() if mask is None else int(mask.sum())
+        k = min(n_results, available)
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        if k == 0:
+            for field in result:
+                result[field] = [[] for _ in queries]
+            return self._included(result, include)
+        scores = queries @ self.vectors.T.astype(np.float32, copy=False)  # (n_queries, n_chunks)
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for row, candidates in zip(scores, top):
+            order = candidates[np.argsort(-row[candidates], kind="stable")]
+            result["ids"].append([self.ids[i] for i in order])
+            result["documents"].append([self.texts[i] for i in order])
+            result["metadatas"].append([self.metadatas[i] for i in order])
+            result["distances"].append([float(1.0 - row[i]) for i in order])
+        return self._included(result, include)
+
+    def get(self, where: Optional[dict] = None, include=("documents", "metadatas")) -> dict:
+        """Chroma-shaped flat lists {"ids", "embeddings", "documents", "metadatas"} of the matching rows."""
+        mask = self._mask(where)
+        rows = list(range(self.count())) if mask is None else np.flatnonzero(mask).tolist()
+        return self._included({
+            "ids": [self.ids[i] for i in rows],
+            "embeddings": np.asarray(self.vectors[rows], dtype=np.float32) if "embeddings" in include else None,
+            "documents": [self.texts[i] for i in rows],
+            "metadatas": [self.metadatas[i] for i in rows]
+        }, include)
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[dict] = None):
+        """
+        Drop rows matching `ids` and/or `where` (both must hold when both are given, as in Chroma)
+        and rewrite the store (used by incremental ingest). Raises ValueError without a filter.
+        """
+        if not ids and not where:
+            raise ValueError("delete() needs ids or a non-empty where filter")
+        drop = np.ones(self.count(), dtype=bool)
+        if ids:
+            wanted = set(ids)
+            drop &= np.fromiter((chunk_id in wanted for chunk_id in self.ids), dtype=bool, count=self.count())
+        if where:
+            drop &= self._mask(where)
+        if drop.any():
+            self.replace(np.flatnonzero(~drop).tolist(), [], [], [], [])
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[dict], vectors):
+        """Append rows and rewrite the store."""
+        self.replace(list(range(self.count())), ids, texts, metadatas, vectors)
+
+    def replace(self, keep_rows: List[int], ids, texts, metadatas, vectors):
+        """Rewrite the store as the kept rows followed by new ones, then reopen the memory map."""
+        kept = np.asarray(self.vectors[list(keep_rows)], dtype=np.float32)
+        new = np.asarray(vectors, dtype=np.float32) if len(ids) else None
+        if new is None:
+            matrix = kept
+        else:
+            matrix = np.vstack([kept, new]) if len(keep_rows) else new
+        all_ids = [self.ids[i] for i in keep_rows] + list(ids)
+        all_texts = [self.texts[i] for i in keep_rows] + list(texts)
+        all_metas = [self.metadatas[i] for i in keep_rows] + list(metadatas)
+        del self.vectors  # release the map before the file is replaced
+        FlatVectorStore.write(all_ids, all_texts, all_metas, matrix, self.path, FLAT_STORE_DTYPE)
+        self.__init__(self.path, self.embedding_function)
+
+    # ---------------- LangChain-style helpers ----------------
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None):
+        """Same call shape as Chroma.similarity_search; needs an embedding_function."""
+        from langchain_core.documents import Document
+
+        result = self.query([self.embedding_function.embed_query(query)], k, where=filter)
+        return [
+            Document(page_content=text, metadata={**meta, "chunk_id": chunk_id, "distance": dist})
+            for chunk_id, text, meta, dist in zip(result["ids"][0], result["documents"][0],
+                                                  result["metadatas"][0], result["distances"][0])
+        ]
@@ -1,60 +1,199 @@
 # rag_engine/llm_client.py
 import os
 import sys
+import time
+import random
 import logging
+import threading
 from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
 
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-# ---------------- Logging Setup ----------------
-LOG_FILE = "logs/llm_client.log"
-os.makedirs("logs", exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - [%(levelname)s] - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8"),
-        logging.StreamHandler(sys.stdout)
-    ]
+from configs.setting import (
+    LLM_RATE_LIMIT_PER_SEC, LLM_RATE_BURST,
+    LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX,
+    LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES
 )
+from rag_engine.rate_limiter import TokenBucket
+from rag_engine.llm_cache import LLMCache, make_cache_key
+from rag_engine.tokens import estimate_tokens
+from modules import instrumentation
+
 logger = logging.getLogger(__name__)
 
-# ---------------- Load API Key ----------------
-# Load environment variables from .env
-load_dotenv()
+ERROR_RESPONSE = "Error: Could not get a response from Gemini."
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Shared across threads so concurrent callers respect one request budget
+rate_limiter = TokenBucket(LLM_RATE_LIMIT_PER_SEC, LLM_RATE_BURST)
+
+# Persistent prompt -> response cache (errors are never stored)
+response_cache = LLMCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES)
+
+# Optional replacement for the Gemini API, e.g. rag_engine.stub_llm.StubLLMBackend
+_backend: Optional[Callable[[str, str], str]] = None
+_configured = False
+_configure_lock = threading.Lock()
 
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    logger.error("❌ GEMINI_API_KEY not found in environment variables.")
-    sys.exit(1)
+# One GenerativeModel per (model, system prompt), reused across calls and threads
+_clients: Dict[Tuple[str, Optional[str]], object] = {}
 
 # ---------------- Configure Gemini ----------------
-try:
-    genai.configure(api_key=API_KEY)
-    logger.info("✅ Gemini API configured successfully.")
-except Exception as e:
-    logger.exception("❌ Failed to configure Gemini API.")
-    sys.exit(1)
+def configure_gemini():
+    """
+    Import and configure the Gemini SDK once, on the first real API call
+    (.env is read here too, so importing this module has no side effects).
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        import google.generativeai as genai
+        from dotenv import load_dotenv
+
+        # Load environment variables from .env
+        load_dotenv()
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            logger.error("❌ GEMINI_API_KEY not found in environment variables.")
+            raise RuntimeError("GEMINI_API_KEY not found in environment variables.")
+        genai.configure(api_key=api_key)
+        _configured = True
+        logger.info("✅ Gemini API configured successfully.")
+
+def set_llm_backend(backend: Optional[Callable[[str, str], str]]):
+    """
+    Route ask_gemini through `backend(prompt, model) -> str` instead of the Gemini API.
+    The response cache is off while a backend is installed, so its answers are neither
+    stored under the Gemini model keys nor mixed with cached Gemini answers.
+    Pass None to restore the real client (and the cache).
+    """
+    global _backend
+    _backend = backend
 
 # ---------------- Functions ----------------
-def ask_gemini(prompt: str, model: str = "gemini-1.5-flash") -> str:
+def _status_code(exc: Exception) -> Optional[int]:
+    """Best-effort HTTP status of an SDK/stub exception."""
+    for attr in ("code", "status_code"):
+        code = getattr(exc, attr, None)
+        if callable(code):
+            try:
+                code = code()
+            except Exception:
+                code = None
+        code = getattr(code, "value", code)
+        if isinstance(code, int):
+            return code
+    return None
+
+def is_retryable(exc: Exception) -> bool:
+    """True for rate-limit (429) and server-side (5xx) errors."""
+    return _status_code(exc) in RETRYABLE_STATUS_CODES
+
+def cache_enabled() -> bool:
+    """
+    Global cache switch: LLM_CACHE_ENABLED, overridden by env LLM_CACHE_BYPASS=1.
+    Always off while a non-default backend is installed (see set_llm_backend).
+    """
+    return LLM_CACHE_ENABLED and _backend is None \
+        and os.getenv("LLM_CACHE_BYPASS", "").lower() not in ("1", "true", "yes")
+
+def get_model_client(model: str, system_prompt: Optional[str] = None):
+    """Shared genai.GenerativeModel for this model / system prompt, created on first use."""
+    key = (model, system_prompt)
+    client = _clients.get(key)
+    if client is None:
+        configure_gemini()
+        import google.generativeai as genai
+        with _configure_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = genai.GenerativeModel(model, system_instruction=system_prompt) if system_prompt \
+                    else genai.GenerativeModel(model)
+                _clients[key] = client
+    return client
+
+def _generate(prompt: str, model: str, system_prompt: Optional[str] = None,
+              on_chunk: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Full response text. With `on_chunk`, the response is streamed and `on_chunk` receives the
+    text received so far after every chunk (backends without a `stream` method answer in one chunk).
+    """
+    if _backend is not None:
+        stream = getattr(_backend, "stream", None)
+        if on_chunk is None or stream is None:
+            text_out = _backend(prompt, model)
+            if on_chunk is not None:
+                on_chunk(text_out)
+            return text_out
+        chunks = stream(prompt, model)
+    else:
+        client = get_model_client(model, system_prompt)
+        if on_chunk is None:
+            return client.generate_content(prompt).text
+        chunks = (chunk.text for chunk in client.generate_content(prompt, stream=True))
+
+    parts, start = [], time.perf_counter()
+    for text in chunks:
+        if not parts:
+            instrumentation.observe("llm_first_chunk_seconds", time.perf_counter() - start)
+        parts.append(text)
+        on_chunk("".join(parts))
+    return "".join(parts)
+
+def ask_gemini(prompt: str, model: str = "gemini-1.5-flash",
+               system_prompt: Optional[str] = None, use_cache: bool = True,
+               on_chunk: Optional[Callable[[str], None]] = None) -> str:
     """
     Send a prompt to the Gemini model and return the generated text.
+    Answers are served from the on-disk cache when the same model/system prompt/prompt
+    was seen before; pass use_cache=False to force a fresh call.
+    Calls are rate-limited and retried with exponential backoff on 429/5xx.
+    With `on_chunk`, generation is streamed and `on_chunk(text_so_far)` is called as text
+    arrives (a retry starts the text over; a cached answer arrives as one chunk).
     """
-    try:
-        logger.info(f"Sending prompt to Gemini model: {model}")
-        response = genai.GenerativeModel(model).generate_content(prompt)
-        text_out = response.text.strip()
-        logger.info("✅ Gemini response received.")
-        return text_out
-    except Exception as e:
-        logger.exception("❌ Error during Gemini API call.")
-        return "Error: Could not get a response from Gemini."
+    use_cache = use_cache and cache_enabled()
+    key = make_cache_key(model, system_prompt, prompt) if use_cache else None
+    instrumentation.observe("prompt_tokens", estimate_tokens(prompt))
+    if use_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            logger.info(f"✅ Gemini response served from cache ({model}).")
+            instrumentation.inc("llm_cache_hits")
+            if on_chunk is not None:
+                on_chunk(cached)
+            return cached
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        with instrumentation.span("rate_limit_wait"):
+            rate_limiter.acquire()
+        try:
+            logger.info(f"Sending prompt to Gemini model: {model}")
+            instrumentation.inc("llm_calls")
+            with instrumentation.span("llm_call"):
+                text_out = _generate(prompt, model, system_prompt, on_chunk).strip()
+            logger.info("✅ Gemini response received.")
+            instrumentation.observe("response_tokens", estimate_tokens(text_out))
+            if use_cache and text_out and text_out != ERROR_RESPONSE:
+                response_cache.put(key, text_out, model)
+            return text_out
+        except Exception as e:
+            if is_retryable(e) and attempt < LLM_MAX_RETRIES:
+                instrumentation.inc("llm_retries")
+                delay = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt))
+                delay *= random.uniform(0.5, 1.0)  # jitter so workers don't retry in lockstep
+                logger.warning(f"⚠️ Gemini returned {_status_code(e)}, retrying in {delay:.1f}s "
+                               f"(attempt {attempt + 1}/{LLM_MAX_RETRIES})")
+                time.sleep(delay)
+                continue
+            logger.exception("❌ Error during Gemini API call.")
+            instrumentation.inc("llm_errors")
+            return ERROR_RESPONSE
+    return ERROR_RESPONSE
 
 # ---------------- Script Entry Point ----------------
 if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
     logger.info("🚀 Gemini LLM Client started.")
     user_prompt = input("Enter your query for Gemini: ").strip()
     if not user_prompt:
@@ -64,4 +203,5 @@ if __name__ == "__main__":
     answer = ask_gemini(user_prompt)
     print("\n--- Gemini Response ---")
     print(answer)
+    logger.info(f"Cache stats: {response_cache.stats()}")
     logger.info("🏁 Gemini LLM Client finished.")
@@ -1,46 +1,120 @@
 # rag_engine/loader.py
-import pdfplumber
+import json
+import hashlib
 import docx
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from configs.setting import RAW_DOCS_DIR, PROCESSED_TEXTS_DIR, INGEST_MANIFEST_FILE, LOADER_WORKERS
+from modules.doc_parser import extract_pdf_pages
 
-RAW_DIR = Path("data/adgm_reference_docs")
-PROCESSED_DIR = Path("data/processed_texts")
+RAW_DIR = RAW_DOCS_DIR
+PROCESSED_DIR = PROCESSED_TEXTS_DIR
 PROCESSED_DIR.mkdir(exist_ok=True)
 
-def extract_text_from_pdf(file_path):
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text
+def extract_text_from_pdf(file_path, workers=1):
+    pages = extract_pdf_pages(file_path, workers)
+    return "".join(page_text + "\n" for page_text in pages if page_text)
 
 def extract_text_from_docx(file_path):
     doc = docx.Document(file_path)
     return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
 
-def run_loader():
-    """Recursively process PDF/DOCX files in RAW_DIR subfolders."""
-    for file in RAW_DIR.rglob("*"):  # rglob searches recursively
-        if file.is_file():
-            if file.suffix.lower() == ".pdf":
-                text = extract_text_from_pdf(file)
-            elif file.suffix.lower() == ".docx":
-                text = extract_text_from_docx(file)
-            else:
-                print(f"Skipping unsupported file: {file.name}")
-                continue
+def file_sha256(file_path: Path) -> str:
+    """Content hash used to detect changed reference documents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-            # Category from subfolder name (e.g., template, policies, etc.)
-            category = file.parent.name
+def load_manifest() -> dict:
+    """Manifest maps raw file (relative to RAW_DIR) -> {sha256, output}."""
+    if not INGEST_MANIFEST_FILE.exists():
+        return {}
+    try:
+        return json.loads(INGEST_MANIFEST_FILE.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        print(f"⚠️ Ignoring unreadable manifest: {INGEST_MANIFEST_FILE}")
+        return {}
 
-            # Save processed text with category in filename to avoid duplicates
-            out_filename = f"{category}_{file.stem}.txt"
-            out_path = PROCESSED_DIR / out_filename
-            out_path.write_text(text, encoding="utf-8")
+def save_manifest(manifest: dict):
+    INGEST_MANIFEST_FILE.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
 
-            print(f"✅ Processed: {file.name} (Category: {category}) → {out_path.name}")
+def process_file(file: Path, pdf_workers: int = 1):
+    """Extract one PDF/DOCX into PROCESSED_DIR; returns the output path or None if unsupported."""
+    if file.suffix.lower() == ".pdf":
+        text = extract_text_from_pdf(file, pdf_workers)
+    elif file.suffix.lower() == ".docx":
+        text = extract_text_from_docx(file)
+    else:
+        print(f"Skipping unsupported file: {file.name}")
+        return None
+
+    # Category from subfolder name (e.g., template, policies, etc.)
+    category = file.parent.name
+
+    # Save processed text with category in filename to avoid duplicates
+    out_filename = f"{category}_{file.stem}.txt"
+    out_path = PROCESSED_DIR / out_filename
+    out_path.write_text(text, encoding="utf-8")
+
+    print(f"✅ Processed: {file.name} (Category: {category}) → {out_path.name}")
+    return out_path
+
+def run_loader(incremental: bool = False, workers: int = None) -> dict:
+    """
+    Recursively process PDF/DOCX files in RAW_DIR subfolders.
+    Files are extracted concurrently by `workers` processes (default LOADER_WORKERS).
+    With incremental=True only files whose content hash differs from the manifest
+    are re-extracted, and processed texts of deleted files are removed.
+    Returns the processed-text stems that were added, changed and removed.
+    """
+    workers = LOADER_WORKERS if workers is None else workers
+    old_manifest = load_manifest() if incremental else {}
+    manifest = {}
+    changes = {"added": [], "changed": [], "removed": []}
+    pending = []
+
+    for file in sorted(RAW_DIR.rglob("*")):  # rglob searches recursively
+        if not file.is_file():
+            continue
+        rel = file.relative_to(RAW_DIR).as_posix()
+        sha = file_sha256(file)
+        previous = old_manifest.get(rel)
+        if previous and previous["sha256"] == sha and (PROCESSED_DIR / previous["output"]).exists():
+            manifest[rel] = previous
+            continue
+        pending.append((file, rel, sha, previous))
+
+    files = [file for file, _, _, _ in pending]
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            out_paths = list(pool.map(process_file, files))
+    else:
+        # A single pending file gets the page-level pool instead
+        out_paths = [process_file(file, workers) for file in files]
+
+    for (file, rel, sha, previous), out_path in zip(pending, out_paths):
+        if out_path is None:
+            continue
+        manifest[rel] = {"sha256": sha, "output": out_path.name}
+        changes["changed" if previous else "added"].append(out_path.stem)
+
+    for rel, entry in old_manifest.items():
+        if rel not in manifest:
+            out_path = PROCESSED_DIR / entry["output"]
+            if out_path.exists():
+                out_path.unlink()
+            changes["removed"].append(out_path.stem)
+            print(f"🗑️ Removed: {rel} → {out_path.name}")
+
+    save_manifest(manifest)
+    print(f"Loader finished: {len(changes['added'])} added, "
+          f"{len(changes['changed'])} changed, {len(changes['removed'])} removed.")
+    return changes
 
 if __name__ == "__main__":
-    run_loader()
+    from configs.logging_config import setup_logging
+    setup_logging()
+    import sys
+    run_loader(incremental="--incremental" in sys.argv)
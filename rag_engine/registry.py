@@ -0,0 +1,144 @@
+# rag_engine/registry.py
+# Process-wide, lazily initialised embedding model + Chroma handle (and the BM25
+# index built over the same chunks, and the entity prototypes) shared by the retriever,
+# the classifier and the embedder.
+import time
+import logging
+import threading
+from configs.setting import (
+    EMBEDDINGS_DIR, EMBED_MODEL_NAME, BM25_INDEX_FILE, VECTOR_STORE_BACKEND, FLAT_STORE_DIR, ENTITY_PROTOTYPES_FILE
+)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_embeddings = None
+_vector_store = None
+_bm25_index = None
+_entity_prototypes = None
+_load_times = {}
+
+
+def get_embeddings():
+    """Return the shared HuggingFaceEmbeddings model, importing and loading it on the first call."""
+    global _embeddings
+    if _embeddings is None:
+        with _lock:
+            if _embeddings is None:
+                from langchain_community.embeddings import HuggingFaceEmbeddings
+                start = time.perf_counter()
+                logger.info(f"Loading embedding model: {EMBED_MODEL_NAME}")
+                _embeddings = HuggingFaceEmbeddings(model_name=EMBED_MODEL_NAME)
+                _load_times["embeddings"] = time.perf_counter() - start
+                logger.info(f"✅ Embedding model loaded in {_load_times['embeddings']:.2f}s")
+    return _embeddings
+
+
+def get_vector_store():
+    """
+    Return the shared vector store for VECTOR_STORE_BACKEND: the Chroma store on
+    EMBEDDINGS_DIR, or the memory-mapped FlatVectorStore on FLAT_STORE_DIR.
+    """
+    global _vector_store
+    if _vector_store is None:
+        with _lock:
+            if _vector_store is None:
+                embeddings = get_embeddings()
+                start = time.perf_counter()
+                if VECTOR_STORE_BACKEND == "flat":
+                    from rag_engine.flat_store import FlatVectorStore
+                    logger.info(f"Opening flat vector store: {FLAT_STORE_DIR}")
+                    _vector_store = FlatVectorStore(FLAT_STORE_DIR, embedding_function=embeddings)
+                else:
+                    from langchain_community.vectorstores import Chroma
+                    logger.info(f"Loading ChromaDB from: {EMBEDDINGS_DIR}")
+                    _vector_store = Chroma(persist_directory=str(EMBEDDINGS_DIR), embedding_function=embeddings)
+                _load_times["vector_store"] = time.perf_counter() - start
+                logger.info(f"✅ Vector store ({VECTOR_STORE_BACKEND}) opened in {_load_times['vector_store']:.2f}s")
+    return _vector_store
+
+
+def get_collection():
+    """Collection-level handle (count/query/get/delete): Chroma's collection, or the flat store itself."""
+    store = get_vector_store()
+    return store if VECTOR_STORE_BACKEND == "flat" else store._collection
+
+
+def vector_store_exists() -> bool:
+    """Whether the configured backend has been built on disk."""
+    if VECTOR_STORE_BACKEND == "flat":
+        from rag_engine.flat_store import FlatVectorStore
+        return FlatVectorStore.exists(FLAT_STORE_DIR)
+    return EMBEDDINGS_DIR.exists()
+
+
+def get_bm25_index():
+    """
+    Return the shared BM25 index. Loaded from BM25_INDEX_FILE, or rebuilt in memory from
+    the processed texts (same chunking as the vector store) if the file is missing;
+    only rag_engine/embedder.py writes the file. Never loads the embedding model.
+    """
+    global _bm25_index
+    if _bm25_index is None:
+        with _lock:
+            if _bm25_index is None:
+                from rag_engine.bm25_index import BM25Index
+                start = time.perf_counter()
+                if BM25_INDEX_FILE.exists():
+                    _bm25_index = BM25Index.load(BM25_INDEX_FILE)
+                else:
+                    from rag_engine.embedder import build_bm25_index
+                    logger.warning(f"BM25 index not found at {BM25_INDEX_FILE}; rebuilding it in memory for this "
+                                   f"process. Run `python rag_engine/embedder.py` to save it.")
+                    _bm25_index = build_bm25_index()
+                _load_times["bm25_index"] = time.perf_counter() - start
+                logger.info(f"✅ BM25 index loaded ({len(_bm25_index)} chunks) in {_load_times['bm25_index']:.2f}s")
+    return _bm25_index
+
+
+def get_entity_prototypes():
+    """
+    Return the shared EntityPrototypes, loaded from ENTITY_PROTOTYPES_FILE or, if the file
+    is missing, built from the processed checklist texts and saved. None if there are none.
+    """
+    global _entity_prototypes
+    if _entity_prototypes is None:
+        with _lock:
+            if _entity_prototypes is None:
+                from rag_engine.entity_prototypes import EntityPrototypes, write_entity_prototypes
+                start = time.perf_counter()
+                if ENTITY_PROTOTYPES_FILE.exists():
+                    _entity_prototypes = EntityPrototypes.load(ENTITY_PROTOTYPES_FILE)
+                else:
+                    logger.warning(f"Entity prototypes not found at {ENTITY_PROTOTYPES_FILE}; building from checklists.")
+                    _entity_prototypes = write_entity_prototypes(ENTITY_PROTOTYPES_FILE)
+                    if _entity_prototypes is None:
+                        return None
+                _load_times["entity_prototypes"] = time.perf_counter() - start
+                logger.info(f"✅ Entity prototypes loaded ({len(_entity_prototypes.entities)} types) "
+                            f"in {_load_times['entity_prototypes']:.2f}s")
+    return _entity_prototypes
+
+
+def reload(embeddings: bool = False):
+    """
+    Drop cached handles so the next call reopens them.
+    Call after the index is rebuilt; pass embeddings=True to also reload the model.
+    """
+    global _embeddings, _vector_store, _bm25_index, _entity_prototypes
+    with _lock:
+        _vector_store = None
+        _bm25_index = None
+        _entity_prototypes = None
+        for handle in ("vector_store", "bm25_index", "entity_prototypes"):
+            _load_times.pop(handle, None)
+        if embeddings:
+            _embeddings = None
+            _load_times.pop("embeddings", None)
+    logger.info("Registry handles released; they will be reloaded on next use.")
+
+
+def load_times() -> dict:
+    """Seconds spent loading each handle in this process."""
+    with _lock:
+        return dict(_load_times)
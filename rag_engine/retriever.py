@@ -1,24 +1,17 @@
 # rag_engine/retriever.py
-import os
 import sys
 import logging
 from pathlib import Path
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from configs.setting import EMBEDDINGS_DIR, EMBED_MODEL_NAME, RETRIEVAL_K
-
-# ---------------- Logging Setup ----------------
-LOG_FILE = "logs/retriever.log"
-os.makedirs("logs", exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - [%(levelname)s] - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8"),
-        logging.StreamHandler(sys.stdout)
-    ]
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from configs.setting import (
+    EMBEDDINGS_DIR, EMBED_MODEL_NAME, RETRIEVAL_K,
+    RETRIEVAL_MODE, HYBRID_ALPHA, HYBRID_CANDIDATES, VECTOR_STORE_BACKEND
 )
+from rag_engine import registry
+
+if TYPE_CHECKING:  # langchain is imported on first retrieval, not at import time
+    from langchain_core.documents import Document
+
 logger = logging.getLogger(__name__)
 
 # ---------------- Constants ----------------
@@ -28,10 +21,9 @@ K = RETRIEVAL_K
 
 # ---------------- Functions ----------------
 def load_embeddings():
-    """Load HuggingFace embeddings model with error handling."""
+    """Return the shared HuggingFace embeddings model with error handling."""
     try:
-        logger.info(f"Loading embedding model: {EMBEDDING_MODEL}")
-        return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+        return registry.get_embeddings()
     except Exception as e:
         logger.exception("Failed to load embeddings model.")
         sys.exit(1)
@@ -42,18 +34,181 @@ def get_retriever():
         logger.error(f"ChromaDB persist directory not found: {PERSIST_DIR}")
         sys.exit(1)
 
-    embeddings = load_embeddings()
+    load_embeddings()
 
     try:
-        logger.info(f"Loading ChromaDB from: {PERSIST_DIR}")
-        db = Chroma(persist_directory=PERSIST_DIR, embedding_function=embeddings)
+        db = registry.get_vector_store()
         return db.as_retriever(search_kwargs={"k": K})
     except Exception as e:
         logger.exception("Failed to load ChromaDB.")
         sys.exit(1)
 
+def retrieve_batch(queries: List[str], k: int = K) -> List[List["Document"]]:
+    """
+    Top-k chunks for every query at once: all queries are embedded in a single
+    encode call and searched in one batched vector-store query (Chroma or flat).
+    Returns one list of Documents per query, in query order; each Document's
+    metadata carries its `distance` to the query.
+    """
+    from langchain_core.documents import Document
+
+    if not queries:
+        return []
+    if not registry.vector_store_exists():
+        logger.error(f"Vector store ({VECTOR_STORE_BACKEND}) not found; run rag_engine/embedder.py first.")
+        return [[] for _ in queries]
+
+    embeddings = load_embeddings()
+    try:
+        collection = registry.get_collection()
+        n_results = min(k, collection.count())
+        if n_results == 0:
+            logger.warning("Vector store is empty.")
+            return [[] for _ in queries]
+
+        query_vectors = embeddings.embed_documents(list(queries))
+        results = collection.query(
+            query_embeddings=query_vectors,
+            n_results=n_results,
+            include=["documents", "metadatas", "distances"]
+        )
+    except Exception as e:
+        logger.exception("Error during batch retrieval.")
+        return [[] for _ in queries]
+
+    batched = []
+    for ids, docs, metas, dists in zip(results["ids"], results["documents"], results["metadatas"], results["distances"]):
+        batched.append([
+            Document(page_content=doc, metadata={**(meta or {}), "chunk_id": chunk_id, "distance": dist})
+            for chunk_id, doc, meta, dist in zip(ids, docs, metas, dists)
+        ])
+    logger.info(f"Retrieved top-{n_results} chunks for {len(queries)} queries in one batch.")
+    return batched
+
+def retrieve_lexical(queries: List[str], k: int = K) -> List[List["Document"]]:
+    """
+    Top-k chunks per query from the BM25 index only; needs no model inference.
+    Each Document's metadata carries its `bm25` score and a normalised `score`.
+    """
+    from langchain_core.documents import Document
+
+    try:
+        index = registry.get_bm25_index()
+    except Exception as e:
+        logger.exception("Failed to load BM25 index.")
+        return [[] for _ in queries]
+
+    batched = []
+    for query in queries:
+        hits = index.search(query, k)
+        top = hits[0][1] if hits else 0.0
+        batched.append([
+            Document(page_content=index.texts[chunk_id], metadata={
+                **index.metadatas[chunk_id], "chunk_id": chunk_id,
+                "bm25": score, "score": score / top if top else 0.0
+            })
+            for chunk_id, score in hits
+        ])
+    return batched
+
+def _min_max(scores: Dict[str, float]) -> Dict[str, float]:
+    if not scores:
+        return {}
+    low, high = min(scores.values()), max(scores.values())
+    if high == low:
+        return {key: 1.0 for key in scores}
+    return {key: (value - low) / (high - low) for key, value in scores.items()}
+
+def _fusion_key(doc, by_id: bool) -> str:
+    """Chunk id, or the whitespace-normalised chunk text when ids of the two indexes are not comparable."""
+    if by_id and doc.metadata.get("chunk_id"):
+        return doc.metadata["chunk_id"]
+    return " ".join(doc.page_content.split())
+
+def _ids_shared_with_bm25(dense: List[List["Document"]]) -> bool:
+    """
+    Whether dense hits carry the BM25 index's chunk ids ("<stem>::<n>"). Chroma stores
+    built before chunk ids were assigned use random UUIDs, which never match.
+    """
+    ids = {doc.metadata.get("chunk_id") for docs in dense for doc in docs}
+    if not ids:
+        return True
+    try:
+        known = registry.get_bm25_index().doc_len
+    except Exception:
+        return False
+    if all(chunk_id in known for chunk_id in ids):
+        return True
+    logger.warning("Vector store chunk ids do not match the BM25 index; fusing hybrid results by chunk text. "
+                   "Rebuild the index (python rag_engine/embedder.py) to fuse by id.")
+    return False
+
+def fuse_results(dense_docs: List["Document"], lexical_docs: List["Document"], k: int,
+                 alpha: float = HYBRID_ALPHA, by_id: bool = True) -> List[Tuple["Document", float, Optional[float]]]:
+    """
+    Top-k (document, fused score, bm25 score or None) for one query: both score lists are
+    min-max normalised and combined as alpha * vector + (1 - alpha) * bm25
+    (a chunk missing from one list scores 0 there). A chunk found by both counts once.
+    """
+    docs = {}
+    vector_scores, bm25_scores = {}, {}
+    for doc in dense_docs:
+        key = _fusion_key(doc, by_id)
+        docs[key] = doc
+        vector_scores[key] = 1.0 / (1.0 + float(doc.metadata["distance"]))
+    for doc in lexical_docs:
+        key = _fusion_key(doc, by_id)
+        docs.setdefault(key, doc)
+        bm25_scores[key] = doc.metadata["bm25"]
+
+    vector_norm, bm25_norm = _min_max(vector_scores), _min_max(bm25_scores)
+    fused = {
+        key: alpha * vector_norm.get(key, 0.0) + (1 - alpha) * bm25_norm.get(key, 0.0)
+        for key in docs
+    }
+    ranked = sorted(fused, key=fused.get, reverse=True)[:k]
+    return [(docs[key], fused[key], bm25_scores.get(key)) for key in ranked]
+
+def retrieve_hybrid(queries: List[str], k: int = K, alpha: float = HYBRID_ALPHA,
+                    candidates: int = HYBRID_CANDIDATES) -> List[List["Document"]]:
+    """
+    Fuse dense and BM25 results: each index returns `candidates` chunks per query,
+    combined by fuse_results().
+    """
+    from langchain_core.documents import Document
+
+    if not queries:
+        return []
+    dense = retrieve_batch(queries, max(k, candidates))
+    lexical = retrieve_lexical(queries, max(k, candidates))
+    by_id = _ids_shared_with_bm25(dense)
+
+    batched = []
+    for dense_docs, lexical_docs in zip(dense, lexical):
+        results = []
+        for doc, score, bm25 in fuse_results(dense_docs, lexical_docs, k, alpha, by_id):
+            metadata = {**doc.metadata, "score": score}
+            if bm25 is not None:
+                metadata["bm25"] = bm25
+            results.append(Document(page_content=doc.page_content, metadata=metadata))
+        batched.append(results)
+    return batched
+
+def retrieve(queries: List[str], k: int = K, mode: Optional[str] = None) -> List[List["Document"]]:
+    """Top-k chunks per query using `mode` or the configured RETRIEVAL_MODE ("vector", "lexical" or "hybrid")."""
+    mode = mode or RETRIEVAL_MODE
+    if mode == "lexical":
+        return retrieve_lexical(queries, k)
+    if mode == "hybrid":
+        return retrieve_hybrid(queries, k)
+    return retrieve_batch(queries, k)
+
 def run_query(query: str):
     """Run a similarity search and return results."""
+    if VECTOR_STORE_BACKEND == "flat":
+        results = retrieve_batch([query])[0]
+        logger.info(f"Retrieved {len(results)} results.")
+        return results
     retriever = get_retriever()
     try:
         results = retriever.get_relevant_documents(query)
@@ -68,6 +223,8 @@ def run_query(query: str):
 
 # ---------------- Script Entry Point ----------------
 if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
     logger.info("Retriever script started.")
     user_query = "What documents are required for company incorporation?"
     logger.info(f"Query: {user_query}")
@@ -80,4 +237,5 @@ if __name__ == "__main__":
         print(f"Category : {r.metadata.get('category')}")
         print(f"Content  :\n{r.page_content}\n")
 
+    logger.info(f"Load times: {registry.load_times()}")
     logger.info("Retriever script finished.")
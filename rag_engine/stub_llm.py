@@ -0,0 +1,125 @@
+# rag_engine/stub_llm.py
+import json
+import random
+import re
+import threading
+import time
+from typing import Iterator
+
+
+_CLAUSE_IDS = re.compile(r"^\s*\[(C\d+)\]", re.MULTILINE)
+
+
+class StubLLMError(Exception):
+    """HTTP-style error raised by the stub backend (exposes `.code` like google.api_core errors)."""
+
+    def __init__(self, code: int, message: str = ""):
+        super().__init__(message or f"Stub LLM error {code}")
+        self.code = code
+
+
+class StubLLMBackend:
+    """
+    Local stand-in for Gemini. Install with rag_engine.llm_client.set_llm_backend(StubLLMBackend(...)).
+    Injects latency plus random 429 / 503 errors so concurrency, rate limiting
+    and retries can be exercised without network access.
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.0,
+                 throttle_rate: float = 0.0, server_error_rate: float = 0.0,
+                 seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.server_error_rate = server_error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(self, prompt: str, model: str) -> str:
+        roll, delay = self._begin()
+        try:
+            time.sleep(delay)
+            self._maybe_fail(roll)
+            return self.respond(prompt)
+        finally:
+            self._end()
+
+    def stream(self, prompt: str, model: str, chunks: int = 4) -> Iterator[str]:
+        """
+        Streamed variant of __call__: the answer arrives in `chunks` pieces spread over the
+        latency, so the first piece comes after 1/chunks of it. Errors are raised before any piece.
+        """
+        roll, delay = self._begin()
+        try:
+            time.sleep(delay / chunks)
+            self._maybe_fail(roll)
+            text = self.respond(prompt)
+            size = max(1, -(-len(text) // chunks))
+            for start in range(0, len(text), size):
+                if start:
+                    time.sleep(delay / chunks)
+                yield text[start:start + size]
+        finally:
+            self._end()
+
+    def _begin(self):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return self._random.random(), self.latency + self._random.uniform(0, self.jitter)
+
+    def _end(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _maybe_fail(self, roll: float):
+        if roll < self.throttle_rate:
+            self._count_error()
+            raise StubLLMError(429, "Resource has been exhausted (stub)")
+        if roll < self.throttle_rate + self.server_error_rate:
+            self._count_error()
+            raise StubLLMError(503, "Service unavailable (stub)")
+
+    @staticmethod
+    def respond(prompt: str) -> str:
+        """Deterministic answer; batched prompts get a JSON array with one object per [C#] clause."""
+        answer = {
+            "section_summary": prompt.strip()[:60],
+            "issue": "None (stub response)",
+            "reference": "N/A",
+            "severity": "Low"
+        }
+        clause_ids = list(dict.fromkeys(_CLAUSE_IDS.findall(prompt)))
+        if clause_ids:
+            return json.dumps([{"clause_id": clause_id, **answer} for clause_id in clause_ids])
+        return json.dumps(answer)
+
+    def _count_error(self):
+        with self._lock:
+            self.errors += 1
+
+
+# ---------------- Test ----------------
+if __name__ == "__main__":
+    from configs.logging_config import setup_logging
+    setup_logging()
+    from concurrent.futures import ThreadPoolExecutor
+    from rag_engine import llm_client
+
+    stub = StubLLMBackend(latency=0.3, jitter=0.1, throttle_rate=0.2, server_error_rate=0.05, seed=7)
+    llm_client.set_llm_backend(stub)
+
+    prompts = [f"Clause {i}: The company shall maintain a registered office in ADGM." for i in range(20)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        answers = list(pool.map(llm_client.ask_gemini, prompts))
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for a in answers if a != llm_client.ERROR_RESPONSE)
+    print(f"{ok}/{len(prompts)} answered in {elapsed:.2f}s "
+          f"(calls={stub.calls}, injected errors={stub.errors}, max in flight={stub.max_in_flight})")
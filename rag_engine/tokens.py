@@ -0,0 +1,56 @@
+# rag_engine/tokens.py
+import re
+import logging
+import threading
+
+from configs.setting import TOKEN_COUNTER
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers and individual punctuation marks, roughly how subword tokenizers split text
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+_counter = None  # chosen once per process so budgets and cache keys never shift mid-run
+_counter_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local token estimate for prompt budgeting.
+    Long words count as several tokens (about one per 4 characters), like subword vocabularies.
+    """
+    return sum(max(1, len(piece) // 4) for piece in _PIECES.findall(text))
+
+
+def _embedding_counter():
+    """Token counter using the subword tokenizer of the shared embedding model (loads the model)."""
+    from rag_engine import registry
+    tokenizer = registry.get_embeddings().client.tokenizer
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False, verbose=False))
+
+
+def _get_counter():
+    """The TOKEN_COUNTER method, resolved on first use and kept for the rest of the process."""
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                counter = estimate_tokens
+                if TOKEN_COUNTER == "embedding":
+                    try:
+                        counter = _embedding_counter()
+                    except Exception as e:
+                        logger.warning(f"Tokenizer unavailable, using estimated token counts: {e}")
+                elif TOKEN_COUNTER != "estimate":
+                    logger.warning(f"Unknown TOKEN_COUNTER {TOKEN_COUNTER!r}, using estimated token counts")
+                _counter = counter
+    return _counter
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count for prompt budgeting. Neither method is Gemini's own tokenizer, so both
+    approximate the tokens Gemini bills. The method (TOKEN_COUNTER) is fixed per process:
+    whether the embedding model happens to be loaded never changes a count.
+    """
+    return _get_counter()(text)
@@ -0,0 +1,24 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def stub_pipeline(monkeypatch):
+    """Stub LLM, no response cache and lexical retrieval with empty contexts: no model, API key or index needed."""
+    from modules import redflag_detector
+    from rag_engine import llm_client, retriever
+    from rag_engine.stub_llm import StubLLMBackend
+
+    monkeypatch.setenv("LLM_CACHE_BYPASS", "1")
+    monkeypatch.setattr(retriever, "RETRIEVAL_MODE", "lexical")
+    monkeypatch.setattr(redflag_detector, "retrieve", lambda queries, k=None: [[] for _ in queries])
+    llm_client.set_llm_backend(StubLLMBackend(latency=0.0))
+    yield
+    llm_client.set_llm_backend(None)
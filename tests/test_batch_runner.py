@@ -0,0 +1,36 @@
+# tests/test_batch_runner.py
+import json
+from multiprocessing import Pool
+
+import batch_runner
+from benchmarks.synthetic_docs import write_pdf
+from configs.setting import PDF_PARALLEL_MIN_PAGES
+from modules.doc_parser import load_document
+
+PAGES = PDF_PARALLEL_MIN_PAGES + 20
+
+
+def _section_count(path: str) -> int:
+    return len(load_document(path, classify=False).sections)
+
+
+def test_large_pdf_parses_inside_batch_worker(tmp_path, stub_pipeline):
+    pdf = write_pdf(tmp_path / "big.pdf", clauses=30, pages=PAGES)
+    expected = _section_count(str(pdf))
+    assert expected > 0
+
+    # Pool workers are daemonic: they must not start the page extraction pool
+    with Pool(1, initializer=batch_runner._init_worker, initargs=(None, 1)) as pool:
+        assert pool.apply(_section_count, (str(pdf),)) == expected
+
+
+def test_run_batch_large_pdf(tmp_path, stub_pipeline):
+    pdf = write_pdf(tmp_path / "big.pdf", clauses=30, pages=PAGES)
+    output = tmp_path / "results.jsonl"
+
+    stats = batch_runner.run_batch([pdf], output, workers=1)
+
+    assert stats["ok"] == 1 and stats["error"] == 0
+    record = json.loads(output.read_text(encoding="utf-8").splitlines()[0])
+    assert record["status"] == "ok"
+    assert record["red_flag_findings"]
@@ -0,0 +1,73 @@
+# tests/test_bm25_index.py
+import pytest
+
+from rag_engine.bm25_index import BM25Index, tokenize
+
+CHUNKS = [
+    ("aoa::0", "The company shall keep a register of beneficial owners.", {"source": "aoa.pdf"}),
+    ("aoa::1", "Annual accounts must be filed within nine months of year end.", {"source": "aoa.pdf"}),
+    ("ubo::0", "Each beneficial owner must be declared to the Registrar.", {"source": "ubo.pdf"}),
+    ("ubo::1", "Changes of beneficial owners are notified within fifteen days.", {"source": "ubo.pdf"}),
+    ("office::0", "A registered office must be maintained in ADGM.", {"source": "office.pdf"}),
+]
+QUERIES = ["beneficial owners register", "annual accounts", "registered office ADGM", "notified days"]
+
+
+def _index(chunks) -> BM25Index:
+    index = BM25Index()
+    index.add([c[0] for c in chunks], [c[1] for c in chunks], [c[2] for c in chunks])
+    return index
+
+
+def _assert_same(index: BM25Index, expected: BM25Index):
+    assert dict(index.postings) == dict(expected.postings)
+    assert index.doc_len == expected.doc_len and index.total_len == expected.total_len
+    assert index.texts == expected.texts and index.metadatas == expected.metadatas
+    for query in QUERIES:
+        assert index.search(query, 3) == pytest.approx(expected.search(query, 3))
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("The Companies Regulations 2020 shall apply.") == ["companies", "regulations", "2020", "apply"]
+
+
+def test_remove_matches_an_index_built_without_the_chunks():
+    index = _index(CHUNKS)
+    index.remove(["aoa::1", "missing::0"])
+    _assert_same(index, _index([c for c in CHUNKS if c[0] != "aoa::1"]))
+
+    index.remove_source("ubo.pdf")
+    _assert_same(index, _index([c for c in CHUNKS if c[0] in ("aoa::0", "office::0")]))
+    assert all(postings for postings in index.postings.values())  # no empty posting lists left behind
+
+
+def test_re_adding_a_chunk_replaces_it():
+    index = _index(CHUNKS)
+    index.add(["aoa::0"], ["Directors are appointed by ordinary resolution."], [{"source": "aoa.pdf"}])
+    updated = [("aoa::0", "Directors are appointed by ordinary resolution.", {"source": "aoa.pdf"})] + CHUNKS[1:]
+    _assert_same(index, _index(updated))
+    assert "register" not in index.postings
+
+
+def test_search_ranks_and_round_trips(tmp_path):
+    index = _index(CHUNKS)
+    hits = index.search("beneficial owners register", 2)
+    assert hits[0][0] == "aoa::0" and hits[0][1] > hits[1][1] > 0
+    assert index.search("shall the of", 5) == []  # stopwords only
+
+    index.save(tmp_path / "bm25.json")
+    _assert_same(BM25Index.load(tmp_path / "bm25.json"), index)
+    index.remove(list(index.texts))
+    assert len(index) == 0 and index.search("beneficial", 3) == []
+
+
+def test_missing_index_file_is_rebuilt_in_memory_only(tmp_path, monkeypatch):
+    from rag_engine import embedder, registry
+
+    index_file = tmp_path / "bm25_index.json"
+    monkeypatch.setattr(registry, "BM25_INDEX_FILE", index_file)
+    monkeypatch.setattr(registry, "_bm25_index", None)
+    monkeypatch.setattr(embedder, "build_bm25_index", lambda: _index(CHUNKS))
+
+    assert len(registry.get_bm25_index()) == len(CHUNKS)
+    assert not index_file.exists()
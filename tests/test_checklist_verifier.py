@@ -0,0 +1,74 @@
+# tests/test_checklist_verifier.py
+import json
+import os
+
+import pytest
+
+from modules import checklist_verifier
+from modules.checklist_verifier import ChecklistIndex
+
+CHECKLIST = {
+    "Branch": ["Branch Registration Form", "Parent Company Resolution"],
+    "SPV": ["Model Articles – SPV", "Parent Company Resolution"],
+}
+
+
+def _write_checklist(path, data, bump: int = 0):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if bump:  # mtime resolution can be coarse; move it forward explicitly
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump * 10 ** 9))
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    checklist_file, docs_dir = tmp_path / "checklist.json", tmp_path / "processed_texts"
+    docs_dir.mkdir()
+    (docs_dir / "branch registration form.txt").write_text("form")
+    _write_checklist(checklist_file, CHECKLIST)
+
+    loads = []
+    load = checklist_verifier.load_checklist
+    monkeypatch.setattr(checklist_verifier, "load_checklist", lambda path: loads.append(path) or load(path))
+    index = ChecklistIndex(checklist_file, docs_dir)
+    index.loads = loads
+    return index
+
+
+def test_verify_against_reference_documents(index):
+    assert index.verify("Branch") == {"present": ["Branch Registration Form"],
+                                      "missing": ["Parent Company Resolution"]}
+    assert index.verify("Unknown") == {"present": [], "missing": []}
+
+
+def test_index_is_reused_until_the_checklist_changes(index):
+    index.verify("Branch")
+    index.verify("SPV")
+    index.verify_all()
+    assert index.loads == [index.checklist_file]
+
+    _write_checklist(index.checklist_file, {**CHECKLIST, "Branch": ["Branch Registration Form"]}, bump=5)
+    assert index.verify("Branch") == {"present": ["Branch Registration Form"], "missing": []}
+    assert len(index.loads) == 2
+
+
+def test_new_reference_document_triggers_a_reload(index):
+    assert index.verify("SPV")["present"] == []
+    (index.docs_dir / "parent company resolution.txt").write_text("resolution")
+    stat = index.docs_dir.stat()
+    os.utime(index.docs_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5 * 10 ** 9))
+
+    assert index.verify("SPV")["present"] == ["Parent Company Resolution"]
+    assert len(index.loads) == 2
+
+
+def test_verify_uploaded_documents(index):
+    uploads = ["Model_Articles-SPV.docx", "parent company resolution.PDF"]
+    assert index.verify("SPV", documents=uploads) == {
+        "present": ["Model Articles – SPV", "Parent Company Resolution"], "missing": []
+    }
+    # Uploaded names replace the reference folder
+    assert index.verify("Branch", documents=uploads)["present"] == ["Parent Company Resolution"]
+    assert index.verify_all(documents=uploads) == {
+        entity: index.verify(entity, documents=uploads) for entity in CHECKLIST
+    }
@@ -0,0 +1,54 @@
+# tests/test_context_builder.py
+from types import SimpleNamespace
+
+from rag_engine.context_builder import assemble_context, strip_overlap
+from rag_engine.tokens import count_tokens
+
+
+def _doc(text, score):
+    return SimpleNamespace(page_content=text, metadata={"score": score})
+
+
+def _words(prefix, n):
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def test_strip_overlap_cuts_the_shared_edge():
+    shared = "the register of beneficial owners is kept"
+    assert strip_overlap("Directors confirm that " + shared, shared + " at the office.") == "at the office."
+    assert strip_overlap(shared + " at the office.", "Directors confirm that " + shared) == "Directors confirm that"
+    assert strip_overlap("unrelated text here", "no shared edge at all") == "no shared edge at all"
+
+
+def test_neighbouring_chunks_lose_the_splitter_overlap():
+    shared = "shares may be transferred only with board approval"
+    first, second = f"{_words('a', 20)} {shared}", f"{shared} {_words('b', 20)}"
+    chunks, _ = assemble_context([_doc(first, 1.0), _doc(second, 0.9)], token_budget=1000)
+    assert chunks == [first, _words("b", 20)]
+
+
+def test_duplicates_are_dropped_and_diverse_chunks_ranked_first():
+    base = _words("w", 30)
+    near = base + " extra closing words"           # redundant with base, below the duplicate threshold
+    other = _words("z", 30)
+    docs = [_doc(base, 1.0), _doc(base, 0.95), _doc(near, 0.9), _doc(other, 0.8)]
+    chunks, _ = assemble_context(docs, token_budget=1000, mmr_lambda=0.5, dup_threshold=0.95)
+    assert chunks[:2] == [base, other]  # exact copy dropped, diverse chunk beats the redundant one
+    assert len(chunks) == 3 and chunks[2].endswith("extra closing words")
+
+
+def test_budget_truncates_only_the_first_chunk_and_skips_later_ones():
+    long_doc, huge, small = _words("l", 200), _words("h", 300), _words("s", 5)
+    chunks, stats = assemble_context([_doc(long_doc, 1.0), _doc(huge, 0.9), _doc(small, 0.8)], token_budget=100)
+    assert chunks[0] == _words("l", 200)[:len(chunks[0])] and count_tokens(chunks[0]) <= 100
+    assert huge not in chunks
+    assert stats["used_tokens"] <= 100
+
+
+def test_stats_count_saved_tokens():
+    docs = [_doc(_words("a", 50), 1.0), _doc(_words("a", 50), 0.9), _doc(_words("c", 10), 0.8)]
+    chunks, stats = assemble_context(docs, token_budget=1000)
+    retrieved = sum(count_tokens(doc.page_content) for doc in docs)
+    used = sum(count_tokens(chunk) for chunk in chunks)
+    assert stats == {"retrieved_tokens": retrieved, "used_tokens": used, "saved_tokens": retrieved - used}
+    assert stats["saved_tokens"] == count_tokens(_words("a", 50))
@@ -0,0 +1,85 @@
+# tests/test_doc_classifier.py
+from pathlib import Path
+
+import pytest
+
+from modules.doc_classifier import (
+    KeywordMatcher, _chunked, _leader, classify_by_keywords_stream, classify_document, get_keyword_matcher
+)
+
+PROCESSED_TEXTS = Path(__file__).resolve().parents[1] / "data" / "processed_texts"
+
+# Reference documents → (entity type, confidence) of the keyword pass
+REFERENCE_DOCS = {
+    "checklists_docs_Branch - Financial Services and Non-Financial Services.txt":
+        ("Branch_Financial_NonFinancial", 0.75),
+    "checklists_docs_Private Company Limited by Guarantee Non-Financial Services 20231228.txt":
+        ("PrivateCompany_LimitedByGuarantee_NonFinancial", 0.75),
+    "checklists_docs_Private Company Limited by Shares - Non-Financial Services.txt":
+        ("PrivateCompany_LimitedByShares_NonFinancial", 0.75),
+    "checklists_docs_Private Company Limited by Shares continuance SPV 20231228.txt":
+        ("SPV_Continuance", 0.75),
+    "checklists_docs_Private Company Limited by Shares-Financial Services 20230509.txt":
+        ("PrivateCompany_LimitedByShares_Financial", 0.75),
+    # Shares_NonFinancial and Shares_Financial both match completely; the first listed wins
+    "guidance_QuickGuide_EventDrivenFilings_Company_V1.2_2025.txt":
+        ("PrivateCompany_LimitedByShares_NonFinancial", 0.5),
+    "guidance_Beneficial Ownership and Control Guidance 2021.txt": (None, 0.0),
+    "templates_adgm-ra-model-articles-private-company-limited-by-shares.txt": (None, 0.0),
+}
+
+
+def _scan(matcher: KeywordMatcher, chunks) -> set:
+    matcher.reset()
+    found = [pid for chunk in chunks for pid in matcher.feed(chunk)] + matcher.finish()
+    return {matcher.patterns[pid] for pid in found}
+
+
+@pytest.mark.parametrize("name", sorted(REFERENCE_DOCS))
+def test_reference_documents(name):
+    path = PROCESSED_TEXTS / name
+    text = path.read_text(encoding="utf-8")
+
+    full_scan = _leader(_scan(get_keyword_matcher(), [f"{path.stem} ", text]))
+    assert full_scan == REFERENCE_DOCS[name]
+    for size in (1024, 97, 7):
+        result = classify_by_keywords_stream(_chunked(text, size), path.stem, separator="")
+        assert (result.entity_type, result.confidence) == full_scan
+    result = classify_by_keywords_stream(text.split("\n"), path.stem)
+    assert (result.entity_type, result.confidence) == full_scan
+    if full_scan[0]:
+        assert classify_document(str(path), text)["entity_type"] == full_scan[0]
+
+
+def test_matches_across_block_boundaries():
+    matcher = KeywordMatcher(["private company limited by shares", "llp"])
+    assert _scan(matcher, ["This Private Comp", "any\n  Limited", " by SHARES."]) == \
+        {"private company limited by shares"}
+    assert _scan(matcher, ["an l", "lp"]) == {"llp"}  # confirmed at end of text
+
+
+def test_matches_on_word_boundaries_only():
+    matcher = KeywordMatcher(["llp", "financial services", "non-financial"])
+    assert _scan(matcher, ["fullpage, allparts and nonfinancial services"]) == set()
+    assert _scan(matcher, ["acme-llp deed"]) == set()           # "-" joins words
+    assert _scan(matcher, ["acme_llp_deed"]) == {"llp"}          # filename separators do not
+    assert _scan(matcher, ["(LLP) for non-financial services"]) == {"llp", "non-financial"}
+    assert _scan(matcher, ["financial servicesx"]) == set()
+
+
+def test_keyword_spanning_a_scan_chunk_boundary():
+    text = "x" * 1014 + " private company limited by shares and non-financial"
+    assert classify_document("upload.docx", text)["entity_type"] == "PrivateCompany_LimitedByShares_NonFinancial"
+
+
+@pytest.mark.parametrize("blocks", [
+    ["Branch of a firm providing financial services", "and non-financial services.",
+     "Private company limited by shares"],
+    ["Branch providing financial services and non-financial services.", "A limited liability partnership (LLP)."],
+    ["Private company limited by shares", "non-financial", "financial services", "branch"],
+])
+def test_streamed_result_equals_full_scan(blocks):
+    streamed = classify_by_keywords_stream(blocks, "upload")
+    full = classify_by_keywords_stream(["\n".join(blocks)], "upload")
+    assert (streamed.entity_type, streamed.confidence) == (full.entity_type, full.confidence)
+    assert full.entity_type is not None
@@ -0,0 +1,58 @@
+# tests/test_doc_parser.py
+import pytest
+
+from benchmarks.synthetic_docs import write_docx, write_pdf
+from modules import doc_parser
+from modules.doc_classifier import classify_document
+from modules.doc_parser import iter_document, iter_pdf_pages, load_document
+from modules.sectioner import iter_structured_sections
+
+
+@pytest.fixture(params=["docx", "pdf"])
+def synthetic_doc(request, tmp_path):
+    writer = write_docx if request.param == "docx" else write_pdf
+    return writer(tmp_path / f"contract.{request.param}", clauses=10)
+
+
+def test_load_document_sections_match_streamed_blocks(synthetic_doc):
+    parsed = load_document(str(synthetic_doc), classify=False)
+    expected = list(iter_structured_sections(iter_document(str(synthetic_doc))))
+    assert parsed.sections == expected
+    assert parsed.classification == {}
+
+
+def test_load_document_classification_matches_full_text_scan(synthetic_doc):
+    parsed = load_document(str(synthetic_doc))
+    full_text = "\n".join(block.text for block in iter_document(str(synthetic_doc)) if block.text)
+    assert parsed.classification == classify_document(str(synthetic_doc), full_text)
+    assert parsed.entity_type == "PrivateCompany_LimitedByShares_NonFinancial"
+
+
+def test_text_is_derived_from_sections(synthetic_doc):
+    parsed = load_document(str(synthetic_doc), classify=False)
+    assert "text" not in vars(parsed)
+    assert parsed.text == "\n".join(parsed.section_texts)
+
+
+def test_docx_keeps_loaded_document(tmp_path):
+    parsed = load_document(str(write_docx(tmp_path / "contract.docx", clauses=3)), classify=False)
+    assert parsed.docx_document is not None
+    assert {section.paragraph_start for section in parsed.sections} <= set(range(len(parsed.docx_document.paragraphs)))
+
+
+def test_missing_and_unsupported_files_have_no_sections(tmp_path):
+    assert load_document(str(tmp_path / "missing.pdf")).sections == []
+    other = tmp_path / "notes.txt"
+    other.write_text("1. Clause text")
+    parsed = load_document(str(other))
+    assert parsed.sections == [] and parsed.classification == {}
+
+
+def test_parallel_pdf_pages_match_sequential(tmp_path, monkeypatch):
+    monkeypatch.setattr(doc_parser, "PDF_PARALLEL_MIN_PAGES", 5)
+    pdf = write_pdf(tmp_path / "long.pdf", clauses=4, pages=12)
+    sequential = list(iter_pdf_pages(pdf, workers=1))
+    parallel = list(iter_pdf_pages(pdf, workers=2))
+    assert len(sequential) == 12
+    assert parallel == sequential
+    assert [block.page for block in parallel] == list(range(12))
@@ -0,0 +1,80 @@
+# tests/test_flat_store.py
+import numpy as np
+import pytest
+
+from rag_engine.flat_store import FlatVectorStore
+
+IDS = ["aoa::0", "aoa::1", "ubo::0", "ubo::1"]
+TEXTS = ["registered office", "annual accounts", "beneficial owners", "owner declaration"]
+METAS = [{"source": "aoa.pdf"}, {"source": "aoa.pdf"}, {"source": "ubo.pdf"}, {"source": "ubo.pdf"}]
+VECTORS = [[1.0, 0.0, 0.0], [0.8, 0.6, 0.0], [0.0, 1.0, 0.0], [0.0, 0.6, 0.8]]
+
+
+@pytest.fixture
+def store(tmp_path):
+    FlatVectorStore.write(IDS, TEXTS, METAS, VECTORS, tmp_path, dtype="float32")
+    return FlatVectorStore(tmp_path)
+
+
+def test_query_matches_chroma_result_shape(store):
+    result = store.query([[2.0, 0.0, 0.0], [0.0, 0.0, 1.0]], n_results=2,
+                         include=["documents", "metadatas", "distances"])
+
+    assert set(result) == {"ids", "documents", "metadatas", "distances"}
+    assert result["ids"] == [["aoa::0", "aoa::1"], ["ubo::1", "aoa::0"]]  # one list per query, best first
+    assert result["documents"][0] == ["registered office", "annual accounts"]
+    assert result["metadatas"][1][0] == {"source": "ubo.pdf"}
+    assert result["distances"][0] == pytest.approx([0.0, 0.2])
+    assert result["distances"][1] == pytest.approx([0.2, 1.0])
+
+
+def test_query_include_where_and_limits(store):
+    result = store.query([[0.0, 1.0, 0.0]], n_results=10, where={"source": "ubo.pdf"}, include=["distances"])
+    assert result["ids"] == [["ubo::0", "ubo::1"]]
+    assert result["documents"] is None and result["metadatas"] is None
+    assert result["distances"] == [pytest.approx([0.0, 0.4])]
+
+    empty = store.query([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], n_results=3, where={"source": "none.pdf"})
+    assert empty["ids"] == [[], []] and empty["documents"] == [[], []]
+
+
+def test_get_returns_flat_lists(store):
+    result = store.get(where={"source": "aoa.pdf"})
+    assert result["ids"] == ["aoa::0", "aoa::1"]
+    assert result["documents"] == ["registered office", "annual accounts"]
+    assert result["metadatas"] == [{"source": "aoa.pdf"}, {"source": "aoa.pdf"}]
+    assert result["embeddings"] is None  # like Chroma, only when included
+
+    embeddings = store.get(include=["embeddings"])["embeddings"]
+    assert embeddings.shape == (4, 3)
+    assert np.linalg.norm(embeddings, axis=1) == pytest.approx(np.ones(4))
+
+
+def test_delete_and_add_rewrite_the_store(store, tmp_path):
+    store.delete(where={"source": "aoa.pdf"})
+    assert store.count() == 2 and store.ids == ["ubo::0", "ubo::1"]
+    assert store.query([[1.0, 0.0, 0.0]], n_results=4)["ids"] == [["ubo::0", "ubo::1"]]
+
+    store.add(["aoa::0"], ["registered office"], [{"source": "aoa.pdf"}], [[3.0, 0.0, 0.0]])
+    reopened = FlatVectorStore(tmp_path)
+    assert reopened.ids == ["ubo::0", "ubo::1", "aoa::0"]
+    assert reopened.query([[1.0, 0.0, 0.0]], n_results=1)["ids"] == [["aoa::0"]]
+    assert reopened.get()["documents"] == store.get()["documents"]
+
+
+def test_delete_by_ids_and_where_like_chroma(store):
+    store.delete(ids=["aoa::0", "ubo::0"], where={"source": "ubo.pdf"})
+    assert store.ids == ["aoa::0", "aoa::1", "ubo::1"]  # both filters must hold
+
+    store.delete(ids=["aoa::1", "missing"])
+    assert store.ids == ["aoa::0", "ubo::1"]
+
+    store.delete(where={"source": "nowhere.pdf"})
+    assert store.count() == 2
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"where": None}, {"where": {}}, {"ids": []}])
+def test_delete_without_a_filter_is_an_error(store, kwargs):
+    with pytest.raises(ValueError):
+        store.delete(**kwargs)
+    assert store.count() == len(IDS)
@@ -0,0 +1,12 @@
+# tests/test_import_budget.py
+import pytest
+
+from benchmarks.import_budget import HEAVY_PACKAGES, MODULES, measure
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_imports_without_heavy_packages(module):
+    """langchain, chromadb, google.generativeai, sentence_transformers, ... load on first use, never at import."""
+    result = measure(module)
+    assert "error" not in result, result["error"]
+    assert result["heavy"] == [], f"{module} imports {result['heavy']} (checked: {HEAVY_PACKAGES})"
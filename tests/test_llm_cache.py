@@ -0,0 +1,92 @@
+# tests/test_llm_cache.py
+from types import SimpleNamespace
+
+import pytest
+
+from rag_engine import llm_cache
+from rag_engine.llm_cache import LLMCache, make_cache_key
+
+
+class _Clock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs) -> LLMCache:
+        cache = LLMCache(tmp_path / "llm_cache.sqlite", **kwargs)
+        caches.append(cache)
+        return cache
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_cache_key_covers_model_system_prompt_and_prompt():
+    key = make_cache_key("gemini-1.5-flash", None, "Check clause 1.")
+    assert key == make_cache_key("gemini-1.5-flash", "", "Check clause 1.")
+    assert key != make_cache_key("gemini-1.5-pro", None, "Check clause 1.")
+    assert key != make_cache_key("gemini-1.5-flash", "Be strict.", "Check clause 1.")
+    assert key != make_cache_key("gemini-1.5-flash", None, "Check clause 2.")
+
+
+def test_entries_expire_after_ttl(clock, make_cache):
+    cache = make_cache(ttl_seconds=60)
+    cache.put("a", "answer a")
+    clock.now += 60
+    assert cache.get("a") == "answer a"
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0  # expired row removed on lookup
+
+
+def test_put_purges_expired_rows(clock, make_cache):
+    cache = make_cache(ttl_seconds=60)
+    cache.put("old", "stale")
+    clock.now += 120
+    cache.put("new", "fresh")
+    assert cache.stats()["entries"] == 1 and cache.get("new") == "fresh"
+
+
+def test_least_recently_used_rows_are_evicted(clock, make_cache):
+    cache = make_cache(max_entries=2)
+    cache.put("a", "answer a")
+    clock.now += 1
+    cache.put("b", "answer b")
+    clock.now += 1
+    assert cache.get("a") == "answer a"  # "a" is now more recent than "b"
+    clock.now += 1
+    cache.put("c", "answer c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "answer a" and cache.get("c") == "answer c"
+    assert cache.stats()["entries"] == 2
+
+
+def test_hit_miss_stats_and_persistence(clock, make_cache):
+    cache = make_cache()
+    assert cache.stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0}
+    cache.put("a", "answer a")
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 0.667, "entries": 1}
+
+    cache.close()
+    assert make_cache().get("a") == "answer a"  # rows survive reopening the database
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
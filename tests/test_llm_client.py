@@ -0,0 +1,139 @@
+# tests/test_llm_client.py
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.synthetic_docs import write_docx
+from modules.doc_parser import load_document
+from modules.redflag_detector import detect_red_flags, iter_red_flags
+from rag_engine import llm_client
+from rag_engine.llm_cache import LLMCache
+from rag_engine.rate_limiter import TokenBucket
+from rag_engine.stub_llm import StubLLMBackend, StubLLMError
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_BYPASS", raising=False)
+    monkeypatch.setattr(llm_client, "LLM_CACHE_ENABLED", True)
+    cache = LLMCache(tmp_path / "llm_cache.sqlite")
+    monkeypatch.setattr(llm_client, "response_cache", cache)
+    yield cache
+    llm_client.set_llm_backend(None)
+    cache.close()
+
+
+def test_stub_backend_bypasses_the_response_cache(cache):
+    key = llm_client.make_cache_key("gemini-1.5-flash", None, "Check clause 1.")
+    cache.put(key, '{"severity": "High", "issue": "cached Gemini answer"}', "gemini-1.5-flash")
+
+    stub = StubLLMBackend(latency=0.0)
+    llm_client.set_llm_backend(stub)
+    assert not llm_client.cache_enabled()
+    answer = llm_client.ask_gemini("Check clause 1.")
+    llm_client.ask_gemini("Check clause 2.")
+
+    assert "stub response" in answer and stub.calls == 2
+    assert cache.get(llm_client.make_cache_key("gemini-1.5-flash", None, "Check clause 2.")) is None
+
+    llm_client.set_llm_backend(None)
+    assert llm_client.cache_enabled()
+
+
+# ---------------- Retries ----------------
+class _FailingBackend(StubLLMBackend):
+    """Raises StubLLMError(code) on the first `failures` calls, then answers like the stub."""
+
+    def __init__(self, failures: int, code: int = 429):
+        super().__init__(latency=0.0)
+        self.failures = failures
+        self.code = code
+
+    def __call__(self, prompt: str, model: str) -> str:
+        if self.calls < self.failures:
+            self.calls += 1
+            raise StubLLMError(self.code)
+        return super().__call__(prompt, model)
+
+
+@pytest.fixture
+def no_waits(monkeypatch):
+    """No rate limiting; backoff sleeps are recorded instead of slept."""
+    sleeps = []
+    monkeypatch.setattr(llm_client, "rate_limiter", TokenBucket(0, 1))
+    monkeypatch.setattr(llm_client, "time", SimpleNamespace(sleep=sleeps.append, perf_counter=time.perf_counter))
+    monkeypatch.setenv("LLM_CACHE_BYPASS", "1")
+    yield sleeps
+    llm_client.set_llm_backend(None)
+
+
+def test_retries_throttled_calls_then_answers(no_waits):
+    backend = _FailingBackend(failures=2)
+    llm_client.set_llm_backend(backend)
+
+    assert "stub response" in llm_client.ask_gemini("Check clause 1.")
+    assert backend.calls == 3 and len(no_waits) == 2
+    for attempt, delay in enumerate(no_waits):  # jittered exponential backoff
+        full = min(llm_client.LLM_BACKOFF_MAX, llm_client.LLM_BACKOFF_BASE * 2 ** attempt)
+        assert full / 2 <= delay <= full
+
+
+def test_gives_up_after_max_retries(no_waits):
+    backend = _FailingBackend(failures=100)
+    llm_client.set_llm_backend(backend)
+
+    assert llm_client.ask_gemini("Check clause 1.") == llm_client.ERROR_RESPONSE
+    assert backend.calls == llm_client.LLM_MAX_RETRIES + 1
+    assert len(no_waits) == llm_client.LLM_MAX_RETRIES
+
+
+def test_non_retryable_errors_are_not_retried(no_waits):
+    backend = _FailingBackend(failures=1, code=400)
+    llm_client.set_llm_backend(backend)
+
+    assert llm_client.ask_gemini("Check clause 1.") == llm_client.ERROR_RESPONSE
+    assert backend.calls == 1 and no_waits == []
+
+
+# ---------------- Concurrent ordering ----------------
+class _SlowFirstBackend(StubLLMBackend):
+    """Earlier requests take longer, so answers complete in reverse submission order."""
+
+    def __call__(self, prompt: str, model: str) -> str:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, 0.2 - 0.02 * self.calls)
+        time.sleep(delay)
+        return self.respond(prompt)
+
+
+@pytest.fixture
+def parsed_doc(tmp_path, stub_pipeline, monkeypatch):
+    monkeypatch.setattr(llm_client, "rate_limiter", TokenBucket(0, 1))
+    monkeypatch.setattr("modules.redflag_detector.TEMPLATE_MATCH_ENABLED", False)
+    return load_document(str(write_docx(tmp_path / "aoa.docx", clauses=10)))
+
+
+def _assert_in_section_order(findings, parsed):
+    assert [f["section"] for f in findings] == [text[:80] + "..." for text in parsed.section_texts]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_findings_keep_section_order_with_jittered_latency(parsed_doc, seed):
+    llm_client.set_llm_backend(StubLLMBackend(latency=0.0, jitter=0.05, seed=seed))
+    arrived = dict(iter_red_flags(parsed_doc, max_workers=4, batch=False))
+    assert sorted(arrived) == list(range(len(parsed_doc.sections)))
+    for idx, finding in arrived.items():
+        assert finding["section"] == parsed_doc.section_texts[idx][:80] + "..."
+
+    _assert_in_section_order(detect_red_flags(parsed_doc, max_workers=4, batch=False), parsed_doc)
+
+
+def test_out_of_order_completions_are_reordered(parsed_doc):
+    llm_client.set_llm_backend(_SlowFirstBackend(latency=0.0))
+    order = [idx for idx, _ in iter_red_flags(parsed_doc, max_workers=4, batch=False)]
+    assert order != sorted(order) and sorted(order) == list(range(len(parsed_doc.sections)))
+
+    llm_client.set_llm_backend(_SlowFirstBackend(latency=0.0))
+    _assert_in_section_order(detect_red_flags(parsed_doc, max_workers=4, batch=False), parsed_doc)
@@ -0,0 +1,118 @@
+# tests/test_loader.py
+import json
+
+import docx
+import pytest
+
+from benchmarks.synthetic_docs import write_pdf
+from rag_engine import embedder, loader, registry
+from rag_engine.flat_store import FlatVectorStore
+
+
+def _write_docx(path, *paragraphs):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = docx.Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    document.save(str(path))
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    raw, processed = tmp_path / "raw", tmp_path / "processed"
+    processed.mkdir()
+    monkeypatch.setattr(loader, "RAW_DIR", raw)
+    monkeypatch.setattr(loader, "PROCESSED_DIR", processed)
+    monkeypatch.setattr(loader, "INGEST_MANIFEST_FILE", tmp_path / "ingest_manifest.json")
+
+    _write_docx(raw / "templates" / "articles.docx", "1. The company shall keep a register of members.")
+    _write_docx(raw / "guidance" / "ubo.docx", "Beneficial owners must be declared to the Registrar.")
+    (raw / "checklists").mkdir()
+    write_pdf(raw / "checklists" / "branch.pdf", clauses=2)
+    return raw, processed
+
+
+def _manifest():
+    return json.loads(loader.INGEST_MANIFEST_FILE.read_text(encoding="utf-8"))
+
+
+def test_first_run_adds_every_file(corpus):
+    raw, processed = corpus
+    changes = loader.run_loader(incremental=True, workers=1)
+
+    assert changes == {"added": ["checklists_branch", "guidance_ubo", "templates_articles"],
+                       "changed": [], "removed": []}
+    manifest = _manifest()
+    assert sorted(manifest) == ["checklists/branch.pdf", "guidance/ubo.docx", "templates/articles.docx"]
+    assert manifest["guidance/ubo.docx"] == {"sha256": loader.file_sha256(raw / "guidance" / "ubo.docx"),
+                                             "output": "guidance_ubo.txt"}
+    assert "register of members" in (processed / "templates_articles.txt").read_text(encoding="utf-8")
+
+
+def test_incremental_run_reports_added_changed_and_removed(corpus):
+    raw, processed = corpus
+    loader.run_loader(incremental=True, workers=1)
+    assert loader.run_loader(incremental=True, workers=1) == {"added": [], "changed": [], "removed": []}
+
+    _write_docx(raw / "templates" / "articles.docx", "1. The company shall keep a register of directors.")
+    (raw / "guidance" / "ubo.docx").unlink()
+    _write_docx(raw / "guidance" / "office.docx", "A registered office must be maintained in ADGM.")
+    changes = loader.run_loader(incremental=True, workers=1)
+
+    assert changes == {"added": ["guidance_office"], "changed": ["templates_articles"], "removed": ["guidance_ubo"]}
+    manifest = _manifest()
+    assert sorted(manifest) == ["checklists/branch.pdf", "guidance/office.docx", "templates/articles.docx"]
+    assert manifest["templates/articles.docx"]["sha256"] == loader.file_sha256(raw / "templates" / "articles.docx")
+    assert not (processed / "guidance_ubo.txt").exists()
+    assert "register of directors" in (processed / "templates_articles.txt").read_text(encoding="utf-8")
+
+
+def test_missing_output_is_re_extracted(corpus):
+    _, processed = corpus
+    loader.run_loader(incremental=True, workers=1)
+    (processed / "guidance_ubo.txt").unlink()
+
+    assert loader.run_loader(incremental=True, workers=1)["changed"] == ["guidance_ubo"]
+    assert (processed / "guidance_ubo.txt").exists()
+
+
+def test_full_run_ignores_the_manifest(corpus):
+    loader.run_loader(incremental=True, workers=1)
+    assert len(loader.run_loader(incremental=False, workers=1)["added"]) == 3
+
+
+class _Embeddings:
+    """Deterministic bag-of-letters vectors instead of the sentence-transformers model."""
+
+    def embed_documents(self, texts):
+        return [[text.lower().count(c) + 1.0 for c in "aeiou"] for text in texts]
+
+
+def test_update_vector_db_applies_a_change_set(tmp_path, monkeypatch):
+    pytest.importorskip("langchain")
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    (processed / "templates_articles.txt").write_text("The company shall keep a register of members.")
+    (processed / "guidance_ubo.txt").write_text("Beneficial owners must be declared to the Registrar.")
+    monkeypatch.setattr(embedder, "PROCESSED_TEXTS_DIR", processed)
+    monkeypatch.setattr(embedder, "VECTOR_STORE_BACKEND", "flat")
+    monkeypatch.setattr(embedder, "BM25_INDEX_FILE", tmp_path / "bm25_index.json")
+    monkeypatch.setattr(registry, "get_embeddings", lambda: _Embeddings())
+
+    ids, texts, metadatas = embedder.chunk_corpus()
+    FlatVectorStore.write(ids, texts, metadatas, _Embeddings().embed_documents(texts), tmp_path / "flat")
+    monkeypatch.setattr(registry, "_vector_store", FlatVectorStore(tmp_path / "flat"))
+    monkeypatch.setattr(registry, "_bm25_index", embedder.build_bm25_index())
+
+    (processed / "templates_articles.txt").write_text("The company shall keep a register of directors.")
+    (processed / "guidance_ubo.txt").unlink()
+    (processed / "guidance_office.txt").write_text("A registered office must be maintained in ADGM.")
+    embedder.update_vector_db({"added": ["guidance_office"], "changed": ["templates_articles"],
+                               "removed": ["guidance_ubo"]})
+
+    store = FlatVectorStore(tmp_path / "flat")
+    assert sorted(meta["source"] for meta in store.metadatas) == ["guidance_office", "templates_articles"]
+    assert any("register of directors" in text for text in store.texts)
+    assert not any("Beneficial owners" in text for text in store.texts)
+    assert sorted(registry.get_bm25_index().texts) == sorted(store.ids)
+    assert (tmp_path / "bm25_index.json").exists()
@@ -0,0 +1,87 @@
+# tests/test_redflag_detector.py
+import json
+
+import pytest
+
+from modules.redflag_detector import BatchAnswerStream, parse_batch_response, review_batch
+from rag_engine import llm_client
+
+
+def _item(clause_id, severity="Low"):
+    return {"clause_id": clause_id, "section_summary": f"Clause {clause_id}", "issue": "None", "severity": severity}
+
+
+def _answer(clause_id, severity="Low"):
+    return json.dumps({k: v for k, v in _item(clause_id, severity).items() if k != "clause_id"})
+
+
+def test_parse_batch_response_orders_answers_by_clause_id():
+    response = "```json\n" + json.dumps([_item("C2", "High"), _item(" c1 ")]) + "\n```"
+    assert parse_batch_response(response, 2) == [_answer(" c1 "), _answer("C2", "High")]
+
+
+@pytest.mark.parametrize("response", [
+    json.dumps([_item("C1"), _item("C3")]),   # C2 missing
+    json.dumps(_item("C1")),                  # not an array
+    json.dumps([_item("C1"), _item("C2")])[:-5],  # cut off
+    "Error: Could not get a response from Gemini.",
+])
+def test_parse_batch_response_rejects_incomplete_answers(response):
+    assert parse_batch_response(response, 2) is None
+
+
+def test_batch_answer_stream_yields_each_object_once_when_complete():
+    text = "```json\n" + json.dumps([_item("C2"), _item("C9"), "noise", _item("C1"), _item("C2", "High")])
+    stream = BatchAnswerStream(2)
+    completed = []
+    for end in range(1, len(text) + 1):
+        completed.extend(stream.feed(text[:end]))
+
+    assert [i for i, _ in completed] == [1, 0]  # unknown ids, non-objects and repeats are skipped
+    assert stream.answers == {0: _answer("C1"), 1: _answer("C2")}
+
+
+def test_batch_answer_stream_partial_object_and_restart():
+    first = json.dumps(_item("C1"))
+    stream = BatchAnswerStream(2)
+    assert stream.feed("[" + first[:-1]) == []
+    assert stream.feed("[" + first) == [(0, _answer("C1"))]
+    # A retry starts the answer over: C1 is not reported twice, C2 still arrives
+    assert stream.feed("[" + first + ", " + json.dumps(_item("C2"))[:10]) == []
+    assert stream.feed("[" + first + ", " + json.dumps(_item("C2")) + "]") == [(1, _answer("C2"))]
+
+
+class _PartialBatchBackend:
+    """Streams a batched answer that lacks C2; single-clause prompts get a plain answer."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def __call__(self, prompt, model):
+        self.prompts.append(prompt)
+        return _answer("single", "Medium")
+
+    def stream(self, prompt, model):
+        self.prompts.append(prompt)
+        text = json.dumps([_item("C1", "High"), _item("C3")])
+        yield text[:len(text) // 2]
+        yield text[len(text) // 2:]
+
+
+@pytest.fixture
+def backend():
+    backend = _PartialBatchBackend()
+    llm_client.set_llm_backend(backend)
+    yield backend
+    llm_client.set_llm_backend(None)
+
+
+def test_review_batch_falls_back_for_missing_clause_ids(backend):
+    emitted = []
+    answers = review_batch(["Clause one.", "Clause two.", "Clause three."], [["ctx"]] * 3, "SPV_Continuance",
+                           on_answer=lambda i, answer: emitted.append((i, answer)))
+
+    # C1 and C3 came from the streamed batch; only C2 needed its own request
+    assert answers == [_answer("C1", "High"), _answer("single", "Medium"), _answer("C3")]
+    assert sorted(emitted) == list(enumerate(answers))
+    assert len(backend.prompts) == 2 and "Clause two." in backend.prompts[1]
@@ -0,0 +1,54 @@
+# tests/test_report_generator.py
+import json
+
+from benchmarks.synthetic_docs import write_docx
+from modules.pipeline import process_document
+from modules.redflag_detector import parse_severity
+from modules.report_generator import StreamingReportWriter, iter_report_records, read_streaming_report
+
+ANSWERS = [
+    '```json\n{"section_summary": "Share capital", "issue": "Paid-up capital missing", "severity": "High"}\n```',
+    json.dumps({"section_summary": "Directors", "issue": "No consent to act", "severity": "medium"}),
+    json.dumps({"section_summary": "Office", "issue": "Address incomplete", "severity": "Low"}),
+    json.dumps({"section_summary": "UBO", "issue": "Nationalities missing", "severity": "High"}),
+    "Error: Could not get a response from Gemini.",
+]
+
+
+def _record(name, answers):
+    return {
+        "file": name,
+        "status": "ok",
+        "entity_type": "PrivateCompany_LimitedByShares_NonFinancial",
+        "checklist_verification": {"present": ["Articles of Association"], "missing": []},
+        "red_flag_findings": [{"section": f"Clause {i}...", "ai_analysis": answer, "severity": parse_severity(answer)}
+                              for i, answer in enumerate(answers)],
+        "annotated_document_path": "N/A",
+    }
+
+
+def test_parse_severity():
+    assert [parse_severity(answer) for answer in ANSWERS] == ["High", "Medium", "Low", "High", "Unknown"]
+    assert parse_severity('{"issue": "cut off", "severity": "High", "refer') == "High"
+
+
+def test_streaming_summary_counts_severities(tmp_path):
+    path = tmp_path / "report.jsonl.gz"
+    with StreamingReportWriter(str(path)) as writer:
+        writer.add_document(_record("a.docx", ANSWERS[:3]))
+        writer.add_document(_record("b.docx", ANSWERS[3:]))
+        writer.add_document({"file": "c.pdf", "status": "error", "error": "Could not parse document"})
+
+    summary = [record for record in iter_report_records(str(path)) if record["type"] == "summary"][0]
+    assert summary["findings"] == 5
+    assert summary["severity_counts"] == {"High": 2, "Low": 1, "Medium": 1, "Unknown": 1}
+    assert read_streaming_report(str(path))["severity_counts"] == summary["severity_counts"]
+
+
+def test_pipeline_findings_carry_severity(tmp_path, stub_pipeline):
+    record = process_document(str(write_docx(tmp_path / "aoa.docx", clauses=8)), str(tmp_path))
+
+    assert record["status"] == "ok"
+    severities = {finding["severity"] for finding in record["red_flag_findings"]}
+    assert severities <= {"Low", "None"} and "Low" in severities  # stub answers / template matches
+    assert sum(record["severity_counts"].values()) == len(record["red_flag_findings"])
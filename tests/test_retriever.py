@@ -0,0 +1,48 @@
+# tests/test_retriever.py
+from types import SimpleNamespace
+
+from rag_engine import registry, retriever
+from rag_engine.bm25_index import BM25Index
+
+CHUNKS = {
+    "aoa::0": "The company shall keep a register of beneficial owners.",
+    "aoa::1": "Annual accounts must be filed within nine months.",
+    "aoa::2": "A registered office must be maintained in ADGM.",
+}
+
+
+def _dense(chunk_id, text, distance):
+    return SimpleNamespace(page_content=text, metadata={"chunk_id": chunk_id, "distance": distance})
+
+
+def _lexical(chunk_id, text, bm25):
+    return SimpleNamespace(page_content=text, metadata={"chunk_id": chunk_id, "bm25": bm25, "score": 1.0})
+
+
+def test_fuse_results_by_chunk_id():
+    dense = [_dense("aoa::0", CHUNKS["aoa::0"], 0.2), _dense("aoa::1", CHUNKS["aoa::1"], 0.6)]
+    lexical = [_lexical("aoa::0", CHUNKS["aoa::0"], 4.0), _lexical("aoa::2", CHUNKS["aoa::2"], 1.0)]
+
+    fused = retriever.fuse_results(dense, lexical, k=5, alpha=0.5)
+
+    assert [doc.metadata["chunk_id"] for doc, _, _ in fused] == ["aoa::0", "aoa::1", "aoa::2"]
+    assert fused[0][1] == 1.0 and fused[0][2] == 4.0
+    assert fused[1][2] is None
+
+
+def test_legacy_uuid_store_is_fused_by_text(monkeypatch):
+    # Chroma stores built before chunk ids were assigned: same chunks, random ids
+    dense = [[_dense("3f2b9c1e-0d4a", "The company shall keep a register of\n beneficial owners. ", 0.2),
+              _dense("9a7d0e44-51c3", CHUNKS["aoa::1"], 0.6)]]
+    lexical = [_lexical("aoa::0", CHUNKS["aoa::0"], 4.0), _lexical("aoa::1", CHUNKS["aoa::1"], 2.0)]
+    index = BM25Index()
+    index.add(list(CHUNKS), list(CHUNKS.values()), [{}] * len(CHUNKS))
+    monkeypatch.setattr(registry, "_bm25_index", index)
+
+    by_id = retriever._ids_shared_with_bm25(dense)
+    fused = retriever.fuse_results(dense[0], lexical, k=5, by_id=by_id)
+
+    assert by_id is False
+    assert len(fused) == 2  # each chunk once, found by both indexes
+    assert all(bm25 is not None for _, _, bm25 in fused)
+    assert retriever._ids_shared_with_bm25([[_dense("aoa::2", CHUNKS["aoa::2"], 0.1)]]) is True
@@ -0,0 +1,73 @@
+# tests/test_sectioner.py
+import re
+
+from benchmarks.synthetic_docs import write_docx
+from modules.doc_parser import TextBlock, load_document
+from modules.redflag_detector import detect_red_flags
+from modules.sectioner import Section, _split_long, iter_structured_sections
+
+
+def _para(idx, text, style="Normal"):
+    return TextBlock(text=text, paragraph=idx, style=style)
+
+
+def _sections(blocks, **limits):
+    return list(iter_structured_sections(blocks, **limits))
+
+
+def test_headings_lead_into_the_clause_they_head():
+    blocks = [_para(0, "ARTICLES OF ASSOCIATION", "Title"), _para(1, "1. SHARE CAPITAL", "Heading 1"),
+              _para(2, "1.1 The company shall keep accounts."), _para(3, "1.2 Shares are transferable."),
+              _para(4, "2. DIRECTORS", "Heading 1"), _para(5, "2.1 There shall be two directors.")]
+    sections = _sections(blocks, min_chars=300)
+
+    assert [(s.paragraph_start, s.paragraph_end, s.anchor_paragraph) for s in sections] == \
+        [(0, 2, 2), (3, 3, 3), (4, 5, 5)]
+    assert sections[0].text.startswith("ARTICLES OF ASSOCIATION\n1. SHARE CAPITAL\n1.1")
+
+
+def test_unnumbered_paragraphs_merge_into_the_clause():
+    blocks = [_para(0, "1.1 The company shall keep accounts."), _para(1, "These are audited yearly."),
+              _para(2, "Intro text."), _para(3, "1.2 Shares are transferable.")]
+    assert [(s.paragraph_start, s.paragraph_end) for s in _sections(blocks, min_chars=300)] == [(0, 2), (3, 3)]
+
+
+def test_pdf_lines_merge_until_min_chars():
+    lines = ["1. The company keeps accounts within", "30 days after year end.",  # wrapped line starting with a number
+             "2. Shares are transferable by the holder.", "3. Directors"]
+    page = TextBlock(text="\n".join(lines), page=0)
+    short = _sections([page], min_chars=200)
+    assert len(short) == 1 and short[0].location() == {"pages": [0, 0]}
+
+    split = _sections([page], min_chars=40)
+    assert [s.text.split("\n")[0] for s in split] == [lines[0], lines[2], lines[3]]
+    assert all(s.anchor_paragraph is None for s in split)
+
+
+def test_sections_never_exceed_max_chars():
+    blocks = [_para(i, f"{i}. " + "word " * 30) for i in range(6)] + [_para(6, "Sentence one. " * 40)]
+    sections = _sections(blocks, min_chars=10_000, max_chars=400)
+    assert all(len(s.text) <= 400 for s in sections)
+    assert "".join(s.text.replace("\n", " ") for s in sections).count("Sentence one.") == 40
+
+
+def test_split_long_prefers_sentence_ends_then_hard_wraps():
+    assert _split_long("First part. Second part; third part.", 20) == ["First part.", "Second part;", "third part."]
+    pieces = _split_long("x" * 25 + " " + "y" * 10, 20)
+    assert pieces == ["x" * 20, "xxxxx " + "y" * 10]
+    assert all(len(p) <= 20 for p in pieces)
+
+
+def test_location():
+    assert Section("t", paragraph_start=2, paragraph_end=4).location() == {"paragraphs": [2, 4]}
+    assert Section("t", page_start=1, page_end=3).location() == {"pages": [1, 3]}
+    assert Section("t").location() == {}
+
+
+def test_every_docx_clause_gets_its_own_finding(tmp_path, stub_pipeline):
+    parsed = load_document(str(write_docx(tmp_path / "aoa.docx", clauses=10)))
+    paragraphs = parsed.docx_document.paragraphs
+    clause_paragraphs = [i for i, p in enumerate(paragraphs) if re.match(r"\d+\.\d+ ", p.text)]
+
+    findings = detect_red_flags(parsed)
+    assert sorted(f["paragraph_index"] for f in findings) == clause_paragraphs
@@ -0,0 +1,106 @@
+# tests/test_template_matcher.py
+import docx
+import pytest
+
+from modules.template_matcher import TemplateIndex, _bands, normalize_clause, simhash
+
+TEMPLATE_PARAGRAPHS = [
+    "The liability of the members is limited to the amount, if any, unpaid on the shares held by them.",
+    "The directors may exercise all the powers of the company to borrow money and to mortgage or charge "
+    "its undertaking, property and uncalled capital.",
+    "Unless otherwise determined by ordinary resolution, the number of directors shall not be less than one.",
+]
+LIABILITY = TEMPLATE_PARAGRAPHS[0]
+# One word changed in a long clause: well within the default 0.95 threshold
+NEAR_DUPLICATE = TEMPLATE_PARAGRAPHS[1].replace("borrow money", "borrow funds")
+# Several words changed: similar, but below it
+EDITED = TEMPLATE_PARAGRAPHS[2].replace("ordinary resolution", "special resolution of the board") \
+    .replace("less than one", "fewer than two")
+
+
+@pytest.fixture(scope="module")
+def templates_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp("templates")
+    document = docx.Document()
+    document.add_heading("MODEL ARTICLES", level=1)
+    for text in TEMPLATE_PARAGRAPHS:
+        document.add_paragraph(text)
+    document.save(str(path / "model_articles.docx"))
+    return path
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def test_normalize_clause_drops_numbering_and_punctuation():
+    assert normalize_clause("3.2 (a) The Company's  OFFICE, in ADGM.") == "a the company s office in adgm"
+    assert normalize_clause("(iv) Directors shall meet.") == "directors shall meet"
+
+
+def test_simhash_near_duplicates_share_a_band():
+    near, base = simhash(normalize_clause(NEAR_DUPLICATE)), simhash(normalize_clause(TEMPLATE_PARAGRAPHS[1]))
+    other = simhash(normalize_clause(TEMPLATE_PARAGRAPHS[2]))
+    assert _hamming(near, base) < _hamming(other, base)
+    assert set(_bands(near)) & set(_bands(base))
+    assert simhash("same words here") == simhash("same words here")
+
+
+def test_exact_match_ignores_numbering_and_case(templates_dir):
+    index = TemplateIndex(templates_dir)
+    match = index.match_line("4. " + LIABILITY.upper())
+    assert match is not None and match.similarity == 1.0
+    assert match.template == "model_articles.docx" and match.paragraph == 1
+
+
+def test_near_duplicate_threshold(templates_dir):
+    strict = TemplateIndex(templates_dir, threshold=0.95)
+    match = strict.match_line(NEAR_DUPLICATE)
+    assert match is not None and 0.95 <= match.similarity < 1.0 and match.paragraph == 2
+    assert strict.match_line(EDITED) is None
+    assert strict.match_line("The company shall pay every director a bonus of 50% of annual profits.") is None
+
+    # A lower threshold does not reach clauses that share no SimHash band with the template
+    edited, template = simhash(normalize_clause(EDITED)), simhash(normalize_clause(TEMPLATE_PARAGRAPHS[2]))
+    assert not set(_bands(edited)) & set(_bands(template))
+    assert TemplateIndex(templates_dir, threshold=0.7).match_line(EDITED) is None
+
+
+def test_clause_matches_when_every_line_does(templates_dir):
+    index = TemplateIndex(templates_dir)
+    clause = f"{LIABILITY}\n{NEAR_DUPLICATE}"
+    match = index.match_clause(clause)
+    assert match is not None and match.paragraph == 2  # the weakest line
+    assert index.match_clause(f"{LIABILITY}\nThe company may issue bearer shares.") is None
+
+
+RESOLUTION_PARAGRAPHS = [
+    "The shareholders resolve to approve the incorporation of the company in ADGM.",
+    LIABILITY,  # shared with the articles template
+    "The directors are authorised to file the application with the Registrar.",
+]
+
+
+@pytest.fixture(scope="module")
+def two_templates_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp("two_templates")
+    for name, paragraphs in [("a_articles.docx", TEMPLATE_PARAGRAPHS), ("b_resolution.docx", RESOLUTION_PARAGRAPHS)]:
+        document = docx.Document()
+        for text in paragraphs:
+            document.add_paragraph(text)
+        document.save(str(path / name))
+    return path
+
+
+def test_clause_lines_must_follow_one_template_in_order(two_templates_dir):
+    index = TemplateIndex(two_templates_dir)
+    articles, resolution = TEMPLATE_PARAGRAPHS, RESOLUTION_PARAGRAPHS
+
+    assert index.match_clause(f"{articles[0]}\n{articles[2]}").template == "a_articles.docx"
+    assert index.match_clause(f"{articles[2]}\n{articles[0]}") is None           # reordered
+    assert index.match_clause(f"{articles[1]}\n{resolution[2]}") is None         # mixed templates
+    assert index.match_clause(f"{articles[0]}\n{articles[0]}") is None           # repeated line
+
+    # A line both templates share still lines up with the template the clause was copied from
+    match = index.match_clause(f"{resolution[0]}\n{LIABILITY}\n{resolution[2]}")
+    assert match is not None and match.template == "b_resolution.docx"
@@ -0,0 +1,53 @@
+# tests/test_tokens.py
+import sys
+
+import pytest
+
+from rag_engine import registry, tokens
+
+
+class _Tokenizer:
+    def encode(self, text, add_special_tokens=False, verbose=False):
+        return text.split()
+
+
+class _Embeddings:
+    class client:
+        tokenizer = _Tokenizer()
+
+
+TEXT = "The Company shall maintain a register of beneficial owners."
+
+
+@pytest.fixture(autouse=True)
+def fresh_counter(monkeypatch):
+    monkeypatch.setattr(tokens, "_counter", None)
+
+
+def test_estimate_does_not_load_the_embedding_model(monkeypatch):
+    monkeypatch.setattr(registry, "_embeddings", None)
+    monkeypatch.setattr(registry, "get_embeddings", lambda: pytest.fail("embedding model loaded"))
+    assert tokens.count_tokens(TEXT) == tokens.estimate_tokens(TEXT)
+    assert "sentence_transformers" not in sys.modules
+
+
+def test_estimate_ignores_an_already_loaded_model(monkeypatch):
+    assert tokens.count_tokens(TEXT) == tokens.estimate_tokens(TEXT)
+    monkeypatch.setattr(registry, "_embeddings", _Embeddings())
+    assert tokens.count_tokens(TEXT) == tokens.estimate_tokens(TEXT)
+
+
+def test_embedding_counter_loads_the_model(monkeypatch):
+    monkeypatch.setattr(tokens, "TOKEN_COUNTER", "embedding")
+    monkeypatch.setattr(registry, "get_embeddings", lambda: _Embeddings())
+    assert tokens.count_tokens("one two three") == 3
+
+
+def test_counter_is_fixed_for_the_process(monkeypatch):
+    monkeypatch.setattr(tokens, "TOKEN_COUNTER", "embedding")
+    monkeypatch.setattr(registry, "get_embeddings", lambda: (_ for _ in ()).throw(ImportError("no model")))
+    first = tokens.count_tokens(TEXT)
+    assert first == tokens.estimate_tokens(TEXT)  # unavailable tokenizer falls back once
+
+    monkeypatch.setattr(registry, "get_embeddings", lambda: _Embeddings())
+    assert tokens.count_tokens(TEXT) == first